@@ -0,0 +1,97 @@
+from fastapi import APIRouter, Header
+from fastapi.responses import StreamingResponse
+from typing import Optional, AsyncIterator
+import asyncio
+import json
+import os
+
+from app.database import async_session_maker
+from app.services import events
+
+router = APIRouter()
+
+# Comment line sent when idle, keeps proxies from closing the stream
+HEARTBEAT = float(os.getenv("EVENTS_HEARTBEAT", "15"))
+
+
+def _sse(event: str, event_id: int, data: dict) -> str:
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _replay(after_id: int, until_id: int) -> AsyncIterator[dict]:
+    """Events a reconnecting client missed, up to where the live feed starts"""
+    async with async_session_maker() as session:
+        while after_id < until_id:
+            batch = await events.fetch_since(session, after_id)
+            if not batch:
+                return
+            for event in batch:
+                yield event
+            after_id = batch[-1]["id"]
+
+
+async def _event_stream(subscriber: events.Subscriber, last_event_id: Optional[int]) -> AsyncIterator[str]:
+    sent = subscriber.start_id
+    try:
+        yield "retry: 2000\n\n"
+
+        resumable = False
+        if last_event_id is not None:
+            async with async_session_maker() as session:
+                oldest = await events.oldest_id(session)
+            # Nothing pruned between what the client saw and what we still have
+            resumable = last_event_id <= sent and (oldest == 0 or oldest <= last_event_id + 1)
+
+        if resumable:
+            sent = last_event_id
+            async for event in _replay(last_event_id, subscriber.start_id):
+                sent = event["id"]
+                yield _sse("task", event["id"], event)
+        else:
+            # Fresh client, or too far behind - it loads full state, then applies events
+            yield _sse("ready" if last_event_id is None else "reset", sent, {"id": sent})
+
+        while True:
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), timeout=HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+
+            if subscriber.overflowed:
+                # Client fell behind - drop the backlog and have it reload
+                while not subscriber.queue.empty():
+                    event = subscriber.queue.get_nowait()
+                subscriber.overflowed = False
+                sent = max(sent, event["id"])
+                yield _sse("reset", sent, {"id": sent})
+                continue
+
+            if event["id"] <= sent:
+                continue  # Already sent during replay
+            sent = event["id"]
+            yield _sse("task", event["id"], event)
+    finally:
+        events.unsubscribe(subscriber)
+
+
+@router.get("/events")
+async def event_stream(last_event_id: Optional[str] = Header(None)):
+    """
+    Live task changes as server-sent events
+    `task` events carry kind (created, processed, updated, deleted) and the
+    task's current state. Clients reconnecting with Last-Event-ID get what
+    they missed; if that's no longer available they get `reset` and should
+    reload, just like after the initial `ready`.
+    """
+    try:
+        resume_from = int(last_event_id) if last_event_id else None
+    except ValueError:
+        resume_from = None
+
+    subscriber = await events.subscribe()
+    return StreamingResponse(
+        _event_stream(subscriber, resume_from),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
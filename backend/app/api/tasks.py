@@ -1,17 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
-from typing import Optional, List
+from sqlalchemy import select, update, insert, delete, and_, or_, text, case, func
+from sqlalchemy.orm import load_only
+from typing import Optional, List, AsyncIterator
 from pydantic import BaseModel
 from datetime import datetime
+import base64
+import json
 import os
 
-from app.database import get_session
+from app.database import get_session, get_write_session, write_session
 from app.models.task import Task
+from app.models.stats import TaskCounter
+from app.models.search import FTS_WEIGHTS, fts_query, make_snippet, search_terms
 from app.llm.processor import get_processor
+from app.services import events, metrics, ranking, scheduler, work_queue
+from app.services.processing import process_tasks
 
 router = APIRouter()
 
+# Most items accepted by one bulk capture request
+CAPTURE_BULK_MAX = int(os.getenv("CAPTURE_BULK_MAX", "1000"))
+# Most task ids (summed over its operations) one batch PATCH may touch
+TASK_BATCH_MAX = int(os.getenv("TASK_BATCH_MAX", "1000"))
+
 
 class TaskCreate(BaseModel):
     raw_input: str
@@ -23,17 +36,29 @@ class TaskUpdate(BaseModel):
     notes: Optional[str] = None
     due_by: Optional[datetime] = None
     pinned: Optional[bool] = None
+    recurring_pattern: Optional[str] = None  # "" stops the task recurring
+
+
+class TaskOperation(TaskUpdate):
+    """One step of a batch: the TaskUpdate fields applied to every task in `ids`"""
+    ids: List[int]
+    priority_delta: Optional[float] = None  # Added to priority_score in SQL, clamped to 0-1
+    delete: bool = False
+
+
+class TaskBatch(BaseModel):
+    ops: List[TaskOperation]
 
 
 @router.post("/tasks/capture")
 async def capture_task(
     task_input: TaskCreate,
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_write_session)
 ):
     """
     Capture a task - the main entry point from rofi/fuzzel
     This is SILENT and INSTANT - no LLM processing, just save
-    Processing happens in background
+    Processing happens in background - the task is queued and the worker woken
     """
     # Create task immediately - no LLM, no waiting
     task = Task(
@@ -44,8 +69,11 @@ async def capture_task(
     )
 
     session.add(task)
+    await session.flush()
+    await work_queue.enqueue(session, [task.id])
     await session.commit()
-    await session.refresh(task)
+    work_queue.notify()
+    events.notify()
 
     # Return immediately - background worker will process
     return {
@@ -55,36 +83,352 @@ async def capture_task(
     }
 
 
+def _bulk_item_text(item) -> Optional[str]:
+    """A bulk item is a string or {"raw_input": ...}; blank ones are skipped"""
+    if isinstance(item, dict):
+        item = item.get("raw_input")
+    if not isinstance(item, str):
+        raise HTTPException(status_code=400, detail="Each item must be a string or {\"raw_input\": ...}")
+    return item.strip() or None
+
+
+def _parse_bulk_body(body: bytes, content_type: str) -> List[str]:
+    """JSON array, {"items": [...]}, NDJSON (one item per line) or plain text lines"""
+    text = body.decode("utf-8")
+
+    if content_type.startswith("text/plain"):
+        lines = [line.strip() for line in text.splitlines()]
+        return [line for line in lines if line]
+
+    if content_type.startswith("application/x-ndjson"):
+        items = []
+        for line in text.splitlines():
+            if line.strip():
+                try:
+                    items.append(json.loads(line))
+                except json.JSONDecodeError:
+                    raise HTTPException(status_code=400, detail=f"Invalid NDJSON line: {line[:80]}")
+    else:
+        try:
+            items = json.loads(text)
+        except json.JSONDecodeError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or {\"items\": [...]}")
+        if isinstance(items, dict):
+            items = items.get("items")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or {\"items\": [...]}")
+
+    texts = [_bulk_item_text(item) for item in items]
+    return [t for t in texts if t]
+
+
+@router.post("/tasks/capture/bulk")
+async def capture_tasks_bulk(request: Request):
+    """
+    Capture many tasks at once - a pasted brain-dump or an import
+    One transaction, one commit, one worker wake-up for the whole batch
+    """
+    # Read the whole upload before taking the write lock - a slow client must not stall every writer
+    texts = _parse_bulk_body(await request.body(), request.headers.get("content-type", ""))
+
+    if not texts:
+        return {"ids": [], "count": 0, "status": "captured", "message": "Nothing to capture"}
+    if len(texts) > CAPTURE_BULK_MAX:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many items ({len(texts)}), max {CAPTURE_BULK_MAX} per request"
+        )
+
+    now = datetime.utcnow()
+    async with write_session() as session:
+        result = await session.execute(
+            insert(Task).returning(Task.id, sort_by_parameter_order=True),
+            [
+                {"raw_input": text, "status": "captured", "created_at": now, "touched_at": now}
+                for text in texts
+            ],
+        )
+        ids = list(result.scalars())
+
+        await work_queue.enqueue(session, ids)
+        await session.commit()
+    work_queue.notify()
+    events.notify()
+
+    return {
+        "ids": ids,
+        "count": len(ids),
+        "status": "captured",
+        "message": f"{len(ids)} tasks captured"
+    }
+
+
+async def _not_modified(request: Request, response: Response, session: AsyncSession) -> Optional[Response]:
+    """
+    Tag the response with the data version (the newest task_events id, bumped
+    by triggers on every tasks write); returns a 304 if the client has it.
+    Read it in the same transaction as the data so the two agree.
+    """
+    etag = f'W/"{await events.latest_id(session)}"'
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+
+    sent = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in sent.split(",")]:
+        metrics.inc("http_not_modified")
+        return Response(status_code=304, headers=dict(response.headers))
+    return None
+
+
+# Largest page a client can ask for
+LIST_MAX_LIMIT = int(os.getenv("LIST_MAX_LIMIT", "500"))
+
+# Search ranks this many of the newest matches (see search_tasks)
+SEARCH_RANK_WINDOW = int(os.getenv("SEARCH_RANK_WINDOW", "2000"))
+
+TASK_FIELDS = [column.name for column in Task.__table__.columns]
+
+
+def _encode_cursor(task: Task) -> str:
+    key = [task.rank_score, task.id]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        rank, task_id = json.loads(base64.urlsafe_b64decode(padded))
+        return float(rank), int(task_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _after_cursor(cursor: str):
+    """
+    Rows after the cursor in (rank_score DESC, id ASC) order. The leading
+    rank_score bound lets SQLite seek the index, so a deep page costs the
+    same as the first one.
+    """
+    rank, task_id = _decode_cursor(cursor)
+    return and_(
+        Task.rank_score <= rank,
+        or_(Task.rank_score < rank, Task.id > task_id),
+    )
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in TASK_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    # id is always included; the sort keys are needed for the next cursor
+    return ["id"] + [name for name in names if name != "id"]
+
+
 @router.get("/tasks")
 async def list_tasks(
+    request: Request,
+    response: Response,
     status: Optional[str] = None,
     limit: int = 50,
+    cursor: Optional[str] = None,
+    category: Optional[str] = None,
+    life_critical: Optional[bool] = None,
+    quick_win: Optional[bool] = None,
+    pinned: Optional[bool] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    touched_after: Optional[datetime] = None,
+    touched_before: Optional[datetime] = None,
+    fields: Optional[str] = None,
     session: AsyncSession = Depends(get_session)
 ):
-    """List tasks, optionally filtered by status"""
+    """
+    List tasks, highest rank (effective priority) first, one page at a time
+    Pass the returned `next_cursor` as `cursor` for the following page.
+    `fields` is a comma-separated list of columns to return (e.g. drop notes).
+    """
+    not_modified = await _not_modified(request, response, session)
+    if not_modified:
+        return not_modified
+
+    limit = max(1, min(limit, LIST_MAX_LIMIT))
+    selected = _parse_fields(fields)
+
     query = select(Task)
 
     if status:
         query = query.where(Task.status == status)
-
-    # Order by priority (desc) and touched_at (desc)
-    query = query.order_by(Task.priority_score.desc(), Task.touched_at.desc()).limit(limit)
+    if category:
+        query = query.where(Task.category == category)
+    if life_critical is not None:
+        query = query.where(Task.is_life_critical == life_critical)
+    if quick_win is not None:
+        query = query.where(Task.is_quick_win == quick_win)
+    if pinned is not None:
+        query = query.where(Task.pinned == pinned)
+    if created_after:
+        query = query.where(Task.created_at >= created_after)
+    if created_before:
+        query = query.where(Task.created_at < created_before)
+    if touched_after:
+        query = query.where(Task.touched_at >= touched_after)
+    if touched_before:
+        query = query.where(Task.touched_at < touched_before)
+    if cursor:
+        query = query.where(_after_cursor(cursor))
+
+    if selected:
+        keys = {"id", "rank_score"}
+        query = query.options(load_only(
+            *[getattr(Task, name) for name in TASK_FIELDS if name in keys or name in selected]
+        ))
+
+    # Effective priority (see services.ranking); id breaks ties
+    query = query.order_by(Task.rank_score.desc(), Task.id).limit(limit + 1)
 
     result = await session.execute(query)
     tasks = result.scalars().all()
 
+    has_more = len(tasks) > limit
+    tasks = tasks[:limit]
+
     return {
-        "tasks": [task.to_dict() for task in tasks],
-        "count": len(tasks)
+        "tasks": [task.to_dict(selected) for task in tasks],
+        "count": len(tasks),
+        "next_cursor": _encode_cursor(tasks[-1]) if has_more else None,
     }
 
 
+@router.get("/tasks/suggestions")
+async def get_suggestions(
+    user_state: Optional[str] = None,
+    session: AsyncSession = Depends(get_session)
+):
+    """Get AI suggestions for what to do next"""
+    processor = get_processor()
+
+    # Get active tasks
+    result = await session.execute(
+        select(Task).where(Task.status == "active")
+    )
+    active_tasks = result.scalars().all()
+
+    if not active_tasks:
+        return {"suggestions": "No active tasks. Add some tasks to get started!"}
+
+    task_dicts = [t.to_dict() for t in active_tasks]
+    suggestions = await processor.get_suggestions(task_dicts, user_state)
+
+    return {"suggestions": suggestions}
+
+
+@router.get("/tasks/suggestions/stream")
+async def stream_suggestions(
+    user_state: Optional[str] = None,
+    session: AsyncSession = Depends(get_session)
+):
+    """Streaming suggestions - NDJSON lines of {"token": ...}, then {"done": true}"""
+    processor = get_processor()
+
+    result = await session.execute(
+        select(Task).where(Task.status == "active")
+    )
+    active_tasks = result.scalars().all()
+
+    if not active_tasks:
+        return StreamingResponse(
+            _ndjson_stream(_single_token("No active tasks. Add some tasks to get started!")),
+            media_type="application/x-ndjson",
+        )
+
+    task_dicts = [t.to_dict() for t in active_tasks]
+    await session.close()  # Don't hold a connection while the model streams
+    processor.lanes.admit()  # A full lane is a 503 now, not an error line mid-stream
+
+    return StreamingResponse(
+        _ndjson_stream(processor.stream_suggestions(task_dicts, user_state)),
+        media_type="application/x-ndjson",
+    )
+
+
+# Declared before /tasks/{task_id} so "search" isn't taken for an id
+@router.get("/tasks/search")
+async def search_tasks(
+    q: str,
+    request: Request,
+    response: Response,
+    status: Optional[str] = None,
+    limit: int = 20,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Full-text search over raw_input, processed_text and notes
+    Every word must match (as a prefix); best matches first, each with a
+    snippet where matches are wrapped in <b></b>. Very common words are
+    ranked among their newest SEARCH_RANK_WINDOW matches.
+    """
+    not_modified = await _not_modified(request, response, session)
+    if not_modified:
+        return not_modified
+
+    terms = search_terms(q)
+    match = fts_query(terms)
+    if not match:
+        return {"results": [], "count": 0}
+
+    # Rank the newest SEARCH_RANK_WINDOW matches only - a word that's in half
+    # of a long history would otherwise be bm25-scored across all of it
+    ranked = (
+        "WITH recent AS ("
+        f"SELECT tasks_fts.rowid AS id, bm25(tasks_fts, {FTS_WEIGHTS}) AS rank FROM tasks_fts"
+        + (" JOIN tasks ON tasks.id = tasks_fts.rowid" if status else "")
+        + " WHERE tasks_fts MATCH :match"
+        + (" AND tasks.status = :status" if status else "")
+        + " ORDER BY tasks_fts.rowid DESC LIMIT :window) "
+        "SELECT id, rank FROM recent ORDER BY rank LIMIT :limit"
+    )
+    params = {
+        "match": match,
+        "window": SEARCH_RANK_WINDOW,
+        "limit": max(1, min(limit, LIST_MAX_LIMIT)),
+    }
+    if status:
+        params["status"] = status
+    hits = (await session.execute(text(ranked), params)).all()
+    if not hits:
+        return {"results": [], "count": 0}
+    ids = [hit.id for hit in hits]
+
+    result = await session.execute(select(Task).where(Task.id.in_(ids)))
+    tasks = {task.id: task for task in result.scalars().all()}
+
+    results = []
+    for hit in hits:
+        task = tasks[hit.id].to_dict()
+        task["snippet"] = make_snippet(
+            [task["processed_text"], task["raw_input"], task["notes"]], terms
+        )
+        task["rank"] = round(hit.rank, 4)
+        results.append(task)
+
+    return {"results": results, "count": len(results)}
+
+
 @router.get("/tasks/{task_id}")
 async def get_task(
     task_id: int,
+    request: Request,
+    response: Response,
     session: AsyncSession = Depends(get_session)
 ):
     """Get a specific task"""
+    not_modified = await _not_modified(request, response, session)
+    if not_modified:
+        return not_modified
+
     result = await session.execute(
         select(Task).where(Task.id == task_id)
     )
@@ -96,45 +440,138 @@ async def get_task(
     return task.to_dict()
 
 
+async def _update_tasks(
+    session: AsyncSession,
+    ids: List[int],
+    change: TaskUpdate,
+    priority_delta: Optional[float] = None,
+) -> List[Task]:
+    """
+    Apply an update to tasks in one UPDATE ... RETURNING - no select first
+    Everything depending on the old row (put_off_count, relative priority) is
+    worked out in SQL, so concurrent edits can't be lost. Rank and recurrence
+    depend on the new row and are set on the returned tasks; caller commits
+    """
+    if change.recurring_pattern and scheduler.parse_pattern(change.recurring_pattern) is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Can't understand recurring pattern {change.recurring_pattern!r}",
+        )
+
+    now = datetime.utcnow()
+    values = {"touched_at": now}
+    if change.status is not None:
+        values["status"] = change.status
+        if change.status == "put_off":
+            values["put_off_count"] = Task.put_off_count + case((Task.status != "put_off", 1), else_=0)
+    if change.priority_score is not None:
+        values["priority_score"] = change.priority_score
+    if priority_delta:
+        base = change.priority_score if change.priority_score is not None else func.coalesce(Task.priority_score, 0.5)
+        values["priority_score"] = func.max(0.0, func.min(1.0, base + priority_delta))
+    if change.notes is not None:
+        values["notes"] = change.notes
+    if change.due_by is not None:
+        values["due_by"] = change.due_by
+    if change.pinned is not None:
+        values["pinned"] = change.pinned
+
+    result = await session.execute(
+        update(Task).where(Task.id.in_(ids)).values(**values).returning(Task),
+        execution_options={"synchronize_session": False},
+    )
+    tasks = result.scalars().all()
+
+    for task in tasks:
+        if change.recurring_pattern is not None:
+            scheduler.schedule(task, change.recurring_pattern, now)
+        if task.status in scheduler.DISMISSED:
+            scheduler.schedule(task, None)  # Dismissed for good - it mustn't come back
+    for task, rank in zip(tasks, ranking.compute(tasks, now)):
+        task.rank_score = float(rank)
+
+    await session.flush()
+    for task in tasks:
+        session.expunge(task)  # A later op on the same ids must get the fresh rows back
+    return tasks
+
+
+@router.patch("/tasks/batch")
+async def batch_update_tasks(
+    batch: TaskBatch,
+    session: AsyncSession = Depends(get_write_session)
+):
+    """
+    Apply a list of operations in one transaction - all of them or none
+    Each op is a TaskUpdate for its `ids`, and can add `priority_delta` or
+    `delete` the tasks. Returns the tasks as they end up, the ids deleted and
+    the ids that didn't exist
+    """
+    total = sum(len(op.ids) for op in batch.ops)
+    if total > TASK_BATCH_MAX:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many task ids ({total}), max {TASK_BATCH_MAX} per request"
+        )
+
+    updated = {}
+    deleted = []
+    missing = []
+    rescheduled = False
+    for op in batch.ops:
+        if op.delete:
+            result = await session.execute(
+                delete(Task).where(Task.id.in_(op.ids)).returning(Task.id),
+                execution_options={"synchronize_session": False},
+            )
+            found = set(result.scalars())
+            deleted.extend(found)
+            for task_id in found:
+                updated.pop(task_id, None)
+        else:
+            tasks = await _update_tasks(session, op.ids, op, op.priority_delta)
+            found = {task.id for task in tasks}
+            updated.update((task.id, task) for task in tasks)
+            rescheduled = rescheduled or op.recurring_pattern is not None
+        missing.extend(task_id for task_id in op.ids if task_id not in found)
+
+    await session.commit()
+    events.notify()
+    if rescheduled:
+        work_queue.notify()  # The worker sleeps until the earliest next_due
+
+    metrics.inc("batch_ops", len(batch.ops))
+    seen = set(updated) | set(deleted)
+    return {
+        "tasks": [task.to_dict() for task in updated.values()],
+        "deleted": deleted,
+        "missing": list(dict.fromkeys(task_id for task_id in missing if task_id not in seen)),
+    }
+
+
 @router.patch("/tasks/{task_id}")
 async def update_task(
     task_id: int,
     task_update: TaskUpdate,
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_write_session)
 ):
     """Update a task"""
-    result = await session.execute(
-        select(Task).where(Task.id == task_id)
-    )
-    task = result.scalar_one_or_none()
-
-    if not task:
+    tasks = await _update_tasks(session, [task_id], task_update)
+    if not tasks:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    # Update fields
-    if task_update.status is not None:
-        task.status = task_update.status
-    if task_update.priority_score is not None:
-        task.priority_score = task_update.priority_score
-    if task_update.notes is not None:
-        task.notes = task_update.notes
-    if task_update.due_by is not None:
-        task.due_by = task_update.due_by
-    if task_update.pinned is not None:
-        task.pinned = task_update.pinned
-
-    task.touched_at = datetime.utcnow()
-
     await session.commit()
-    await session.refresh(task)
+    events.notify()
+    if task_update.recurring_pattern is not None:
+        work_queue.notify()  # The worker sleeps until the earliest next_due
 
-    return task.to_dict()
+    return tasks[0].to_dict()
 
 
 @router.delete("/tasks/{task_id}")
 async def delete_task(
     task_id: int,
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_write_session)
 ):
     """Delete a task"""
     result = await session.execute(
@@ -147,36 +584,41 @@ async def delete_task(
 
     await session.delete(task)
     await session.commit()
+    events.notify()
 
     return {"message": "Task deleted"}
 
 
 @router.get("/tasks/stats/overview")
-async def get_stats(session: AsyncSession = Depends(get_session)):
+async def get_stats(
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_session)
+):
     """Get overview stats"""
-    result = await session.execute(select(Task))
-    all_tasks = result.scalars().all()
+    not_modified = await _not_modified(request, response, session)
+    if not_modified:
+        return not_modified
 
-    stats = {
-        "total": len(all_tasks),
-        "by_status": {},
-        "life_critical_active": 0,
-        "quick_wins": 0,
-        "high_priority": 0,
-    }
+    return await read_stats(session)
 
-    for task in all_tasks:
-        # Count by status
-        status = task.status or "unknown"
-        stats["by_status"][status] = stats["by_status"].get(status, 0) + 1
 
-        # Count special categories
-        if task.is_life_critical and task.status == "active":
-            stats["life_critical_active"] += 1
-        if task.is_quick_win and task.status == "active":
-            stats["quick_wins"] += 1
-        if task.priority_score >= 0.7 and task.status == "active":
-            stats["high_priority"] += 1
+async def read_stats(session: AsyncSession) -> dict:
+    """Overview stats from the trigger-maintained counters, O(1) in history size"""
+    result = await session.execute(select(TaskCounter.name, TaskCounter.value))
+    counters = dict(result.all())
+
+    stats = {
+        "total": counters.get("total", 0),
+        "by_status": {
+            name.split(":", 1)[1]: value
+            for name, value in counters.items()
+            if name.startswith("status:") and value > 0
+        },
+        "life_critical_active": counters.get("life_critical_active", 0),
+        "quick_wins": counters.get("quick_wins", 0),
+        "high_priority": counters.get("high_priority", 0),
+    }
 
     return stats
 
@@ -198,65 +640,20 @@ async def process_captured_tasks(session: AsyncSession = Depends(get_session)):
     if not captured_tasks:
         return {"message": "No tasks to process", "count": 0}
 
-    # Get context: existing active tasks
-    result = await session.execute(
-        select(Task).where(Task.status == "active")
-    )
-    active_tasks = result.scalars().all()
-
-    # Process with LLM
-    new_task_dicts = [t.to_dict() for t in captured_tasks]
-    active_task_dicts = [t.to_dict() for t in active_tasks]
-
     try:
-        processed = await processor.process_new_tasks(
-            new_task_dicts,
-            active_task_dicts
-        )
-
-        # Update tasks in DB
-        for task, data in zip(captured_tasks, processed):
-            task.processed_text = data.get("processed_text")
-            task.priority_score = data.get("priority_score", 0.5)
-            task.category = data.get("category")
-            task.is_life_critical = data.get("is_life_critical", False)
-            task.is_quick_win = data.get("is_quick_win", False)
-            task.notes = data.get("notes", "")
-            task.status = "active"
-            task.touched_at = datetime.utcnow()
-
-        await session.commit()
+        count = await process_tasks(session, processor, captured_tasks)
 
         return {
             "message": "Tasks processed",
-            "count": len(captured_tasks)
+            "count": count
         }
     except Exception as e:
         print(f"Error processing tasks: {e}")
         return {"error": str(e)}, 500
 
 
-@router.get("/tasks/suggestions")
-async def get_suggestions(
-    user_state: Optional[str] = None,
-    session: AsyncSession = Depends(get_session)
-):
-    """Get AI suggestions for what to do next"""
-    processor = get_processor()
-
-    # Get active tasks
-    result = await session.execute(
-        select(Task).where(Task.status == "active")
-    )
-    active_tasks = result.scalars().all()
-
-    if not active_tasks:
-        return {"suggestions": "No active tasks. Add some tasks to get started!"}
-
-    task_dicts = [t.to_dict() for t in active_tasks]
-    suggestions = await processor.get_suggestions(task_dicts, user_state)
-
-    return {"suggestions": suggestions}
+# Active tasks considered for chat context, before the prompt budget trims them
+CHAT_CONTEXT_MAX = 200
 
 
 class ChatMessage(BaseModel):
@@ -264,6 +661,24 @@ class ChatMessage(BaseModel):
     include_context: bool = True
 
 
+async def _build_chat_prompt(
+    chat_input: ChatMessage,
+    session: AsyncSession,
+):
+    """Build (prompt, system_prompt, task_count) for a chat message"""
+    task_dicts = []
+    if chat_input.include_context:
+        # Highest priority first - the prompt builder keeps as many as fit its budget
+        result = await session.execute(
+            select(Task).where(Task.status == "active")
+            .order_by(Task.rank_score.desc(), Task.id)
+            .limit(CHAT_CONTEXT_MAX)
+        )
+        task_dicts = [task.to_dict() for task in result.scalars().all()]
+
+    return get_processor().build_chat_prompt(chat_input.message, task_dicts)
+
+
 @router.post("/chat")
 async def chat_with_assistant(
     chat_input: ChatMessage,
@@ -274,65 +689,69 @@ async def chat_with_assistant(
     Conversational interface for talking through tasks
     """
     processor = get_processor()
-
-    # Build context if requested
-    context_str = ""
-    active_tasks = []
-    if chat_input.include_context:
-        # Get active tasks
-        result = await session.execute(
-            select(Task).where(Task.status == "active")
-            .order_by(Task.priority_score.desc())
-            .limit(20)
-        )
-        active_tasks = result.scalars().all()
-
-        if active_tasks:
-            context_str = "\n# Current Active Tasks:\n\n"
-            for task in active_tasks:
-                text = task.processed_text or task.raw_input
-                priority = task.priority_score
-                flags = []
-                if task.is_life_critical:
-                    flags.append("CRITICAL")
-                if task.is_quick_win:
-                    flags.append("quick")
-                if task.pinned:
-                    flags.append("pinned")
-
-                flag_str = f" [{', '.join(flags)}]" if flags else ""
-                context_str += f"[{task.id}] [{priority:.2f}] {text}{flag_str}\n"
-
-            context_str += "\n"
-
-    # System prompt for conversational assistant
-    system_prompt = """You are a supportive task management assistant helping someone with ADHD, CPTSD, and memory issues.
-
-You have access to their current tasks and can:
-- Help them think through what to do
-- Break down overwhelming tasks
-- Offer encouragement and support
-- Suggest priorities based on their needs
-- Help them process anxiety about tasks
-
-Be conversational, supportive, and direct. No corporate speak. Be real with them."""
-
-    # Build full prompt
-    full_prompt = context_str + "User: " + chat_input.message
+    full_prompt, system_prompt, task_count = await _build_chat_prompt(chat_input, session)
 
     # Call model
     response = await processor._call_model(
         full_prompt,
         system_prompt=system_prompt,
-        temperature=0.7  # More conversational
+        temperature=0.7,  # More conversational
+        use_cache=False,  # Conversation should never replay an old answer
+        interactive=True,
     )
 
     return {
         "response": response,
-        "task_count": len(active_tasks)
+        "task_count": task_count
     }
 
 
+@router.post("/chat/stream")
+async def stream_chat_with_assistant(
+    chat_input: ChatMessage,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Streaming chat - NDJSON lines of {"token": ...}, then {"done": true, "task_count": N}
+    If the client disconnects, the upstream generation is cancelled
+    """
+    processor = get_processor()
+    full_prompt, system_prompt, task_count = await _build_chat_prompt(chat_input, session)
+    await session.close()  # Don't hold a connection while the model streams
+    processor.lanes.admit()  # A full lane is a 503 now, not an error line mid-stream
+
+    tokens = processor._stream_model(
+        full_prompt,
+        system_prompt=system_prompt,
+        temperature=0.7,  # More conversational
+        interactive=True,
+    )
+
+    return StreamingResponse(
+        _ndjson_stream(tokens, task_count=task_count),
+        media_type="application/x-ndjson",
+    )
+
+
+async def _single_token(text: str) -> AsyncIterator[str]:
+    yield text
+
+
+async def _ndjson_stream(tokens: AsyncIterator[str], **done_fields) -> AsyncIterator[str]:
+    """
+    Forward model tokens as NDJSON
+    Starlette cancels this generator when the client goes away; the
+    cancellation unwinds into the model stream and closes the Ollama request
+    """
+    try:
+        async for token in tokens:
+            yield json.dumps({"token": token}) + "\n"
+        yield json.dumps({"done": True, **done_fields}) + "\n"
+    except Exception as e:
+        print(f"Error streaming from model: {e}")
+        yield json.dumps({"error": str(e), "done": True}) + "\n"
+
+
 class SettingsUpdate(BaseModel):
     display_count: Optional[int] = None
     zero_indexed: Optional[bool] = None
@@ -1,24 +1,107 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, AsyncEngine
 from sqlalchemy.orm import sessionmaker
+from contextlib import asynccontextmanager
 from app.models.task import Base
+from app.models import queue  # noqa: F401 - registers work_queue table
+from app.models import stats  # noqa: F401 - registers task_counters table
+from app.models import events  # noqa: F401 - registers task_events table
+from app.models import embeddings  # noqa: F401 - registers task_embeddings table
+from app.migrations import run_migrations
+from app.services import query_stats
+import asyncio
 import os
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./data/tasks.db")
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+# Full statement logging - debugging only, it's slow and floods the logs.
+# Timings are always collected (see app/services/query_stats.py)
+SQL_ECHO = os.getenv("SQL_ECHO", "false").lower() == "true"
+
+# Connection profile applied on every connect - api and worker share the
+# same file, so both need WAL (readers never block the writer) and a busy
+# timeout (writers wait for each other instead of failing)
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "busy_timeout": os.getenv("SQLITE_BUSY_TIMEOUT", "5000"),  # ms
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "mmap_size": os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)),
+    "cache_size": os.getenv("SQLITE_CACHE_SIZE", "-20000"),  # negative = KiB
+}
+
+
+def create_engine_for(url: str) -> AsyncEngine:
+    """Create an async engine with the SQLite profile and transaction control"""
+    engine = create_async_engine(url, echo=SQL_ECHO)
+    query_stats.instrument(engine.sync_engine)
+
+    if engine.dialect.name != "sqlite":
+        return engine
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        # Let SQLAlchemy emit BEGIN itself (see _on_begin) instead of pysqlite
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {pragma}={value}")
+        cursor.close()
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _on_begin(conn):
+        # Write sessions take the write lock up front. A deferred transaction
+        # that reads and then writes can't wait on busy_timeout if another
+        # connection committed in between - it fails with "database is locked"
+        if conn.get_execution_options().get("sqlite_write"):
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+        else:
+            conn.exec_driver_sql("BEGIN")
+
+    return engine
+
+
+engine = create_engine_for(DATABASE_URL)
 
 async_session_maker = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
 
+write_session_maker = sessionmaker(
+    engine.execution_options(sqlite_write=True), class_=AsyncSession, expire_on_commit=False
+)
+
+# Single writer per process: writers queue here rather than spinning on
+# SQLite's busy handler; across processes BEGIN IMMEDIATE + busy_timeout
+# does the same job
+_write_lock = asyncio.Lock()
+
 
 async def init_db():
-    """Initialize database tables"""
+    """Initialize database tables and apply pending migrations"""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(run_migrations)
 
 
 async def get_session() -> AsyncSession:
     """Get database session"""
     async with async_session_maker() as session:
         yield session
+
+
+@asynccontextmanager
+async def write_session():
+    """
+    Session for a short read-modify-write transaction
+    Holds the process write lock until the block exits - never await the
+    model (or anything slow) inside it
+    """
+    async with _write_lock:
+        async with write_session_maker() as session:
+            yield session
+
+
+async def get_write_session() -> AsyncSession:
+    """Get a write session (FastAPI dependency)"""
+    async with write_session() as session:
+        yield session
@@ -1,7 +1,10 @@
-import httpx
 import os
 from typing import Optional, Dict, Any
-import json
+
+from app.llm.http import get_http_client
+from app.llm.lanes import get_lanes
+from app.llm.router import get_router
+from app.llm.structured import first_object
 
 
 class LLMClient:
@@ -17,12 +20,12 @@ class LLMClient:
         model_name: str,
         api_base: Optional[str] = None,
         api_key: Optional[str] = None,
-        timeout: int = 120,
     ):
         self.model_name = model_name
+        # One URL, or several with weights - requests are load balanced (app.llm.router)
         self.api_base = api_base or os.getenv("LLM_API_BASE", "http://localhost:11434")
         self.api_key = api_key or os.getenv("LLM_API_KEY", "")
-        self.timeout = timeout
+        self.router = get_router(self.api_base)
 
     async def chat(
         self,
@@ -30,61 +33,85 @@ class LLMClient:
         system_prompt: Optional[str] = None,
         temperature: float = 0.7,
         max_tokens: int = 2000,
+        json_mode: bool = False,
+        interactive: bool = False,
     ) -> str:
-        """Send a chat request to the LLM"""
+        """
+        Send a chat request to the LLM; json_mode asks the server for JSON-only output
+        interactive requests take the interactive lane and are hedged across endpoints
+        """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                # OpenAI-compatible format
-                messages = []
-                if system_prompt:
-                    messages.append({"role": "system", "content": system_prompt})
-                messages.append({"role": "user", "content": prompt})
-
-                payload = {
-                    "model": self.model_name,
-                    "messages": messages,
-                    "temperature": temperature,
-                    "max_tokens": max_tokens,
-                }
-
-                headers = {"Content-Type": "application/json"}
-                if self.api_key:
-                    headers["Authorization"] = f"Bearer {self.api_key}"
-
-                # Try OpenAI-compatible endpoint first
-                response = await client.post(
-                    f"{self.api_base}/v1/chat/completions",
-                    json=payload,
-                    headers=headers,
+            async with get_lanes(self.model_name).slot(interactive):
+                response = await self.router.request(
+                    lambda base: self._post(base, prompt, system_prompt, temperature, max_tokens, json_mode),
+                    hedge=interactive,
                 )
-
-                if response.status_code == 200:
-                    result = response.json()
+            if response.status_code == 200:
+                result = response.json()
+                if "choices" in result:
                     return result["choices"][0]["message"]["content"]
-                else:
-                    # Fallback to Ollama format if OpenAI format fails
-                    ollama_payload = {
-                        "model": self.model_name,
-                        "prompt": prompt,
-                        "system": system_prompt,
-                        "stream": False,
-                    }
-                    response = await client.post(
-                        f"{self.api_base}/api/generate",
-                        json=ollama_payload,
-                        headers={"Content-Type": "application/json"},
-                    )
-                    if response.status_code == 200:
-                        result = response.json()
-                        return result.get("response", "")
-
-                raise Exception(f"LLM API error: {response.status_code} - {response.text}")
+                return result.get("response", "")
+
+            raise Exception(f"LLM API error: {response.status_code} - {response.text}")
 
         except Exception as e:
             print(f"Error calling LLM: {e}")
             # Return a safe fallback
             return f"[LLM Error: {str(e)}]"
 
+    async def _post(
+        self,
+        api_base: str,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        json_mode: bool,
+    ):
+        """One endpoint: OpenAI-compatible format first, Ollama's if that's refused"""
+        client = get_http_client()
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+
+        payload = {
+            "model": self.model_name,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        if json_mode:
+            payload["response_format"] = {"type": "json_object"}
+
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+
+        # Try OpenAI-compatible endpoint first
+        response = await client.post(
+            f"{api_base}/v1/chat/completions",
+            json=payload,
+            headers=headers,
+        )
+        if response.status_code == 200:
+            return response
+
+        # Fallback to Ollama format if OpenAI format fails
+        ollama_payload = {
+            "model": self.model_name,
+            "prompt": prompt,
+            "system": system_prompt,
+            "stream": False,
+        }
+        if json_mode:
+            ollama_payload["format"] = "json"
+        return await client.post(
+            f"{api_base}/api/generate",
+            json=ollama_payload,
+            headers={"Content-Type": "application/json"},
+        )
+
 
 class Secretary(LLMClient):
     """The secretary - receives raw input and interprets it"""
@@ -116,18 +143,12 @@ Example output: {"processed_text": "Order pillows from Walmart", "implicit_urgen
 
 Return ONLY valid JSON, no other text."""
 
-        response = await self.chat(raw_input, system_prompt=system_prompt, temperature=0.3)
+        response = await self.chat(raw_input, system_prompt=system_prompt, temperature=0.3, json_mode=True)
 
-        # Try to parse JSON from response
-        try:
-            # Find JSON in response
-            start = response.find("{")
-            end = response.rfind("}") + 1
-            if start >= 0 and end > start:
-                json_str = response[start:end]
-                return json.loads(json_str)
-        except:
-            pass
+        # First complete object - tolerates chatter or a second object around it
+        parsed = first_object(response)
+        if parsed is not None:
+            return parsed
 
         # Fallback if JSON parsing fails
         return {
@@ -0,0 +1,172 @@
+"""
+Persistent cache for LLM responses
+Keyed on model, normalized prompt, system prompt and temperature.
+Stored in its own SQLite file with TTL, LRU eviction and a size cap.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional
+
+from app.services import metrics
+
+
+class ResponseCache:
+    """Content-addressed response cache - safe to share across tasks"""
+
+    def __init__(
+        self,
+        path: str = "./data/llm_cache.db",
+        max_entries: int = 5000,
+        max_bytes: int = 50 * 1024 * 1024,
+        ttl: int = 86400,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                elapsed REAL NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_llm_cache_last_used ON llm_cache (last_used_at)"
+        )
+        self._entries, self._bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+        ).fetchone()
+
+    @staticmethod
+    def make_key(
+        model: str,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float,
+    ) -> str:
+        """Hash of everything that determines the answer"""
+        normalized = " ".join(prompt.split())
+        material = json.dumps(
+            [model, normalized, system_prompt or "", round(temperature, 3)]
+        )
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    async def get(self, key: str, valid: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        """
+        The cached answer, or None. An answer that fails `valid` is dropped
+        and counts as a miss - no hit, no saved seconds
+        """
+        return await asyncio.to_thread(self._get, key, valid)
+
+    async def put(self, key: str, response: str, elapsed: float):
+        await asyncio.to_thread(self._put, key, response, elapsed)
+
+    def _get(self, key: str, valid: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, elapsed, created_at, size FROM llm_cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+
+            if row is None:
+                metrics.inc("llm_cache_misses")
+                return None
+
+            response, elapsed, created_at, size = row
+            if now - created_at > self.ttl or (valid is not None and not valid(response)):
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._entries -= 1
+                self._bytes -= size
+                metrics.inc("llm_cache_misses")
+                return None
+
+            self._conn.execute(
+                "UPDATE llm_cache SET last_used_at = ?, hits = hits + 1 WHERE key = ?",
+                (now, key),
+            )
+
+        metrics.inc("llm_cache_hits")
+        metrics.inc("llm_cache_saved_seconds", elapsed)
+        return response
+
+    def _put(self, key: str, response: str, elapsed: float):
+        now = time.time()
+        size = len(response.encode())
+        with self._lock:
+            old = self._conn.execute(
+                "SELECT size FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                """INSERT OR REPLACE INTO llm_cache
+                   (key, response, size, elapsed, created_at, last_used_at, hits)
+                   VALUES (?, ?, ?, ?, ?, ?, 0)""",
+                (key, response, size, elapsed, now, now),
+            )
+            if old:
+                self._bytes -= old[0]
+            else:
+                self._entries += 1
+            self._bytes += size
+
+            self._evict(now)
+
+        metrics.set_gauge("llm_cache_entries", self._entries)
+        metrics.set_gauge("llm_cache_bytes", self._bytes)
+
+    def _evict(self, now: float):
+        """Drop expired entries, then least recently used until under the caps"""
+        if self._entries <= self.max_entries and self._bytes <= self.max_bytes:
+            return
+
+        self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl,))
+        self._entries, self._bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+        ).fetchone()
+
+        while self._entries > self.max_entries or self._bytes > self.max_bytes:
+            # Evict in batches of ~10% so this doesn't run on every put
+            batch = max(1, self.max_entries // 10)
+            rows = self._conn.execute(
+                "SELECT key, size FROM llm_cache ORDER BY last_used_at LIMIT ?",
+                (batch,),
+            ).fetchall()
+            if not rows:
+                break
+            self._conn.executemany(
+                "DELETE FROM llm_cache WHERE key = ?", [(key,) for key, _ in rows]
+            )
+            self._entries -= len(rows)
+            self._bytes -= sum(size for _, size in rows)
+            metrics.inc("llm_cache_evictions", len(rows))
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits, saved = self._conn.execute(
+                "SELECT COALESCE(SUM(hits), 0), COALESCE(SUM(hits * elapsed), 0) FROM llm_cache"
+            ).fetchone()
+        return {
+            "entries": self._entries,
+            "bytes": self._bytes,
+            "lifetime_hits": hits,
+            "lifetime_saved_seconds": round(saved, 3),
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,144 @@
+"""
+Text embeddings for similarity search
+Ollama's /api/embeddings in normal use; a hashing embedder stands in where
+no embedding model is available (tests, benchmarks, EMBED_BACKEND=hash)
+
+Embedding calls are routed across the LLM endpoints like model calls and
+take background slots in the task model's lanes, so a burst of them waits
+for chat instead of competing with it on the same box. After a failure the
+embedder stands down for EMBED_RETRY_AFTER seconds (doubling while it keeps
+failing, up to an hour) - similarity is optional, and a missing embedding
+model shouldn't cost every capture a failed request.
+"""
+import asyncio
+import hashlib
+import os
+import re
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from app.llm.http import get_http_client, request_timeout
+from app.llm.lanes import Lanes, get_lanes
+from app.llm.router import get_router
+
+MAX_RETRY_AFTER = 3600.0
+
+
+class EmbedderUnavailable(Exception):
+    """The embedder failed recently and is standing down"""
+
+
+class OllamaEmbedder:
+    """Embeds through Ollama, a bounded number of requests at a time"""
+
+    def __init__(
+        self,
+        model_name: str = "nomic-embed-text",
+        api_base: str = "http://localhost:11434",
+        timeout: int = 30,
+        max_concurrency: int = 4,
+        lanes: Optional[Lanes] = None,
+        retry_after: float = 300.0,
+    ):
+        self.model_name = model_name
+        # One URL, or several with weights - see app.llm.router
+        self.api_base = api_base
+        self.router = get_router(api_base, pool="embeddings")
+        # Background slots on the boxes' main model - chat goes first
+        self.lanes = lanes or get_lanes(model_name)
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._backoff = retry_after
+        self._down_until = 0.0
+
+    def available(self) -> bool:
+        """False while standing down after a failure"""
+        return time.monotonic() >= self._down_until
+
+    async def _embed_one(self, text: str) -> np.ndarray:
+        client = get_http_client()
+        payload = {"model": self.model_name, "prompt": text}
+        async with self._semaphore, self.lanes.slot():
+            response = await self.router.request(
+                lambda base: client.post(f"{base}/api/embeddings", json=payload, timeout=request_timeout(self.timeout))
+            )
+        if response.status_code != 200:
+            raise Exception(f"API error: {response.status_code}")
+        return np.asarray(response.json()["embedding"], dtype=np.float32)
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        """One row per text; raises EmbedderUnavailable while standing down"""
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        if not self.available():
+            raise EmbedderUnavailable(f"{self.model_name} failed recently")
+        calls = [asyncio.ensure_future(self._embed_one(text)) for text in texts]
+        try:
+            vectors = np.vstack(await asyncio.gather(*calls))
+        except Exception as e:
+            for call in calls:
+                call.cancel()  # One failure is enough to know - don't send the rest
+            self._down_until = time.monotonic() + self._backoff
+            print(f"[Embeddings] {self.model_name} failed ({e}) - not embedding for {self._backoff:.0f}s"
+                  f" (is it pulled? ollama pull {self.model_name})")
+            self._backoff = min(self._backoff * 2, MAX_RETRY_AFTER)
+            raise
+        self._backoff = self.retry_after
+        return vectors
+
+
+class HashingEmbedder:
+    """
+    Feature hashing of words and character trigrams - no model needed and
+    deterministic, so near-identical wording lands close together
+    """
+
+    def __init__(self, dim: int = 256):
+        self.model_name = f"hash-{dim}"
+        self.dim = dim
+
+    def available(self) -> bool:
+        return True
+
+    def _vector(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        words = re.findall(r"\w+", text.casefold())
+        features = words + [
+            f"#{word[i:i + 3]}" for word in words for i in range(max(1, len(word) - 2))
+        ]
+        for feature in features:
+            digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+            index = int.from_bytes(digest[:4], "little") % self.dim
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+        return vector
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.vstack([self._vector(text) for text in texts])
+
+
+_embedder = None
+_resolved = False
+
+
+def get_embedder() -> Optional[object]:
+    """Configured embedder, or None when EMBED_BACKEND=off"""
+    global _embedder, _resolved
+    if not _resolved:
+        backend = os.getenv("EMBED_BACKEND", "ollama").lower()
+        if backend == "ollama":
+            _embedder = OllamaEmbedder(
+                model_name=os.getenv("EMBED_MODEL", "nomic-embed-text"),
+                api_base=os.getenv("LLM_ENDPOINTS") or os.getenv("OLLAMA_API_BASE", "http://localhost:11434"),
+                max_concurrency=int(os.getenv("EMBED_CONCURRENCY", "4")),
+                lanes=get_lanes(os.getenv("TASK_MODEL", "gpt-oss-20b-assistant:latest")),
+                retry_after=float(os.getenv("EMBED_RETRY_AFTER", "300")),
+            )
+        elif backend == "hash":
+            _embedder = HashingEmbedder(int(os.getenv("EMBED_DIM", "256")))
+        _resolved = True
+    return _embedder
@@ -0,0 +1,64 @@
+"""
+Shared HTTP connection pool for all LLM calls
+One keep-alive httpx client per process, owned by the API lifespan or the
+worker, so batches, suggestions and chat reuse warm connections
+"""
+import os
+from typing import Optional
+
+import httpx
+
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _http2_enabled() -> bool:
+    """HTTP/2 needs the optional h2 package; negotiated via ALPN on https endpoints"""
+    setting = os.getenv("LLM_HTTP2", "auto").lower()
+    if setting in ("0", "false", "no", "off"):
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        if setting != "auto":
+            print("[LLM] LLM_HTTP2 requested but h2 is not installed - using HTTP/1.1")
+        return False
+    return True
+
+
+def request_timeout(read: Optional[float] = None) -> httpx.Timeout:
+    """
+    The LLM_*_TIMEOUT settings, optionally with another read timeout - pass
+    this, never a bare number, to override the client's timeout per request
+    """
+    return httpx.Timeout(
+        read if read is not None else float(os.getenv("LLM_TIMEOUT", "120")),
+        connect=float(os.getenv("LLM_CONNECT_TIMEOUT", "5")),
+        pool=float(os.getenv("LLM_POOL_TIMEOUT", "30")),
+    )
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Build a pooled client from the LLM_POOL_* / LLM_*_TIMEOUT settings"""
+    limits = httpx.Limits(
+        max_connections=int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "10")),
+        max_keepalive_connections=int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "5")),
+        keepalive_expiry=float(os.getenv("LLM_POOL_KEEPALIVE_EXPIRY", "60")),
+    )
+    return httpx.AsyncClient(limits=limits, timeout=request_timeout(), http2=_http2_enabled())
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get or create the shared client"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+    return _client
+
+
+async def close_http_client():
+    """Close the shared client - call on shutdown"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
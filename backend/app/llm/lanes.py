@@ -0,0 +1,237 @@
+"""
+Priority lanes for model calls
+Every model call takes a slot from its model's lanes first. At most
+LLM_MODEL_CONCURRENCY calls per model run at once, and LLM_INTERACTIVE_RESERVE
+of those slots only ever go to interactive calls (chat, suggestions). A freed
+slot goes to a waiting interactive call before any background one
+(processing batches), and background calls don't start while interactive
+ones are waiting - they're deferred.
+
+Admission control: at most LLM_INTERACTIVE_QUEUE interactive calls wait;
+past that a call is refused straight away (Overloaded, a 503 with
+Retry-After) rather than piling up. Background calls wait as long as it takes.
+
+Preemption: an interactive call that finds every slot busy asks the newest
+background call to yield. A preempted stream stops at its next token (which
+closes the request, so Ollama stops generating) and raises Preempted; the
+processor keeps the answers it already parsed and queues again for the rest.
+
+The API and a separate worker process have lanes of their own, so the API
+also tells the worker over its wake-up socket when interactive calls start
+and stop. Meanwhile the worker defers and preempts its background calls as
+if they were local - for at most LLM_INTERACTIVE_HOLD seconds, in case the
+"stopped" message is lost.
+
+Queue waits are the llm_queue_wait_seconds_{interactive,background}
+histograms in /metrics.
+"""
+import asyncio
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, List, Optional
+
+from app.services import metrics, work_queue
+
+INTERACTIVE_HOLD = float(os.getenv("LLM_INTERACTIVE_HOLD", "120"))
+
+_STARTED = b"i"
+_STOPPED = b"d"
+
+
+class Overloaded(Exception):
+    """Too many interactive calls already waiting - try again shortly"""
+
+
+class Preempted(Exception):
+    """A background call gave up its slot to an interactive one"""
+
+
+class Slot:
+    """A running call's hold on the model"""
+
+    def __init__(self, interactive: bool):
+        self.interactive = interactive
+        self.preempted = False
+
+    def check(self):
+        """Raise Preempted if an interactive call wants this slot - call between tokens"""
+        if self.preempted:
+            raise Preempted("Yielded to an interactive call")
+
+
+class Lanes:
+    """Interactive and background queues in front of one model"""
+
+    def __init__(self, model: str, concurrency: int = 2, reserve: int = 0, queue_limit: int = 8):
+        self.model = model
+        self.concurrency = max(1, concurrency)
+        self.reserve = min(max(0, reserve), self.concurrency - 1)
+        self.queue_limit = queue_limit
+        self.running: List[Slot] = []
+        self._waiting: Dict[bool, Deque[asyncio.Future]] = {True: deque(), False: deque()}
+        self._recheck: Optional[asyncio.TimerHandle] = None
+
+    def _can_start(self, interactive: bool) -> bool:
+        if len(self.running) >= self.concurrency:
+            return False
+        if interactive:
+            return True
+        if self._waiting[True] or _remote_active():
+            return False
+        return len(self.running) < self.concurrency - self.reserve
+
+    def _grant(self, interactive: bool) -> Slot:
+        slot = Slot(interactive)
+        self.running.append(slot)
+        return slot
+
+    def _dispatch(self):
+        """Hand freed slots to waiters, interactive first"""
+        for interactive in (True, False):
+            queue = self._waiting[interactive]
+            while queue and self._can_start(interactive):
+                waiter = queue.popleft()
+                if not waiter.done():
+                    waiter.set_result(self._grant(interactive))
+        if self._waiting[False] and _remote_active() and self._recheck is None:
+            # Deferred for the API's calls - look again when the hold runs out
+            self._recheck = asyncio.get_running_loop().call_later(
+                _remote_until - time.monotonic() + 0.01, self._recheck_deferred
+            )
+
+    def _recheck_deferred(self):
+        self._recheck = None
+        self._dispatch()
+
+    def preempt(self) -> bool:
+        """Ask the newest background call to yield; False if there's none to ask"""
+        for slot in reversed(self.running):
+            if not slot.interactive and not slot.preempted:
+                slot.preempted = True
+                metrics.inc("llm_preemptions")
+                return True
+        return False
+
+    def admit(self):
+        """Refuse an interactive call up front if its lane is full - before a response starts streaming"""
+        would_wait = self._waiting[True] or not self._can_start(True)
+        if would_wait and len(self._waiting[True]) >= self.queue_limit:
+            metrics.inc("llm_interactive_rejected")
+            raise Overloaded(f"{self.model} is busy - {len(self._waiting[True])} chat requests already waiting")
+
+    @asynccontextmanager
+    async def slot(self, interactive: bool = False) -> AsyncIterator[Slot]:
+        """Hold a slot for one model call"""
+        lane = "interactive" if interactive else "background"
+        queue = self._waiting[interactive]
+        started = time.monotonic()
+        free = not queue and self._can_start(interactive)
+        if interactive:
+            self.admit()
+            _interactive_started()
+        try:
+            if free:
+                slot = self._grant(interactive)
+            else:
+                slot = await self._wait(queue, interactive)
+            metrics.observe(f"llm_queue_wait_seconds_{lane}", time.monotonic() - started)
+            try:
+                yield slot
+            finally:
+                self._release(slot)
+        finally:
+            if interactive:
+                _interactive_stopped()
+
+    async def _wait(self, queue: Deque[asyncio.Future], interactive: bool) -> Slot:
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        if interactive and len(self.running) >= self.concurrency:
+            self.preempt()
+        self._dispatch()  # A deferred lane may be free again
+        try:
+            return await waiter
+        except asyncio.CancelledError:
+            if waiter in queue:
+                queue.remove(waiter)
+            elif waiter.done() and not waiter.cancelled():
+                self._release(waiter.result())  # Granted just as we gave up
+            raise
+
+    def _release(self, slot: Slot):
+        self.running.remove(slot)
+        self._dispatch()
+
+    def stats(self) -> Dict:
+        return {
+            "concurrency": self.concurrency,
+            "reserve": self.reserve,
+            "running_interactive": sum(1 for slot in self.running if slot.interactive),
+            "running_background": sum(1 for slot in self.running if not slot.interactive),
+            "waiting_interactive": len(self._waiting[True]),
+            "waiting_background": len(self._waiting[False]),
+        }
+
+
+_lanes: Dict[str, Lanes] = {}
+
+
+def get_lanes(model: str) -> Lanes:
+    """The lanes for a model - shared by everything in this process that calls it"""
+    lanes = _lanes.get(model)
+    if lanes is None:
+        lanes = _lanes[model] = Lanes(
+            model,
+            concurrency=int(os.getenv("LLM_MODEL_CONCURRENCY", "2")),
+            reserve=int(os.getenv("LLM_INTERACTIVE_RESERVE", "0")),
+            queue_limit=int(os.getenv("LLM_INTERACTIVE_QUEUE", "8")),
+        )
+    return lanes
+
+
+def stats() -> Dict[str, Dict]:
+    return {model: lanes.stats() for model, lanes in _lanes.items()}
+
+
+# Interactive calls in flight in this process, and until when another
+# process (the API, seen from the worker) has some
+_interactive = 0
+_remote_until = 0.0
+
+
+def _remote_active() -> bool:
+    return time.monotonic() < _remote_until
+
+
+def _interactive_started():
+    global _interactive
+    _interactive += 1
+    if _interactive == 1:
+        work_queue.send(_STARTED)
+
+
+def _interactive_stopped():
+    global _interactive
+    _interactive -= 1
+    if _interactive == 0:
+        work_queue.send(_STOPPED)
+
+
+def _remote_started():
+    global _remote_until
+    _remote_until = time.monotonic() + INTERACTIVE_HOLD
+    for lanes in _lanes.values():
+        lanes.preempt()
+
+
+def _remote_stopped():
+    global _remote_until
+    _remote_until = 0.0
+    for lanes in _lanes.values():
+        lanes._dispatch()
+
+
+work_queue.on_message(_STARTED, _remote_started)
+work_queue.on_message(_STOPPED, _remote_stopped)
@@ -2,12 +2,21 @@
 Single-model task processor using gpt-oss-assistant
 Modular design for future expansion
 """
-import httpx
+import asyncio
 import os
 import json
-from typing import List, Dict, Any, Optional
+import time
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple, Union
 from datetime import datetime
 
+from app.llm.cache import ResponseCache
+from app.llm.http import get_http_client
+from app.llm.lanes import Overloaded, Preempted, get_lanes
+from app.llm.prompts import PromptBuilder, clip, estimate_tokens
+from app.llm.router import get_router
+from app.llm.structured import TASKS_SCHEMA, ObjectStreamParser, parse_objects
+from app.services import metrics
+
 
 class TaskProcessor:
     """
@@ -19,72 +28,474 @@ class TaskProcessor:
         self,
         model_name: str = "gpt-oss-20b-assistant:latest",
         api_base: str = "http://localhost:11434",
-        timeout: int = 120,
+        chunk_token_budget: int = 1500,
+        max_chunk_size: int = 20,
+        max_concurrency: int = 2,
+        cache: Optional[ResponseCache] = None,
+        process_token_budget: int = 4000,
+        suggest_token_budget: int = 2000,
+        chat_token_budget: int = 3000,
+        item_token_cap: int = 100,
+        keep_alive: Optional[Union[str, int]] = None,
+        cold_load_seconds: float = 0.5,
+        structured_output: bool = True,
+        parse_retries: int = 2,
     ):
         self.model_name = model_name
+        # One URL, or several with weights - see app.llm.router
         self.api_base = api_base
-        self.timeout = timeout
+        self.router = get_router(api_base)
+        # Interactive calls go ahead of (and can preempt) processing batches
+        self.lanes = get_lanes(model_name)
+        self.chunk_token_budget = chunk_token_budget
+        self.max_chunk_size = max_chunk_size
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self.cache = cache
+        # Whole-prompt budgets (system prompt included) and the cap on any one task's text
+        self.process_token_budget = process_token_budget
+        self.suggest_token_budget = suggest_token_budget
+        self.chat_token_budget = chat_token_budget
+        self.item_token_cap = item_token_cap
+        # How long Ollama keeps the model loaded after a call ("30m", seconds, -1 = forever)
+        self.keep_alive = keep_alive
+        self.cold_load_seconds = cold_load_seconds
+        self._last_call = time.monotonic()  # Last request to Ollama
+        # Constrain processing output to TASKS_SCHEMA, re-ask for tasks that still don't parse
+        self.structured_output = structured_output
+        self.parse_retries = parse_retries
+
+    def _payload(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        stream: bool,
+        format: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        payload = {
+            "model": self.model_name,
+            "prompt": prompt,
+            "stream": stream,
+            "options": {"temperature": temperature},
+        }
+        if system_prompt:
+            payload["system"] = system_prompt
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        if format is not None:
+            payload["format"] = format
+        return payload
+
+    def _record_timing(self, data: Dict[str, Any], elapsed: float, probe: bool = False):
+        """
+        Split call latency by whether Ollama had to load the model first
+        (load_duration, in ns) - cold calls are what keep_alive and warm-up
+        avoid. Warm-up and keep-warm probes only count model loads
+        """
+        self._last_call = time.monotonic()
+        load = data.get("load_duration", 0) / 1e9
+        cold = load >= self.cold_load_seconds
+        if cold:
+            metrics.inc("llm_cold_loads")
+            metrics.observe("llm_model_load_seconds", load)
+            print(f"[LLM] {self.model_name} was not loaded - load took {load:.1f}s")
+        if probe:
+            return
+        metrics.observe("llm_cold_call_seconds" if cold else "llm_warm_call_seconds", elapsed)
+        if "prompt_eval_count" in data:
+            # Falls when Ollama reuses a cached prompt prefix
+            metrics.observe("llm_prompt_eval_tokens", data["prompt_eval_count"])
+
+    async def warm_up(self):
+        """
+        Load the model and prefill the processing system prompt on every
+        endpoint, so the first real call neither waits for the load nor
+        re-reads the shared prefix, wherever it's routed
+        """
+        await asyncio.gather(*(self._warm_up(url) for url in self.router.urls))
+
+    async def _warm_up(self, api_base: str):
+        started = time.monotonic()
+        try:
+            client = get_http_client()
+            # An empty prompt only loads the model
+            response = await client.post(
+                f"{api_base}/api/generate",
+                json=self._payload("", None, 0.0, stream=False),
+            )
+            if response.status_code != 200:
+                raise Exception(f"API error: {response.status_code}")
+            self._record_timing(response.json(), time.monotonic() - started, probe=True)
+
+            payload = self._payload("Ready?", self._get_system_prompt(), 0.0, stream=False)
+            payload["options"]["num_predict"] = 1
+            response = await client.post(f"{api_base}/api/generate", json=payload)
+            if response.status_code != 200:
+                raise Exception(f"API error: {response.status_code}")
+            self._last_call = time.monotonic()
+            print(f"[LLM] Warmed up {self.model_name} on {api_base} in {time.monotonic() - started:.1f}s")
+        except Exception as e:
+            print(f"[LLM] Warm-up of {api_base} failed: {e}")
+
+    async def keep_warm(self, interval: float):
+        """Ping the model on every endpoint whenever nothing has used it for `interval` seconds"""
+        while True:
+            idle = time.monotonic() - self._last_call
+            if idle < interval:
+                await asyncio.sleep(interval - idle)
+                continue
+            await asyncio.gather(*(self._ping(url) for url in self.router.urls))
+            self._last_call = time.monotonic()  # Also paces retries after a failed ping
+
+    async def _ping(self, api_base: str):
+        try:
+            response = await get_http_client().post(
+                f"{api_base}/api/generate",
+                json=self._payload("", None, 0.0, stream=False),
+            )
+            if response.status_code != 200:
+                raise Exception(f"API error: {response.status_code}")
+            self._record_timing(response.json(), 0.0, probe=True)
+            metrics.inc("llm_keep_warm_pings")
+        except Exception as e:
+            print(f"[LLM] Keep-warm ping of {api_base} failed: {e}")
 
     async def _call_model(
         self,
         prompt: str,
         system_prompt: Optional[str] = None,
         temperature: float = 0.3,
+        use_cache: bool = True,
+        interactive: bool = False,
     ) -> str:
-        """Call the LLM via Ollama API"""
+        """
+        Call the LLM via Ollama API
+        Answers come from the response cache when one is configured; pass
+        use_cache=False for conversational calls that must not repeat
+        interactive calls (someone is waiting) take the interactive lane and
+        are hedged across endpoints; they raise Overloaded if the lane is full
+        """
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = self.cache.make_key(self.model_name, prompt, system_prompt, temperature)
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                payload = {
-                    "model": self.model_name,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {"temperature": temperature},
-                }
-
-                if system_prompt:
-                    payload["system"] = system_prompt
-
-                response = await client.post(
-                    f"{self.api_base}/api/generate",
-                    json=payload,
+            client = get_http_client()
+            payload = self._payload(prompt, system_prompt, temperature, stream=False)
+            async with self.lanes.slot(interactive):
+                started = time.monotonic()
+                response = await self.router.request(
+                    lambda base: client.post(f"{base}/api/generate", json=payload),
+                    hedge=interactive,
                 )
 
-                if response.status_code == 200:
-                    result = response.json()
-                    return result.get("response", "")
-                else:
-                    raise Exception(f"API error: {response.status_code}")
+            if response.status_code != 200:
+                raise Exception(f"API error: {response.status_code}")
 
+            data = response.json()
+            self._record_timing(data, time.monotonic() - started)
+            text = data.get("response", "")
+            if cache_key and text:
+                await self.cache.put(cache_key, text, time.monotonic() - started)
+            return text
+
+        except Overloaded:
+            raise
         except Exception as e:
             print(f"Error calling model: {e}")
             return ""
 
+    async def _stream_model(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.3,
+        use_cache: bool = False,
+        format: Optional[Dict[str, Any]] = None,
+        interactive: bool = False,
+    ) -> AsyncIterator[str]:
+        """
+        Call the LLM with streaming on, yielding tokens as Ollama produces them
+        Closing the generator early closes the upstream request, which makes
+        Ollama stop generating
+        With use_cache, a cached answer is yielded in one piece and a fully
+        streamed answer is stored
+        `format` is Ollama's structured output: "json" or a JSON schema
+        interactive streams take the interactive lane and are hedged across
+        endpoints until the first token; a background stream raises Preempted
+        when an interactive call needs its slot
+        """
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = self.cache.make_key(self.model_name, prompt, system_prompt, temperature)
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+
+        parts = []
+        client = get_http_client()
+        payload = self._payload(prompt, system_prompt, temperature, stream=True, format=format)
+
+        def send(base: str):
+            request = client.build_request("POST", f"{base}/api/generate", json=payload)
+            return client.send(request, stream=True)
+
+        async with self.lanes.slot(interactive) as slot:
+            started = time.monotonic()
+            lines = self.router.stream(send, hedge=interactive)
+            try:
+                async for line in lines:
+                    slot.check()
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("response"):
+                        parts.append(chunk["response"])
+                        yield chunk["response"]
+                    if chunk.get("done"):
+                        self._record_timing(chunk, time.monotonic() - started)
+                        if cache_key and parts:
+                            await self.cache.put(cache_key, "".join(parts), time.monotonic() - started)
+                        break
+            finally:
+                await lines.aclose()
+
     async def process_new_tasks(
         self,
         new_tasks: List[Dict[str, Any]],
         existing_tasks: List[Dict[str, Any]] = None,
+        related: Optional[Dict[int, Dict[str, Any]]] = None,
     ) -> List[Dict[str, Any]]:
         """
         Process new tasks with full context awareness
         Returns updated task data for each new task
+        `related` maps a new task's id to similar earlier tasks and the
+        active task it probably repeats (see services.similarity)
+
+        Tasks are split into chunks that fit the token budget and sent to the
+        model with bounded concurrency, so a burst of captures doesn't become
+        one giant prompt that fails as a whole
+
+        Answers are cached per task, on the normalized raw input: the prompt
+        carries timestamps and the active list, so it never repeats, but
+        "meds" captured again gets the answer it got last time
         """
+        if not new_tasks:
+            return []
+
         existing_tasks = existing_tasks or []
+        related = related or {}
+        started = time.monotonic()
 
-        # Build context
-        context_prompt = self._build_context_prompt(new_tasks, existing_tasks)
+        cached = await self._cached_answers(new_tasks)
+        pending = [task for i, task in enumerate(new_tasks) if i not in cached]
+        chunks = self._chunk_tasks(pending)
+        counts = {"calls": 0, "failures": 0, "parsed": 0, "unparsed": 0}
 
-        # Call model
-        response = await self._call_model(
-            context_prompt,
-            system_prompt=self._get_system_prompt(),
-            temperature=0.3,
+        results = await asyncio.gather(
+            *[self._process_chunk(chunk, existing_tasks, related, counts) for chunk in chunks]
+        )
+        answered = iter(data for chunk_result in results for data in chunk_result)
+        answers = [cached[i] if i in cached else next(answered) for i in range(len(new_tasks))]
+
+        elapsed = time.monotonic() - started
+        throughput = len(new_tasks) / elapsed if elapsed > 0 else 0.0
+        failure_rate = counts["failures"] / counts["calls"] if counts["calls"] else 0.0
+
+        metrics.inc("llm_chunks", counts["calls"])
+        metrics.inc("llm_chunk_failures", counts["failures"])
+        # Per task and per call: a retried task counts as unparsed, then parsed
+        metrics.inc("llm_tasks_parsed", counts["parsed"])
+        metrics.inc("llm_tasks_unparsed", counts["unparsed"])
+        answered = counts["parsed"] + counts["unparsed"]
+        if answered:
+            metrics.set_gauge("llm_parse_success_rate", round(counts["parsed"] / answered, 3))
+        metrics.set_gauge("batch_tasks_per_second", round(throughput, 3))
+        metrics.set_gauge("llm_chunk_failure_rate", round(failure_rate, 3))
+        metrics.observe("batch_tasks_per_second", throughput)
+        print(
+            f"[Processor] {len(new_tasks)} tasks ({len(cached)} cached) in {len(chunks)} chunks "
+            f"({counts['failures']}/{counts['calls']} calls incomplete, "
+            f"{counts['parsed']}/{counts['parsed'] + counts['unparsed']} task answers parsed), "
+            f"{throughput:.2f} tasks/s"
         )
 
-        # Parse response
-        return self._parse_response(response, new_tasks)
+        return answers
+
+    def _answer_key(self, task: Dict[str, Any]) -> str:
+        """Cache key for one task's processing answer - nothing volatile in it"""
+        text = " ".join(task.get("raw_input", "").casefold().split())
+        return self.cache.make_key(self.model_name, f"process: {text}", self._get_system_prompt(), 0.3)
+
+    def _load_answer(self, text: str) -> Optional[Dict[str, Any]]:
+        try:
+            return self._clean_answer(json.loads(text))
+        except ValueError:
+            return None
+
+    async def _cached_answers(self, tasks: List[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+        """Index -> cached answer, for the tasks processed before"""
+        if self.cache is None:
+            return {}
+        found = await asyncio.gather(*[
+            self.cache.get(self._answer_key(task), valid=lambda text: self._load_answer(text) is not None)
+            for task in tasks
+        ])
+        return {i: self._load_answer(text) for i, text in enumerate(found) if text is not None}
+
+    async def _cache_answers(self, chunk: List[Dict[str, Any]], answers: Dict[int, Dict[str, Any]], elapsed: float):
+        """Store the model's answers (never fallbacks), each with its share of the call's time"""
+        if self.cache is None or not answers:
+            return
+        await asyncio.gather(*[
+            self.cache.put(self._answer_key(chunk[i]), json.dumps(answer), elapsed / len(chunk))
+            for i, answer in answers.items()
+        ])
+
+    def _estimate_tokens(self, text: str) -> int:
+        return estimate_tokens(text)
+
+    def _chunk_tasks(
+        self,
+        new_tasks: List[Dict[str, Any]],
+    ) -> List[List[Dict[str, Any]]]:
+        """Greedily pack tasks into chunks that fit the token budget"""
+        chunks = []
+        current = []
+        current_tokens = 0
+
+        for task in new_tasks:
+            # Per-task line overhead (numbering, created timestamp) + output object
+            cost = self._estimate_tokens(task.get("raw_input", "")) + 60
+            if current and (
+                current_tokens + cost > self.chunk_token_budget
+                or len(current) >= self.max_chunk_size
+            ):
+                chunks.append(current)
+                current = []
+                current_tokens = 0
+            current.append(task)
+            current_tokens += cost
+
+        if current:
+            chunks.append(current)
+        return chunks
+
+    async def _process_chunk(
+        self,
+        chunk: List[Dict[str, Any]],
+        existing_tasks: List[Dict[str, Any]],
+        related: Dict[int, Dict[str, Any]],
+        counts: Dict[str, int],
+        attempt: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """
+        Process one chunk, keeping every task answer that parses
+        Only the tasks without a usable answer are asked about again; a chunk
+        where nothing parsed is split in half first
+        """
+        context_prompt = self._build_context_prompt(chunk, existing_tasks, related)
+
+        parser = ObjectStreamParser()
+        objects, received, preempted = [], False, False
+        async with self._semaphore:
+            started = time.monotonic()
+            try:
+                async for text in self._stream_model(
+                    context_prompt,
+                    system_prompt=self._get_system_prompt(),
+                    temperature=0.3,
+                    format=TASKS_SCHEMA if self.structured_output else None,
+                ):
+                    received = received or bool(text)
+                    objects += parser.feed(text)
+            except Preempted:
+                preempted = True
+            except Exception as e:
+                print(f"[Processor] Model call failed after {len(objects)} complete answers: {e}")
+            objects += parser.finish()
+        counts["calls"] += 1
+
+        answers = self._match_answers(objects, chunk)
+        await self._cache_answers(chunk, answers, time.monotonic() - started)
+        counts["parsed"] += len(answers)
+        if preempted and len(answers) < len(chunk):
+            # Gave way to a chat - not a failure, queue again for the rest
+            print(f"[Processor] Yielded to an interactive call after {len(answers)}/{len(chunk)} answers")
+            missing = [task for i, task in enumerate(chunk) if i not in answers]
+            filled = iter(await self._process_chunk(missing, existing_tasks, related, counts, attempt))
+            return [answers[i] if i in answers else next(filled) for i in range(len(chunk))]
+        counts["unparsed"] += len(chunk) - len(answers)
+        if len(answers) == len(chunk):
+            return [answers[i] for i in range(len(chunk))]
+
+        counts["failures"] += 1
+        missing = [task for i, task in enumerate(chunk) if i not in answers]
+
+        # Nothing came back means the call itself failed - asking again won't help
+        if not received or attempt >= self.parse_retries:
+            retried = self._fallback(missing)
+        elif not answers and len(missing) > 1:
+            middle = len(missing) // 2
+            halves = await asyncio.gather(
+                self._process_chunk(missing[:middle], existing_tasks, related, counts, attempt + 1),
+                self._process_chunk(missing[middle:], existing_tasks, related, counts, attempt + 1),
+            )
+            retried = halves[0] + halves[1]
+        else:
+            retried = await self._process_chunk(missing, existing_tasks, related, counts, attempt + 1)
+
+        filled = iter(retried)
+        return [answers[i] if i in answers else next(filled) for i in range(len(chunk))]
+
+    def _clean_answer(self, value: Any) -> Optional[Dict[str, Any]]:
+        """A usable task answer with sane types, None if it isn't one"""
+        if not isinstance(value, dict):
+            return None
+        text = value.get("processed_text")
+        if not isinstance(text, str) or not text.strip():
+            return None
+        try:
+            priority = min(1.0, max(0.0, float(value.get("priority_score", 0.5))))
+        except (TypeError, ValueError):
+            priority = 0.5
+        pattern = value.get("recurring_pattern")
+        return {
+            "processed_text": text.strip(),
+            "priority_score": priority,
+            "category": str(value.get("category") or "misc"),
+            "is_life_critical": value.get("is_life_critical") is True,
+            "is_quick_win": value.get("is_quick_win") is True,
+            "notes": str(value.get("notes") or ""),
+            "recurring_pattern": pattern.strip() if isinstance(pattern, str) and pattern.strip() else None,
+        }
+
+    def _match_answers(self, objects: List[Any], chunk: List[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+        """
+        Chunk index -> answer. Answers say which task they're for ("n");
+        without that they're taken in order
+        """
+        answers: Dict[int, Dict[str, Any]] = {}
+        for position, value in enumerate(objects):
+            answer = self._clean_answer(value)
+            if answer is None:
+                continue
+            number = value.get("n")
+            index = number - 1 if isinstance(number, int) and 1 <= number <= len(chunk) else position
+            if index < len(chunk) and index not in answers:
+                answers[index] = answer
+        return answers
 
     def _get_system_prompt(self) -> str:
-        """System prompt that defines the assistant's role"""
+        """
+        System prompt that defines the assistant's role
+        Static, including the output format, so every processing call starts
+        with the same tokens
+        """
         return """You are a task management assistant for someone with ADHD, CPTSD, and short-term memory loss.
 
 Your job:
@@ -102,72 +513,97 @@ Priority hierarchy:
 - LOW (0.3-0.4): Nice to have
 - LATER (0.0-0.2): Ideas, interesting but not urgent (these are DISTRACTIONS)
 
-Return ONLY valid JSON array, one object per task, no other text."""
+For each new task, return a JSON object with:
+- n: The new task's number
+- processed_text: Your understanding of what they mean
+- priority_score: Number 0.0-1.0 (use the hierarchy above)
+- category: Short category name (shopping, health, tech, etc.)
+- is_life_critical: true/false (is this about survival/health?)
+- is_quick_win: true/false (can be done in <10 min?)
+- notes: Brief context or observations (mention it if this repeats an earlier task)
+- recurring_pattern: Only if the task itself repeats ("take meds daily", "bins out every monday") -
+  a short pattern like "daily", "every 2 days", "mondays at 9am", "twice a day", "monthly"; omit otherwise
+
+Return ONLY valid JSON, one object per new task in order, no other text:
+{"tasks": [{"n": 1, "processed_text": "...", "priority_score": 0.8, ...}, ...]}"""
+
+    def _task_text(self, task: Dict[str, Any]) -> str:
+        return clip(task.get('processed_text') or task.get('raw_input') or 'Unknown', self.item_token_cap)
 
     def _build_context_prompt(
         self,
         new_tasks: List[Dict[str, Any]],
         existing_tasks: List[Dict[str, Any]],
+        related: Optional[Dict[int, Dict[str, Any]]] = None,
     ) -> str:
-        """Build the prompt with full context"""
-        prompt = "# New tasks to process:\n\n"
-
-        for i, task in enumerate(new_tasks, 1):
-            prompt += f"{i}. Raw input: \"{task['raw_input']}\"\n"
-            if task.get("created_at"):
-                prompt += f"   Created: {task['created_at']}\n"
+        """
+        Build the prompt with full context
+        Active tasks come first - they're the same for every chunk of a batch,
+        so only the new tasks differ between calls. Related earlier tasks are
+        kept ahead of the active list when the budget is tight
+        """
+        related = related or {}
+        prompt = PromptBuilder("process", self.process_token_budget, system=self._get_system_prompt())
 
         if existing_tasks:
-            prompt += f"\n# Current active tasks ({len(existing_tasks)} total):\n\n"
-            # Show top 10 by priority
             active_sample = sorted(
                 existing_tasks,
-                key=lambda x: x.get('priority_score', 0),
-                reverse=True
-            )[:10]
-
-            for task in active_sample:
-                prompt += f"- {task.get('processed_text', task.get('raw_input', 'Unknown'))}\n"
-                prompt += f"  Priority: {task.get('priority_score', 0):.2f}, "
-                prompt += f"Category: {task.get('category', 'none')}\n"
-
-        prompt += """
-
-# For each new task, return JSON object with:
-- processed_text: Your understanding of what they mean
-- priority_score: Number 0.0-1.0 (use the hierarchy above)
-- category: Short category name (shopping, health, tech, etc.)
-- is_life_critical: true/false (is this about survival/health?)
-- is_quick_win: true/false (can be done in <10 min?)
-- notes: Brief context or observations
-
-Return as JSON array: [{"processed_text": "...", "priority_score": 0.8, ...}, ...]
-"""
-        return prompt
+                key=lambda x: (-(x.get('rank_score') or x.get('priority_score') or 0), x.get('id') or 0),
+            )
+            prompt.add(
+                f"# Current active tasks ({len(existing_tasks)} total):\n\n",
+                items=[
+                    f"- {self._task_text(task)}\n"
+                    f"  Priority: {task.get('priority_score') or 0:.2f}, "
+                    f"Category: {task.get('category', 'none')}\n"
+                    for task in active_sample
+                ],
+                footer="\n",
+                priority=1,
+            )
+
+        lines, similar = [], []
+        for i, task in enumerate(new_tasks, 1):
+            line = f"{i}. Raw input: \"{clip(task['raw_input'], self.item_token_cap)}\"\n"
+            if task.get("created_at"):
+                line += f"   Created: {task['created_at']}\n"
+            context = related.get(task.get("id"), {})
+            if context.get("duplicate_of"):
+                line += f"   Possible repeat of active task #{context['duplicate_of']}\n"
+            lines.append(line)
+            # Earlier tasks like this one - shows when they're stuck on the same thing again
+            similar += [(i, match) for match in context.get("similar", [])]
+        prompt.add("# New tasks to process:\n\n", items=lines, required=True)
+
+        if similar:
+            similar.sort(key=lambda pair: -pair[1]["similarity"])
+            prompt.add(
+                "\n# Similar earlier tasks (by new task number):\n\n",
+                items=[
+                    f"- {i}: #{match['id']} \"{clip(match['text'], self.item_token_cap)}\" "
+                    f"({match['status']}, similarity {match['similarity']:.2f})\n"
+                    for i, match in similar
+                ],
+                priority=2,
+            )
+
+        prompt.add(f"\nReturn the JSON for the {len(new_tasks)} new tasks.\n", required=True)
+        return prompt.build()
 
     def _parse_response(
         self,
         response: str,
         new_tasks: List[Dict[str, Any]]
     ) -> List[Dict[str, Any]]:
-        """Parse LLM response into structured task updates"""
-        try:
-            # Find JSON array in response
-            start = response.find("[")
-            end = response.rfind("]") + 1
-
-            if start >= 0 and end > start:
-                json_str = response[start:end]
-                parsed = json.loads(json_str)
-
-                # Validate we got the right number of results
-                if isinstance(parsed, list) and len(parsed) == len(new_tasks):
-                    return parsed
-        except Exception as e:
-            print(f"Error parsing response: {e}")
-            print(f"Response was: {response[:500]}")
+        """Parse LLM response into structured task updates, defaults for tasks it lacks"""
+        answers = self._match_answers(parse_objects(response), new_tasks)
+        return [
+            answers[i] if i in answers else self._fallback([task])[0]
+            for i, task in enumerate(new_tasks)
+        ]
 
-        # Fallback: return default values for each task
+    def _fallback(self, new_tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Default values for tasks the model couldn't handle"""
         return [
             {
                 "processed_text": task["raw_input"],
@@ -189,37 +625,23 @@ Return as JSON array: [{"processed_text": "...", "priority_score": 0.8, ...}, ..
         result = await self.process_new_tasks([task], context or [])
         return result[0] if result else {}
 
-    async def get_suggestions(
+    def _build_suggestions_prompt(
         self,
         current_tasks: List[Dict[str, Any]],
         user_state: Optional[str] = None
     ) -> str:
-        """
-        Get AI suggestions for what to do next
-        Optional user_state: "stuck", "hyperfocused", "low_energy", etc.
-        """
-        system_prompt = """You are helping someone with ADHD decide what to do next.
-Be supportive but direct. Suggest 1-3 specific tasks based on:
-- Priority (life critical first)
-- Their current state
-- Quick wins if they're stuck
-- Pattern breaking if hyperfocused on low-priority items
-
-Keep it brief and actionable."""
-
-        # Build prompt
-        prompt = "# Current tasks:\n\n"
+        """Prompt listing the top tasks (as many as the budget allows) for a what-next suggestion"""
+        prompt = PromptBuilder(
+            "suggest", self.suggest_token_budget, system=self._get_suggestions_system_prompt()
+        )
 
-        # Show top tasks by priority
         sorted_tasks = sorted(
             current_tasks,
-            key=lambda x: x.get('priority_score', 0),
-            reverse=True,
-        )[:15]
-
+            key=lambda x: (-(x.get('rank_score') or x.get('priority_score') or 0), x.get('id') or 0),
+        )
+        lines = []
         for task in sorted_tasks:
-            priority = task.get('priority_score', 0)
-            text = task.get('processed_text', task.get('raw_input', 'Unknown'))
+            priority = task.get('priority_score') or 0
             flags = []
             if task.get('is_life_critical'):
                 flags.append("LIFE CRITICAL")
@@ -227,16 +649,118 @@ Keep it brief and actionable."""
                 flags.append("quick win")
 
             flag_str = f" [{', '.join(flags)}]" if flags else ""
-            prompt += f"- [{priority:.2f}] {text}{flag_str}\n"
+            lines.append(f"- [{priority:.2f}] {self._task_text(task)}{flag_str}\n")
+        prompt.add("# Current tasks:\n\n", items=lines, priority=1)
 
         if user_state:
-            prompt += f"\nUser state: {user_state}\n"
+            prompt.add(f"\nUser state: {clip(user_state, self.item_token_cap)}\n", required=True)
 
-        prompt += "\nWhat should they focus on next?"
+        prompt.add("\nWhat should they focus on next?", required=True)
+        return prompt.build()
+
+    def _get_suggestions_system_prompt(self) -> str:
+        return """You are helping someone with ADHD decide what to do next.
+Be supportive but direct. Suggest 1-3 specific tasks based on:
+- Priority (life critical first)
+- Their current state
+- Quick wins if they're stuck
+- Pattern breaking if hyperfocused on low-priority items
 
-        response = await self._call_model(prompt, system_prompt, temperature=0.5)
+Keep it brief and actionable."""
+
+    def _get_chat_system_prompt(self) -> str:
+        """System prompt for the conversational assistant"""
+        return """You are a supportive task management assistant helping someone with ADHD, CPTSD, and memory issues.
+
+You have access to their current tasks and can:
+- Help them think through what to do
+- Break down overwhelming tasks
+- Offer encouragement and support
+- Suggest priorities based on their needs
+- Help them process anxiety about tasks
+
+Be conversational, supportive, and direct. No corporate speak. Be real with them."""
+
+    def build_chat_prompt(
+        self,
+        message: str,
+        active_tasks: List[Dict[str, Any]],
+    ) -> Tuple[str, str, int]:
+        """(prompt, system_prompt, number of tasks included) for a chat message"""
+        system_prompt = self._get_chat_system_prompt()
+        prompt = PromptBuilder("chat", self.chat_token_budget, system=system_prompt)
+
+        tasks = None
+        if active_tasks:
+            lines = []
+            for task in active_tasks:
+                flags = []
+                if task.get('is_life_critical'):
+                    flags.append("CRITICAL")
+                if task.get('is_quick_win'):
+                    flags.append("quick")
+                if task.get('pinned'):
+                    flags.append("pinned")
+
+                flag_str = f" [{', '.join(flags)}]" if flags else ""
+                lines.append(
+                    f"[{task['id']}] [{task.get('priority_score') or 0:.2f}] {self._task_text(task)}{flag_str}\n"
+                )
+            tasks = prompt.add("\n# Current Active Tasks:\n\n", items=lines, footer="\n", priority=1)
+
+        prompt.add("User: " + message, required=True)
+        return prompt.build(), system_prompt, len(tasks.kept) if tasks else 0
+
+    async def get_suggestions(
+        self,
+        current_tasks: List[Dict[str, Any]],
+        user_state: Optional[str] = None
+    ) -> str:
+        """
+        Get AI suggestions for what to do next
+        Optional user_state: "stuck", "hyperfocused", "low_energy", etc.
+        """
+        prompt = self._build_suggestions_prompt(current_tasks, user_state)
+        system_prompt = self._get_suggestions_system_prompt()
+
+        response = await self._call_model(prompt, system_prompt, temperature=0.5, interactive=True)
         return response
 
+    def stream_suggestions(
+        self,
+        current_tasks: List[Dict[str, Any]],
+        user_state: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Streaming variant of get_suggestions - yields tokens"""
+        prompt = self._build_suggestions_prompt(current_tasks, user_state)
+        system_prompt = self._get_suggestions_system_prompt()
+
+        return self._stream_model(prompt, system_prompt, temperature=0.5, use_cache=True, interactive=True)
+
+
+def _keep_alive(value: str) -> Optional[Union[str, int]]:
+    """LLM_KEEP_ALIVE as Ollama wants it: a duration string, or a number of seconds"""
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+async def start_model_residency(processor: TaskProcessor) -> List[asyncio.Task]:
+    """
+    Background warm-up and keep-warm ping, per LLM_WARMUP and
+    LLM_KEEP_WARM_INTERVAL - cancel the returned tasks on shutdown
+    """
+    tasks = []
+    if os.getenv("LLM_WARMUP", "true").lower() == "true":
+        tasks.append(asyncio.create_task(processor.warm_up()))
+    interval = float(os.getenv("LLM_KEEP_WARM_INTERVAL", "600"))
+    if interval > 0:
+        tasks.append(asyncio.create_task(processor.keep_warm(interval)))
+    return tasks
+
 
 # Global instance (can be overridden via config)
 _processor = None
@@ -247,6 +771,30 @@ def get_processor() -> TaskProcessor:
     global _processor
     if _processor is None:
         model = os.getenv("TASK_MODEL", "gpt-oss-20b-assistant:latest")
-        api_base = os.getenv("OLLAMA_API_BASE", "http://localhost:11434")
-        _processor = TaskProcessor(model_name=model, api_base=api_base)
+        api_base = os.getenv("LLM_ENDPOINTS") or os.getenv("OLLAMA_API_BASE", "http://localhost:11434")
+
+        cache = None
+        if os.getenv("LLM_CACHE", "true").lower() == "true":
+            cache = ResponseCache(
+                path=os.getenv("LLM_CACHE_PATH", "./data/llm_cache.db"),
+                max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000")),
+                max_bytes=int(os.getenv("LLM_CACHE_MAX_MB", "50")) * 1024 * 1024,
+                ttl=int(os.getenv("LLM_CACHE_TTL", "86400")),
+            )
+
+        _processor = TaskProcessor(
+            model_name=model,
+            api_base=api_base,
+            chunk_token_budget=int(os.getenv("TASK_CHUNK_TOKENS", "1500")),
+            max_chunk_size=int(os.getenv("TASK_CHUNK_MAX", "20")),
+            max_concurrency=int(os.getenv("LLM_CONCURRENCY", "2")),
+            cache=cache,
+            process_token_budget=int(os.getenv("PROMPT_TOKENS_PROCESS", "4000")),
+            suggest_token_budget=int(os.getenv("PROMPT_TOKENS_SUGGEST", "2000")),
+            chat_token_budget=int(os.getenv("PROMPT_TOKENS_CHAT", "3000")),
+            item_token_cap=int(os.getenv("PROMPT_ITEM_TOKENS", "100")),
+            keep_alive=_keep_alive(os.getenv("LLM_KEEP_ALIVE", "30m")),
+            structured_output=os.getenv("LLM_STRUCTURED_OUTPUT", "true").lower() == "true",
+            parse_retries=int(os.getenv("LLM_PARSE_RETRIES", "2")),
+        )
     return _processor
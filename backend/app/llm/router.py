@@ -0,0 +1,359 @@
+"""
+Load balancing and failover across LLM endpoints
+LLM_ENDPOINTS lists the inference boxes, each with an optional weight
+("http://big:11434=3,http://small:11434"). Every request goes to the healthy
+endpoint with the shortest expected wait: (requests in flight + 1) x its
+recent response time, divided by its weight. Streams and whole answers are
+timed apart - time to first line and time to the full response aren't
+comparable - and each kind of call is balanced on its own estimate.
+
+An endpoint that fails LLM_BREAKER_FAILURES times in a row is skipped for
+LLM_BREAKER_COOLDOWN seconds, then gets a single trial request (half-open):
+success puts it back in rotation, failure opens the breaker again. Failed
+requests go to the next endpoint, as long as nothing has been handed to the
+caller yet.
+
+Interactive calls can be hedged: if the first endpoint hasn't produced
+anything after LLM_HEDGE_AFTER seconds (or twice its usual time, if that's
+longer), the same request goes to the runner-up and the first answer wins;
+the other request is cancelled. A whole-answer call is only hedged once
+the endpoint's usual answer time is known - a long generation is normal,
+not a stall.
+"""
+import asyncio
+import os
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.services import metrics
+
+# Statuses that mean "this endpoint can't serve it", not "the request is bad"
+FAILOVER_STATUSES = {404, 408, 429}
+
+# What a call's latency is measured to: the first streamed line, or the whole response
+FIRST = "first"
+TOTAL = "total"
+
+
+class EndpointError(Exception):
+    """An endpoint answered, but not with something usable"""
+
+
+class Endpoint:
+    """One inference server and what the router knows about it"""
+
+    def __init__(self, url: str, weight: float = 1.0):
+        self.url = url.rstrip("/")
+        self.weight = max(weight, 0.01)
+        self.in_flight = 0
+        self.latency: Dict[str, Optional[float]] = {FIRST: None, TOTAL: None}  # EWMA seconds, per kind
+        self.failures = 0  # In a row
+        self.opened_at: Optional[float] = None  # Breaker open since
+        self.probing = False
+        self.requests = 0
+        self.errors = 0
+
+    def expected_wait(self, kind: str, default: float) -> float:
+        return (self.in_flight + 1) * (self.latency[kind] or default) / self.weight
+
+    def state(self, now: float, cooldown: float) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if now - self.opened_at >= cooldown and not self.probing:
+            return "half-open"
+        return "open"
+
+    def stats(self, now: float, cooldown: float) -> Dict:
+        return {
+            "url": self.url,
+            "weight": self.weight,
+            "state": self.state(now, cooldown),
+            "in_flight": self.in_flight,
+            "first_output_ms": _ms(self.latency[FIRST]),
+            "response_ms": _ms(self.latency[TOTAL]),
+            "requests": self.requests,
+            "errors": self.errors,
+        }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+def parse_endpoints(spec: str) -> List[Endpoint]:
+    """"url=weight,url" -> endpoints (weight defaults to 1)"""
+    endpoints = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        url, _, weight = item.partition("=")
+        try:
+            endpoints.append(Endpoint(url.strip(), float(weight) if weight else 1.0))
+        except ValueError:
+            raise ValueError(f"Bad LLM endpoint weight in {item!r}")
+    if not endpoints:
+        raise ValueError("No LLM endpoints configured")
+    return endpoints
+
+
+class Router:
+    """Picks an endpoint per request, tracks load and health, fails over and hedges"""
+
+    def __init__(
+        self,
+        endpoints: List[Endpoint],
+        breaker_failures: int = 3,
+        breaker_cooldown: float = 30.0,
+        hedge_after: float = 2.0,
+        smoothing: float = 0.3,
+    ):
+        self.endpoints = endpoints
+        self.breaker_failures = max(1, breaker_failures)
+        self.breaker_cooldown = breaker_cooldown
+        self.hedge_after = hedge_after  # 0 turns hedging off
+        self.smoothing = smoothing
+
+    @property
+    def urls(self) -> List[str]:
+        return [endpoint.url for endpoint in self.endpoints]
+
+    def _typical(self, kind: str) -> Optional[float]:
+        """Mean latency of this kind over the endpoints that have one"""
+        known = [e.latency[kind] for e in self.endpoints if e.latency[kind] is not None]
+        return sum(known) / len(known) if known else None
+
+    def candidates(self, kind: str = FIRST) -> List[Endpoint]:
+        """Usable endpoints for a kind of call, best first"""
+        now = time.monotonic()
+        default = self._typical(kind) or 1.0
+
+        usable = [e for e in self.endpoints if e.state(now, self.breaker_cooldown) != "open"]
+        if not usable:
+            # Everything is down - trying the one that failed longest ago beats refusing
+            return sorted(self.endpoints, key=lambda e: e.opened_at)
+        # A half-open endpoint gets its trial request first
+        return sorted(
+            usable,
+            key=lambda e: (e.state(now, self.breaker_cooldown) == "closed", e.expected_wait(kind, default)),
+        )
+
+    def _begin(self, endpoint: Endpoint):
+        endpoint.in_flight += 1
+        endpoint.requests += 1
+        if endpoint.opened_at is not None:
+            endpoint.probing = True
+
+    def _end(self, endpoint: Endpoint):
+        endpoint.in_flight -= 1
+        endpoint.probing = False
+
+    def _succeeded(self, endpoint: Endpoint, kind: str, elapsed: float):
+        latency = endpoint.latency[kind]
+        endpoint.latency[kind] = elapsed if latency is None else latency + self.smoothing * (elapsed - latency)
+        endpoint.failures = 0
+        if endpoint.opened_at is not None:
+            endpoint.opened_at = None
+            print(f"[LLM] {endpoint.url} is back")
+
+    def _failed(self, endpoint: Endpoint, error: Exception):
+        endpoint.failures += 1
+        endpoint.errors += 1
+        metrics.inc("llm_endpoint_errors")
+        if endpoint.probing or (endpoint.opened_at is None and endpoint.failures >= self.breaker_failures):
+            endpoint.opened_at = time.monotonic()
+            metrics.inc("llm_breaker_opened")
+            print(f"[LLM] {endpoint.url} failed {endpoint.failures}x ({error!r}) - "
+                  f"skipping it for {self.breaker_cooldown:.0f}s")
+
+    def _check(self, response: httpx.Response):
+        if response.status_code >= 500 or response.status_code in FAILOVER_STATUSES:
+            raise EndpointError(f"HTTP {response.status_code}")
+
+    def _hedge_delay(self, endpoint: Endpoint, kind: str) -> Optional[float]:
+        """How long to wait before hedging; None to not hedge"""
+        usual = endpoint.latency[kind] or self._typical(kind)
+        if usual is None and kind == TOTAL:
+            return None  # No idea yet how long an answer takes here
+        return max(self.hedge_after, 2 * (usual or 0.0))
+
+    def _next(self, tried: List[Endpoint], kind: str) -> Optional[Endpoint]:
+        for endpoint in self.candidates(kind):
+            if endpoint not in tried:
+                return endpoint
+        return None
+
+    async def _race(
+        self,
+        attempt: Callable[[Endpoint], Awaitable],
+        discard: Callable[[object], Awaitable],
+        hedge: bool,
+        kind: str,
+    ):
+        """
+        Run attempt() on the best endpoint, failing over down the list; with
+        hedge, start the runner-up too when the first is slow. discard()
+        releases a result that lost the race
+        """
+        tried: List[Endpoint] = []
+        running: Dict[asyncio.Task, Endpoint] = {}
+        first: Optional[asyncio.Task] = None
+        error: Optional[Exception] = None
+        hedged = False
+
+        def launch(endpoint: Endpoint) -> asyncio.Task:
+            tried.append(endpoint)
+            # Counted before the task runs, so concurrent requests already see the load
+            self._begin(endpoint)
+            task = asyncio.create_task(attempt(endpoint))
+            running[task] = endpoint
+            return task
+
+        try:
+            while True:
+                if not running:
+                    endpoint = self._next(tried, kind)
+                    if endpoint is None:
+                        break
+                    if error is not None:
+                        metrics.inc("llm_failovers")
+                    first = launch(endpoint)
+
+                timeout = None
+                if hedge and not hedged and self.hedge_after > 0 and len(self.endpoints) > 1:
+                    timeout = self._hedge_delay(running[first], kind)
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    # Slow - ask the runner-up as well, first answer wins
+                    hedged = True
+                    backup = self._next(tried, kind)
+                    if backup is not None:
+                        metrics.inc("llm_hedged")
+                        launch(backup)
+                    continue
+
+                for task in done:
+                    running.pop(task)
+                    if task.exception() is None:
+                        if hedged and task is not first:
+                            metrics.inc("llm_hedge_wins")
+                        return task.result()
+                    error = task.exception()
+                    if not isinstance(error, (httpx.TransportError, EndpointError)):
+                        raise error
+        finally:
+            for task in running:
+                task.cancel()
+            for task in running:
+                try:
+                    result = await task
+                except BaseException:
+                    continue
+                await discard(result)
+        raise error or EndpointError("No LLM endpoint available")
+
+    async def request(
+        self,
+        call: Callable[[str], Awaitable[httpx.Response]],
+        hedge: bool = False,
+    ) -> httpx.Response:
+        """
+        call(base_url) on the best endpoint, e.g. a client.post(); transport
+        errors and unusable statuses fail over to the next one
+        """
+        async def attempt(endpoint: Endpoint) -> httpx.Response:
+            started = time.monotonic()
+            try:
+                response = await call(endpoint.url)
+                self._check(response)
+            except (httpx.TransportError, EndpointError) as e:
+                self._failed(endpoint, e)
+                raise
+            finally:
+                self._end(endpoint)
+            self._succeeded(endpoint, TOTAL, time.monotonic() - started)
+            return response
+
+        async def discard(response):
+            pass
+
+        return await self._race(attempt, discard, hedge, TOTAL)
+
+    async def stream(
+        self,
+        send: Callable[[str], Awaitable[httpx.Response]],
+        hedge: bool = False,
+    ) -> AsyncIterator[str]:
+        """
+        Lines of a streaming response; send(base_url) is a client.send(...,
+        stream=True). Fails over (and hedges) up to the first line - after
+        that the caller has seen output, so an error is raised as is
+        """
+        async def attempt(endpoint: Endpoint) -> Tuple[Endpoint, httpx.Response, AsyncIterator[str], str]:
+            started = time.monotonic()
+            response = None
+            try:
+                response = await send(endpoint.url)
+                self._check(response)
+                if response.status_code != 200:
+                    raise Exception(f"API error: {response.status_code}")
+                lines = response.aiter_lines()
+                first = ""
+                while not first:
+                    try:
+                        first = await lines.__anext__()
+                    except StopAsyncIteration:
+                        raise EndpointError("Empty response")
+            except BaseException as e:
+                if response is not None:
+                    await response.aclose()
+                if isinstance(e, (httpx.TransportError, EndpointError)):
+                    self._failed(endpoint, e)
+                self._end(endpoint)
+                raise
+            self._succeeded(endpoint, FIRST, time.monotonic() - started)
+            return endpoint, response, lines, first
+
+        async def discard(opened):
+            await opened[1].aclose()
+            self._end(opened[0])
+
+        endpoint, response, lines, first = await self._race(attempt, discard, hedge, FIRST)
+        try:
+            yield first
+            async for line in lines:
+                yield line
+        except httpx.TransportError as e:
+            self._failed(endpoint, e)
+            raise
+        finally:
+            await response.aclose()
+            self._end(endpoint)
+
+    def stats(self) -> List[Dict]:
+        now = time.monotonic()
+        return [endpoint.stats(now, self.breaker_cooldown) for endpoint in self.endpoints]
+
+
+_routers: Dict[Tuple[str, str], Router] = {}
+
+
+def get_router(spec: str, pool: str = "llm") -> Router:
+    """
+    Shared router for an endpoint list - everything talking to the same
+    boxes sees the same load and breaker state. Another `pool` (embeddings)
+    keeps its own, so a model missing on a box only takes the box out for
+    the calls that need that model
+    """
+    router = _routers.get((pool, spec))
+    if router is None:
+        router = _routers[(pool, spec)] = Router(
+            parse_endpoints(spec),
+            breaker_failures=int(os.getenv("LLM_BREAKER_FAILURES", "3")),
+            breaker_cooldown=float(os.getenv("LLM_BREAKER_COOLDOWN", "30")),
+            hedge_after=float(os.getenv("LLM_HEDGE_AFTER", "2")),
+        )
+    return router
@@ -0,0 +1,118 @@
+"""
+Structured model output
+The JSON schema processing asks Ollama to constrain its output to, and a
+tolerant parser that pulls every complete object out of the answer as it
+streams in - a truncated or partly garbled array still yields the tasks
+before the damage.
+"""
+import json
+from typing import Any, Dict, List, Optional
+
+TASK_FIELDS_SCHEMA = {
+    "n": {"type": "integer"},
+    "processed_text": {"type": "string"},
+    "priority_score": {"type": "number", "minimum": 0, "maximum": 1},
+    "category": {"type": "string"},
+    "is_life_critical": {"type": "boolean"},
+    "is_quick_win": {"type": "boolean"},
+    "notes": {"type": "string"},
+    "recurring_pattern": {"type": "string"},  # Optional - only for things that repeat
+}
+OPTIONAL_FIELDS = {"recurring_pattern"}
+
+# Passed as Ollama's `format` - an object wrapper is what grammar-constrained
+# decoding handles most reliably
+TASKS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "tasks": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": TASK_FIELDS_SCHEMA,
+                "required": [field for field in TASK_FIELDS_SCHEMA if field not in OPTIONAL_FIELDS],
+            },
+        },
+    },
+    "required": ["tasks"],
+}
+
+_decoder = json.JSONDecoder()
+
+
+class ObjectStreamParser:
+    """
+    Feed model output as it arrives, get back each object of the first JSON
+    array as soon as it is complete. Anything after an object that can't be
+    parsed is ignored rather than failing what came before it
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos: Optional[int] = None  # Inside the array, past the last object
+        self.done = False
+
+    def feed(self, text: str) -> List[Any]:
+        self._buffer += text
+        if self.done:
+            return []
+        if self._pos is None:
+            start = self._buffer.find("[")
+            if start < 0:
+                return []
+            self._pos = start + 1
+        if "}" not in text and "]" not in text and text:
+            return []  # Nothing can have completed
+
+        found = []
+        buffer = self._buffer
+        while True:
+            pos = self._pos
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            self._pos = pos
+            if pos >= len(buffer):
+                break
+            if buffer[pos] != "{":
+                self.done = True  # End of the array, or garbage
+                break
+            try:
+                value, self._pos = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break  # Incomplete - wait for more (or it's malformed and stays unparsed)
+            found.append(value)
+        return found
+
+    def finish(self) -> List[Any]:
+        """End of output - a lone object (no array at all) counts as one item"""
+        if self._pos is not None:
+            return self.feed("")
+        start = self._buffer.find("{")
+        if start < 0:
+            return []
+        try:
+            value, _ = _decoder.raw_decode(self._buffer, start)
+        except json.JSONDecodeError:
+            return []
+        return [value] if isinstance(value, dict) else []
+
+
+def parse_objects(text: str) -> List[Any]:
+    """Every complete object in a whole (maybe truncated) answer"""
+    parser = ObjectStreamParser()
+    return parser.feed(text or "") + parser.finish()
+
+
+def first_object(text: str) -> Optional[Dict[str, Any]]:
+    """The first complete JSON object in free-form model output"""
+    text = text or ""
+    start = text.find("{")
+    while start >= 0:
+        try:
+            value, _ = _decoder.raw_decode(text, start)
+            if isinstance(value, dict):
+                return value
+        except json.JSONDecodeError:
+            pass
+        start = text.find("{", start + 1)
+    return None
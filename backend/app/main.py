@@ -1,17 +1,28 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse
 from contextlib import asynccontextmanager
+import asyncio
 import os
+import socket
 
-from app.database import init_db
-from app.api import tasks
+from app.database import init_db, async_session_maker
+from app.llm import lanes
+from app.llm.http import get_http_client, close_http_client
+from app.llm.processor import get_processor, start_model_residency
+from app.api import tasks, events
+from app.services import background_worker, metrics, query_stats, spool, work_queue
+
+# Local clients (jt) talk HTTP over this socket - no TCP handshake, no port
+API_SOCKET = os.getenv("API_SOCKET", "./data/jamup.sock")
+# Run the worker inside this process instead of as a second one
+IN_PROCESS_WORKER = os.getenv("IN_PROCESS_WORKER", "false").lower() == "true"
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize on startup"""
+    """Initialize on startup, release shared resources on shutdown"""
     # Create data directory
     os.makedirs("./data", exist_ok=True)
 
@@ -19,8 +30,27 @@ async def lifespan(app: FastAPI):
     await init_db()
     print("Database initialized")
 
+    # Captures jt saved while we were down
+    await spool.replay()
+
+    # Shared keep-alive pool for every LLM call
+    get_http_client()
+
+    # Load the model now rather than on the first capture, and keep it loaded
+    residency = await start_model_residency(get_processor())
+
+    worker = background_worker.start_in_process() if IN_PROCESS_WORKER else None
+
     yield
 
+    if worker is not None:
+        worker.cancel()
+        # Let it leave any write transaction cleanly before the pool goes
+        await asyncio.gather(worker, return_exceptions=True)
+    for task in residency:
+        task.cancel()
+    await close_http_client()
+
 
 app = FastAPI(
     title="JamUpTaskMaster",
@@ -40,6 +70,13 @@ app.add_middleware(
 
 # API routes
 app.include_router(tasks.router, prefix="/api", tags=["tasks"])
+app.include_router(events.router, prefix="/api", tags=["events"])
+
+
+@app.exception_handler(lanes.Overloaded)
+async def llm_overloaded(request: Request, exc: lanes.Overloaded):
+    """The interactive lane is full - tell the client to come back in a moment"""
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "2"})
 
 
 # Dashboard route
@@ -71,8 +108,53 @@ async def health():
     return {"status": "ok"}
 
 
-if __name__ == "__main__":
+@app.get("/metrics")
+async def get_metrics():
+    """Process metrics, durable queue stats (capture-to-active latency), LLM endpoint health, lane queues and SQL timings"""
+    async with async_session_maker() as session:
+        queue_stats = await work_queue.stats(session)
+
+    processor = get_processor()
+
+    return {
+        "queue": queue_stats,
+        "llm_cache": processor.cache.stats() if processor.cache else None,
+        "llm_endpoints": processor.router.stats(),
+        "llm_lanes": lanes.stats(),
+        "sql": query_stats.snapshot(),
+        **metrics.snapshot(),
+    }
+
+
+def _listen(host: str, port: int, path: str):
+    """The TCP socket, plus the Unix socket unless API_SOCKET is empty"""
+    tcp = socket.create_server((host, port))
+    sockets = [tcp]
+    if path:
+        if os.path.exists(path):
+            os.unlink(path)  # Left behind by an unclean exit
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        uds = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        uds.bind(path)
+        os.chmod(path, 0o600)
+        sockets.append(uds)
+    return sockets
+
+
+def serve():
+    """One server process answering on both TCP and the Unix socket"""
     import uvicorn
 
+    host = os.getenv("HOST", "0.0.0.0")
     port = int(os.getenv("PORT", "8000"))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    sockets = _listen(host, port, API_SOCKET)
+    print(f"[API] Listening on http://{host}:{port}{f' and {API_SOCKET}' if API_SOCKET else ''}")
+    try:
+        uvicorn.Server(uvicorn.Config(app)).run(sockets=sockets)
+    finally:
+        if API_SOCKET and os.path.exists(API_SOCKET):
+            os.unlink(API_SOCKET)
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,121 @@
+"""
+Versioned schema migrations
+Run automatically from init_db after create_all. Each migration runs once,
+in order, and is recorded in schema_migrations. Migrations are either a
+list of SQL statements or a function taking a SQLAlchemy Connection.
+Append new ones to MIGRATIONS - never edit or reorder applied ones.
+"""
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple, Union
+
+from sqlalchemy.engine import Connection
+
+from app.models.embeddings import EMBEDDING_TRIGGERS
+from app.models.events import EVENT_TRIGGERS
+from app.models.search import FTS_SCHEMA
+from app.models.stats import COUNTER_TRIGGERS, REBUILD_COUNTERS
+
+
+def _add_pinned(conn: Connection):
+    """Databases created before pinning existed lack the column"""
+    columns = [row[1] for row in conn.exec_driver_sql("PRAGMA table_info(tasks)")]
+    if "pinned" not in columns:
+        conn.exec_driver_sql("ALTER TABLE tasks ADD COLUMN pinned BOOLEAN DEFAULT 0")
+
+
+def _add_duplicate_of(conn: Connection):
+    """Set by the worker when a new task looks like an existing active one"""
+    columns = [row[1] for row in conn.exec_driver_sql("PRAGMA table_info(tasks)")]
+    if "duplicate_of" not in columns:
+        conn.exec_driver_sql("ALTER TABLE tasks ADD COLUMN duplicate_of INTEGER")
+
+
+def _add_ranking(conn: Connection):
+    """Effective priority for sorting, plus put-off history feeding it"""
+    columns = [row[1] for row in conn.exec_driver_sql("PRAGMA table_info(tasks)")]
+    if "rank_score" not in columns:
+        conn.exec_driver_sql("ALTER TABLE tasks ADD COLUMN rank_score FLOAT NOT NULL DEFAULT 0")
+        # Until the first refresh: roughly what the old priority ordering gave
+        conn.exec_driver_sql(
+            "UPDATE tasks SET rank_score = COALESCE(priority_score, 0.5) + 10 * COALESCE(pinned, 0)"
+        )
+    if "put_off_count" not in columns:
+        conn.exec_driver_sql("ALTER TABLE tasks ADD COLUMN put_off_count INTEGER NOT NULL DEFAULT 0")
+    # list_tasks by status, and without a status filter
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_tasks_status_rank ON tasks (status, rank_score DESC, id)"
+    )
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_tasks_rank ON tasks (rank_score DESC, id)")
+
+
+def _add_next_due(conn: Connection):
+    """Next occurrence of recurring tasks; the scheduler only ever reads it through the index"""
+    columns = [row[1] for row in conn.exec_driver_sql("PRAGMA table_info(tasks)")]
+    if "next_due" not in columns:
+        conn.exec_driver_sql("ALTER TABLE tasks ADD COLUMN next_due DATETIME")
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_tasks_next_due ON tasks (next_due) WHERE next_due IS NOT NULL"
+    )
+
+
+def _drop_priority_indexes(conn: Connection):
+    """Migration 3's ordering indexes - lists sort on rank_score now, so they only slowed writes"""
+    conn.exec_driver_sql("DROP INDEX IF EXISTS ix_tasks_status_priority")
+    conn.exec_driver_sql("DROP INDEX IF EXISTS ix_tasks_priority")
+
+
+Migration = Tuple[int, str, Union[List[str], Callable[[Connection], None]]]
+
+MIGRATIONS: List[Migration] = [
+    (1, "add tasks.pinned", _add_pinned),
+    (2, "task counters triggers", COUNTER_TRIGGERS + REBUILD_COUNTERS),
+    (3, "indexes for status/priority ordering", [
+        # list_tasks by status, worker captured/active selects, chat context
+        "CREATE INDEX IF NOT EXISTS ix_tasks_status_priority "
+        "ON tasks (status, priority_score DESC, touched_at DESC)",
+        # list_tasks without a status filter
+        "CREATE INDEX IF NOT EXISTS ix_tasks_priority "
+        "ON tasks (priority_score DESC, touched_at DESC)",
+    ]),
+    (4, "task change events triggers", EVENT_TRIGGERS),
+    (5, "full-text search index", FTS_SCHEMA),
+    (6, "add tasks.duplicate_of", _add_duplicate_of),
+    (7, "drop embeddings with their task", EMBEDDING_TRIGGERS),
+    (8, "rank_score and put_off_count", _add_ranking),
+    (9, "add tasks.next_due", _add_next_due),
+    (10, "drop priority_score ordering indexes", _drop_priority_indexes),
+]
+
+
+def current_version(conn: Connection) -> int:
+    conn.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, name TEXT NOT NULL, applied_at TIMESTAMP NOT NULL)"
+    )
+    row = conn.exec_driver_sql("SELECT MAX(version) FROM schema_migrations").first()
+    return row[0] or 0
+
+
+def run_migrations(conn: Connection, target: Optional[int] = None) -> List[int]:
+    """Apply pending migrations up to `target` (default: all), returns versions applied"""
+    applied = []
+    version = current_version(conn)
+
+    for number, name, step in MIGRATIONS:
+        if number <= version or (target is not None and number > target):
+            continue
+
+        print(f"[DB] Applying migration {number}: {name}")
+        if callable(step):
+            step(conn)
+        else:
+            for statement in step:
+                conn.exec_driver_sql(statement)
+
+        conn.exec_driver_sql(
+            "INSERT INTO schema_migrations (version, name, applied_at) VALUES (?, ?, ?)",
+            (number, name, datetime.utcnow()),
+        )
+        applied.append(number)
+
+    return applied
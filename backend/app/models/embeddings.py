@@ -0,0 +1,22 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary
+
+from app.models.task import Base
+
+
+class TaskEmbedding(Base):
+    """Embedding of a task's raw input - unit length, stored as float16 bytes"""
+    __tablename__ = "task_embeddings"
+
+    id = Column(Integer, primary_key=True)  # Grows on every write, so readers sync by id
+    task_id = Column(Integer, nullable=False, unique=True)
+    model = Column(String, nullable=False)  # Vectors from different models don't compare
+    vector = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+EMBEDDING_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS tasks_embeddings_delete AFTER DELETE ON tasks BEGIN
+    DELETE FROM task_embeddings WHERE task_id = OLD.id;
+END""",
+]
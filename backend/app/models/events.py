@@ -0,0 +1,39 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime
+
+from app.models.task import Base
+
+
+class TaskEvent(Base):
+    """Change log for tasks - written by triggers, tailed by the /api/events feed"""
+    __tablename__ = "task_events"
+
+    id = Column(Integer, primary_key=True)  # Doubles as the SSE event id
+    task_id = Column(Integer, nullable=False)
+    kind = Column(String, nullable=False)  # created, processed, updated, deleted
+    at = Column(DateTime, default=datetime.utcnow)
+
+
+def _log(kind: str, row: str) -> str:
+    return f"INSERT INTO task_events (task_id, kind, at) VALUES ({row}.id, '{kind}', CURRENT_TIMESTAMP);"
+
+
+_PROCESSED = "OLD.status IS 'captured' AND NEW.status IS 'active'"
+
+# Triggers catch writes from every process (api, worker, scripts) alike
+EVENT_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS tasks_events_insert AFTER INSERT ON tasks BEGIN
+    {_log("created", "NEW")}
+END""",
+    f"""CREATE TRIGGER IF NOT EXISTS tasks_events_processed AFTER UPDATE ON tasks
+WHEN {_PROCESSED} BEGIN
+    {_log("processed", "NEW")}
+END""",
+    f"""CREATE TRIGGER IF NOT EXISTS tasks_events_update AFTER UPDATE ON tasks
+WHEN NOT ({_PROCESSED}) BEGIN
+    {_log("updated", "NEW")}
+END""",
+    f"""CREATE TRIGGER IF NOT EXISTS tasks_events_delete AFTER DELETE ON tasks BEGIN
+    {_log("deleted", "OLD")}
+END""",
+]
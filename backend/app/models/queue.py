@@ -0,0 +1,20 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, DateTime, Index
+
+from app.models.task import Base
+
+
+class WorkItem(Base):
+    """Durable queue entry - one per captured task waiting for the worker"""
+    __tablename__ = "work_queue"
+
+    id = Column(Integer, primary_key=True)
+    task_id = Column(Integer, nullable=False, index=True)
+    enqueued_at = Column(DateTime, default=datetime.utcnow)
+    claimed_at = Column(DateTime, nullable=True)  # Set when a worker picks it up
+    done_at = Column(DateTime, nullable=True)  # Set once the task is active
+    attempts = Column(Integer, default=0)
+
+    __table_args__ = (
+        Index("ix_work_queue_pending", "done_at", "id"),
+    )
@@ -0,0 +1,99 @@
+import re
+import unicodedata
+from typing import List, Optional
+
+# External-content FTS5 index over the task text - the text itself stays in
+# tasks, the index holds only tokens. prefix='2 3' pre-builds short prefixes
+# so "vm*" style lookups don't scan the whole term list.
+FTS_COLUMNS = ["raw_input", "processed_text", "notes"]
+
+# bm25 weights, same order as FTS_COLUMNS: the cleaned-up text matters most
+FTS_WEIGHTS = "1.0, 2.0, 0.5"
+
+_COLUMNS = ", ".join(FTS_COLUMNS)
+_NEW = ", ".join(f"NEW.{c}" for c in FTS_COLUMNS)
+_OLD = ", ".join(f"OLD.{c}" for c in FTS_COLUMNS)
+
+FTS_SCHEMA = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+    {_COLUMNS}, content='tasks', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+)""",
+    f"""CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+    INSERT INTO tasks_fts (rowid, {_COLUMNS}) VALUES (NEW.id, {_NEW});
+END""",
+    f"""CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+    INSERT INTO tasks_fts (tasks_fts, rowid, {_COLUMNS}) VALUES ('delete', OLD.id, {_OLD});
+END""",
+    # Status and priority changes don't touch the index
+    f"""CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF {_COLUMNS} ON tasks BEGIN
+    INSERT INTO tasks_fts (tasks_fts, rowid, {_COLUMNS}) VALUES ('delete', OLD.id, {_OLD});
+    INSERT INTO tasks_fts (rowid, {_COLUMNS}) VALUES (NEW.id, {_NEW});
+END""",
+    # Index whatever history already exists
+    "INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')",
+]
+
+
+def search_terms(text: str) -> List[str]:
+    """Words in a free-text query, the same way the unicode61 tokenizer splits them"""
+    return re.findall(r"\w+", text)
+
+
+def fts_query(terms: List[str]) -> Optional[str]:
+    """
+    FTS5 query for search terms: every word must match, each as a prefix
+    ("vm" finds "VMs"). Words are quoted, so FTS syntax in the input (AND,
+    NEAR, column filters, stray quotes) is treated as plain text.
+    """
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _fold(word: str) -> str:
+    """Case- and accent-insensitive, like the index (remove_diacritics)"""
+    decomposed = unicodedata.normalize("NFKD", word.casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def make_snippet(texts: List[Optional[str]], terms: List[str], width: int = 12) -> Optional[str]:
+    """
+    Up to `width` words of the text matching the most terms (earlier texts win
+    ties), starting just before the first match, matches wrapped in <b></b>.
+    Done here rather than with FTS5 snippet(), which has to re-walk the whole
+    doclist of a common word for every row it's asked about.
+    """
+    prefixes = [_fold(term) for term in terms]
+    best = None
+
+    for text in texts:
+        if not text:
+            continue
+        words = text.split()
+        hits, matched = [], set()
+        for index, word in enumerate(words):
+            found = {
+                prefix for prefix in prefixes
+                for token in re.findall(r"\w+", word)
+                if _fold(token).startswith(prefix)
+            }
+            if found:
+                hits.append(index)
+                matched |= found
+        if hits and (best is None or len(matched) > best[0]):
+            best = (len(matched), words, hits)
+
+    if best is None:
+        return None
+
+    _, words, hits = best
+    start = max(0, hits[0] - 2)
+    end = min(len(words), start + width)
+    marked = set(hits)
+    shown = [f"<b>{word}</b>" if index in marked else word for index, word in enumerate(words)]
+    return (
+        ("…" if start > 0 else "")
+        + " ".join(shown[start:end])
+        + ("…" if end < len(words) else "")
+    )
@@ -0,0 +1,83 @@
+from sqlalchemy import Column, Integer, String
+
+from app.models.task import Base
+
+
+class TaskCounter(Base):
+    """Running aggregate over tasks - maintained by triggers, never by app code"""
+    __tablename__ = "task_counters"
+
+    name = Column(String, primary_key=True)  # total, status:<status>, quick_wins, ...
+    value = Column(Integer, nullable=False, default=0)
+
+
+# Counter name -> condition on a tasks row (R is NEW or OLD in the triggers)
+COUNTED = {
+    "total": "1",
+    "life_critical_active": "R.is_life_critical AND R.status = 'active'",
+    "quick_wins": "R.is_quick_win AND R.status = 'active'",
+    "high_priority": "R.priority_score >= 0.7 AND R.status = 'active'",
+}
+
+
+def _bump(name_sql: str, delta_sql: str) -> str:
+    return (
+        f"INSERT INTO task_counters (name, value) VALUES ({name_sql}, {delta_sql}) "
+        "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value;"
+    )
+
+
+def _flag(name: str, row: str) -> str:
+    return f"COALESCE(({COUNTED[name].replace('R.', row + '.')}), 0)"
+
+
+def _deltas(row: str, sign: str) -> str:
+    statements = [_bump(f"'status:' || COALESCE({row}.status, 'unknown')", f"{sign}1")]
+    for name in COUNTED:
+        statements.append(_bump(f"'{name}'", f"{sign}{_flag(name, row)}"))
+    return "\n    ".join(statements)
+
+
+def _flag_changes() -> str:
+    statements = []
+    for name in COUNTED:
+        if name == "total":
+            continue
+        delta = f"({_flag(name, 'NEW')} - {_flag(name, 'OLD')})"
+        statements.append(
+            f"UPDATE task_counters SET value = value + {delta} "
+            f"WHERE name = '{name}' AND {delta} != 0;"
+        )
+    return "\n    ".join(statements)
+
+
+# Updates that only touch text or timestamps fire none of these
+COUNTER_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS tasks_counters_insert AFTER INSERT ON tasks BEGIN
+    {_deltas("NEW", "+")}
+END""",
+    f"""CREATE TRIGGER IF NOT EXISTS tasks_counters_delete AFTER DELETE ON tasks BEGIN
+    {_deltas("OLD", "-")}
+END""",
+    f"""CREATE TRIGGER IF NOT EXISTS tasks_counters_status AFTER UPDATE OF status ON tasks
+WHEN OLD.status IS NOT NEW.status BEGIN
+    {_bump("'status:' || COALESCE(OLD.status, 'unknown')", "-1")}
+    {_bump("'status:' || COALESCE(NEW.status, 'unknown')", "+1")}
+END""",
+    f"""CREATE TRIGGER IF NOT EXISTS tasks_counters_flags
+AFTER UPDATE OF status, is_life_critical, is_quick_win, priority_score ON tasks BEGIN
+    {_flag_changes()}
+END""",
+]
+
+
+# Recompute every counter from scratch (first run, or after manual surgery)
+REBUILD_COUNTERS = [
+    "DELETE FROM task_counters",
+    "INSERT INTO task_counters (name, value) "
+    "SELECT 'status:' || COALESCE(status, 'unknown'), COUNT(*) FROM tasks GROUP BY 1",
+] + [
+    f"INSERT INTO task_counters (name, value) "
+    f"SELECT '{name}', COALESCE(SUM({_flag(name, 'tasks')}), 0) FROM tasks"
+    for name in COUNTED
+]
@@ -6,6 +6,10 @@ from sqlalchemy.ext.declarative import declarative_base
 Base = declarative_base()
 
 
+def _serialize(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
 class Task(Base):
     """Task model - keeps it simple, no rigid structure"""
     __tablename__ = "tasks"
@@ -24,14 +28,24 @@ class Task(Base):
     due_by = Column(DateTime, nullable=True)  # Optional, only if you specify
     recurring = Column(Boolean, default=False)
     recurring_pattern = Column(String, nullable=True)  # "daily", "every 2 days", etc
+    next_due = Column(DateTime, nullable=True)  # Next occurrence of a recurring task, see services.scheduler
 
     # Flags
     is_life_critical = Column(Boolean, default=False)  # Meds, food, basics
     is_interesting = Column(Boolean, default=False)  # Fun stuff that pulls focus
     is_quick_win = Column(Boolean, default=False)  # Can knock out fast
     pinned = Column(Boolean, default=False)  # Manually pinned to top
+    duplicate_of = Column(Integer, nullable=True)  # Active task this looks like a repeat of
+
+    # Ranking - see services.ranking
+    rank_score = Column(Float, nullable=False, default=0.0, server_default="0")  # Effective priority, lists sort on it
+    put_off_count = Column(Integer, nullable=False, default=0, server_default="0")  # Times put off
 
-    def to_dict(self):
+    def to_dict(self, fields=None):
+        """All columns, or only `fields` (only those attributes are touched, so
+        it's safe on rows loaded with load_only)"""
+        if fields is not None:
+            return {name: _serialize(getattr(self, name)) for name in fields}
         return {
             "id": self.id,
             "raw_input": self.raw_input,
@@ -45,8 +59,12 @@ class Task(Base):
             "due_by": self.due_by.isoformat() if self.due_by else None,
             "recurring": self.recurring,
             "recurring_pattern": self.recurring_pattern,
+            "next_due": self.next_due.isoformat() if self.next_due else None,
             "is_life_critical": self.is_life_critical,
             "is_interesting": self.is_interesting,
             "is_quick_win": self.is_quick_win,
             "pinned": self.pinned,
+            "duplicate_of": self.duplicate_of,
+            "rank_score": self.rank_score,
+            "put_off_count": self.put_off_count,
         }
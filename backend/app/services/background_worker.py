@@ -1,76 +1,133 @@
 """
-Background worker that processes captured tasks periodically
-Runs independently, can be triggered manually via API
+Background worker that processes captured tasks as soon as they are queued
+Runs as its own process, or inside the API's event loop (IN_PROCESS_WORKER)
+sharing its engine, HTTP pool and processor. Can be triggered manually via API
 """
 import asyncio
 import os
-from datetime import datetime
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+import time
 from sqlalchemy import select
 
+from app.database import async_session_maker, write_session, engine
 from app.models.task import Task
-from app.llm.processor import get_processor
+from app.llm.http import close_http_client
+from app.llm.processor import get_processor, start_model_residency
+from app.services import ranking, scheduler, similarity, spool, work_queue
+from app.services.processing import process_tasks
 
 
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./data/tasks.db")
+async def drain_queue(processor) -> int:
+    """Process queued tasks until the queue is empty"""
+    total = 0
+    while True:
+        async with write_session() as session:
+            task_ids = await work_queue.claim(session)
+        if not task_ids:
+            return total
+
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(Task).where(Task.id.in_(task_ids), Task.status == "captured")
+            )
+            captured_tasks = result.scalars().all()
+
+            if captured_tasks:
+                print(f"[Worker] Processing {len(captured_tasks)} captured tasks...")
+                count = await process_tasks(session, processor, captured_tasks)
+                print(f"[Worker] Processed {count} tasks")
+                total += count
+
+        if not captured_tasks:
+            # Already processed elsewhere (manual trigger) or deleted
+            async with write_session() as session:
+                await work_queue.complete(session, task_ids)
+                await session.commit()
+
+
+def _interval() -> int:
+    # Polling is only a crash-recovery sweep now (default 2 minutes)
+    return int(os.getenv("WORKER_INTERVAL", "120"))
+
+
+async def worker_loop(processor, interval: int):
+    """Wait for queued captures and recurring tasks, sweep periodically - until cancelled"""
+    next_sweep = time.monotonic()
+    while True:
+        try:
+            if time.monotonic() >= next_sweep:
+                next_sweep = time.monotonic() + interval
+                await spool.replay()  # Captures saved while the API was down
 
+                async with write_session() as session:
+                    recovered = await work_queue.sweep(session)
+                if recovered:
+                    print(f"[Worker] Recovered {recovered} unqueued tasks")
 
-async def process_captured_tasks_worker():
-    """Main worker loop - processes captured tasks"""
-    engine = create_async_engine(DATABASE_URL, echo=False)
-    async_session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+                embedded = await similarity.backfill()
+                if embedded:
+                    print(f"[Worker] Embedded {embedded} older tasks")
 
-    processor = get_processor()
-    print(f"[Worker] Started - processing every 2 minutes")
+                reranked = await ranking.refresh()
+                if reranked:
+                    print(f"[Worker] Re-ranked {reranked} tasks")
 
-    while True:
+            resurfaced = await scheduler.run_due()
+            if resurfaced:
+                print(f"[Worker] Resurfaced {resurfaced} recurring tasks")
+
+            await drain_queue(processor)
+
+        except Exception as e:
+            print(f"[Worker] Error: {e}")
+
+        # Sleep until a capture (or a schedule change) wakes us, the next
+        # recurring task comes due, or it's time to sweep
+        timeout = max(0.0, next_sweep - time.monotonic())
         try:
             async with async_session_maker() as session:
-                # Get captured tasks
-                result = await session.execute(
-                    select(Task).where(Task.status == "captured")
-                )
-                captured_tasks = result.scalars().all()
-
-                if captured_tasks:
-                    print(f"[Worker] Processing {len(captured_tasks)} captured tasks...")
-
-                    # Get active tasks for context
-                    result = await session.execute(
-                        select(Task).where(Task.status == "active")
-                    )
-                    active_tasks = result.scalars().all()
-
-                    # Process
-                    new_task_dicts = [t.to_dict() for t in captured_tasks]
-                    active_task_dicts = [t.to_dict() for t in active_tasks]
-
-                    processed = await processor.process_new_tasks(
-                        new_task_dicts,
-                        active_task_dicts
-                    )
-
-                    # Update DB
-                    for task, data in zip(captured_tasks, processed):
-                        task.processed_text = data.get("processed_text")
-                        task.priority_score = data.get("priority_score", 0.5)
-                        task.category = data.get("category")
-                        task.is_life_critical = data.get("is_life_critical", False)
-                        task.is_quick_win = data.get("is_quick_win", False)
-                        task.notes = data.get("notes", "")
-                        task.status = "active"
-                        task.touched_at = datetime.utcnow()
-
-                    await session.commit()
-                    print(f"[Worker] Processed {len(captured_tasks)} tasks")
-
+                due_in = await scheduler.seconds_until_next(session)
+            if due_in is not None:
+                timeout = min(timeout, due_in + 0.05)
         except Exception as e:
             print(f"[Worker] Error: {e}")
+        await work_queue.wait_for_work(timeout)
+
+
+def start_in_process() -> asyncio.Task:
+    """
+    Run the worker as a task in the current (API) event loop - captures wake
+    it through the in-process event, no socket. Cancel it on shutdown
+    """
+    interval = _interval()
+    task = asyncio.create_task(worker_loop(get_processor(), interval), name="worker")
+
+    def _stopped(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            print(f"[Worker] Stopped: {task.exception()!r}")
 
-        # Wait before next run (default 2 minutes)
-        interval = int(os.getenv("WORKER_INTERVAL", "120"))
-        await asyncio.sleep(interval)
+    task.add_done_callback(_stopped)
+    print(f"[Worker] Started in-process - recovery sweep every {interval}s")
+    return task
+
+
+async def process_captured_tasks_worker():
+    """Standalone worker process - its own engine, HTTP pool, processor and wake-up socket"""
+    processor = get_processor()
+    interval = _interval()
+
+    listener = work_queue.WakeupListener()
+    listener.start()
+    residency = await start_model_residency(processor)
+    print(f"[Worker] Started - waiting for captures, recovery sweep every {interval}s")
+
+    try:
+        await worker_loop(processor, interval)
+    finally:
+        for task in residency:
+            task.cancel()
+        listener.close()
+        await close_http_client()
+        await engine.dispose()
 
 
 if __name__ == "__main__":
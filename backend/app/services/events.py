@@ -0,0 +1,144 @@
+"""
+Live change feed for task updates
+Triggers log every task insert/update/delete to task_events. One poller per
+process tails that table and fans new events out to subscribers (the SSE
+endpoint). Writes made in this process call notify() so the poller runs at
+once; writes from the worker show up on the next poll.
+"""
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import select, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import async_session_maker, write_session
+from app.models.events import TaskEvent
+from app.models.task import Task
+from app.services import metrics
+
+POLL_INTERVAL = float(os.getenv("EVENTS_POLL_INTERVAL", "0.5"))  # Seconds
+RETENTION = int(os.getenv("EVENTS_RETENTION", "10000"))  # Events kept for resuming clients
+PRUNE_EVERY = timedelta(minutes=10)
+BATCH = 500
+QUEUE_SIZE = 1000  # Per subscriber, beyond that it gets a reset instead
+
+
+class Subscriber:
+    """One connected client"""
+
+    def __init__(self, start_id: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.overflowed = False
+        self.start_id = start_id  # Cursor when subscribed - queued events come after it
+
+    def push(self, event: dict):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+_wakeup = asyncio.Event()
+_subscribers: Set[Subscriber] = set()
+_poller: Optional[asyncio.Task] = None
+_cursor: Optional[int] = None  # Last event id fanned out
+_start_lock = asyncio.Lock()
+
+
+def notify():
+    """Something changed in this process - poll now instead of on the timer"""
+    _wakeup.set()
+
+
+async def latest_id(session: AsyncSession) -> int:
+    return (await session.execute(select(func.max(TaskEvent.id)))).scalar() or 0
+
+
+async def oldest_id(session: AsyncSession) -> int:
+    return (await session.execute(select(func.min(TaskEvent.id)))).scalar() or 0
+
+
+async def fetch_since(session: AsyncSession, after_id: int, limit: int = BATCH) -> List[dict]:
+    """Events after `after_id`, each with the task's current state (None once deleted)"""
+    result = await session.execute(
+        select(TaskEvent).where(TaskEvent.id > after_id).order_by(TaskEvent.id).limit(limit)
+    )
+    rows = result.scalars().all()
+    if not rows:
+        return []
+
+    task_ids = {row.task_id for row in rows if row.kind != "deleted"}
+    tasks: Dict[int, dict] = {}
+    if task_ids:
+        result = await session.execute(select(Task).where(Task.id.in_(task_ids)))
+        tasks = {task.id: task.to_dict() for task in result.scalars().all()}
+
+    return [
+        {"id": row.id, "kind": row.kind, "task_id": row.task_id, "task": tasks.get(row.task_id)}
+        for row in rows
+    ]
+
+
+async def _prune():
+    async with write_session() as session:
+        newest = await latest_id(session)
+        await session.execute(delete(TaskEvent).where(TaskEvent.id <= newest - RETENTION))
+        await session.commit()
+
+
+async def _poll():
+    """Tail task_events while anyone is subscribed"""
+    global _cursor, _poller
+    next_prune = datetime.utcnow()
+    try:
+        while _subscribers:
+            _wakeup.clear()
+            events = []
+            try:
+                async with async_session_maker() as session:
+                    events = await fetch_since(session, _cursor)
+                for event in events:
+                    for subscriber in list(_subscribers):
+                        subscriber.push(event)
+                if events:
+                    _cursor = events[-1]["id"]
+                    metrics.inc("events_published", len(events))
+
+                if datetime.utcnow() >= next_prune:
+                    await _prune()
+                    next_prune = datetime.utcnow() + PRUNE_EVERY
+            except Exception as e:
+                print(f"[Events] Poll error: {e}")
+
+            if len(events) == BATCH:
+                continue  # Backlog - keep reading
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        _poller = None
+
+
+async def subscribe() -> Subscriber:
+    """Register a client; it receives every event after the current cursor"""
+    global _cursor, _poller
+    async with _start_lock:
+        if _poller is None:
+            # First subscriber (again) - start from now, not from a stale cursor
+            async with async_session_maker() as session:
+                _cursor = await latest_id(session)
+        subscriber = Subscriber(_cursor)
+        _subscribers.add(subscriber)
+        if _poller is None:
+            _poller = asyncio.create_task(_poll())
+    metrics.set_gauge("events_subscribers", len(_subscribers))
+    return subscriber
+
+
+def unsubscribe(subscriber: Subscriber):
+    _subscribers.discard(subscriber)
+    metrics.set_gauge("events_subscribers", len(_subscribers))
+
@@ -0,0 +1,81 @@
+"""
+In-process metrics registry
+Counters and rolling-window histograms, exposed at /metrics
+"""
+from collections import deque
+from typing import Dict, Iterable, List
+
+
+class Histogram:
+    """Keeps the last `window` observations for percentile reporting"""
+
+    def __init__(self, window: int = 1024):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+
+    def snapshot(self) -> Dict[str, float]:
+        snap = summarize(self.samples)
+        snap["count"] = self.count
+        snap["sum"] = round(self.total, 6)
+        return snap
+
+
+_counters: Dict[str, float] = {}
+_gauges: Dict[str, float] = {}
+_histograms: Dict[str, Histogram] = {}
+
+
+def inc(name: str, amount: float = 1):
+    """Increment a counter"""
+    _counters[name] = _counters.get(name, 0) + amount
+
+
+def set_gauge(name: str, value: float):
+    """Set a point-in-time value"""
+    _gauges[name] = value
+
+
+def observe(name: str, value: float):
+    """Record an observation in a histogram"""
+    hist = _histograms.get(name)
+    if hist is None:
+        hist = _histograms[name] = Histogram()
+    hist.observe(value)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, int(round(pct / 100 * len(values) + 0.5)) - 1))
+    return values[index]
+
+
+def summarize(values: Iterable[float]) -> Dict[str, float]:
+    """p50/p95/p99/max summary of a set of observations"""
+    ordered = sorted(values)
+    if not ordered:
+        return {"samples": 0}
+    return {
+        "samples": len(ordered),
+        "avg": round(sum(ordered) / len(ordered), 6),
+        "p50": round(percentile(ordered, 50), 6),
+        "p95": round(percentile(ordered, 95), 6),
+        "p99": round(percentile(ordered, 99), 6),
+        "max": round(ordered[-1], 6),
+    }
+
+
+def snapshot() -> Dict[str, dict]:
+    """Current value of every counter and histogram"""
+    return {
+        "counters": dict(_counters),
+        "gauges": dict(_gauges),
+        "histograms": {name: h.snapshot() for name, h in _histograms.items()},
+    }
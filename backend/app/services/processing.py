@@ -0,0 +1,97 @@
+"""
+Shared processing step - turns captured tasks into active ones
+Used by the background worker and the manual /tasks/process trigger
+"""
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import write_session
+from app.models.task import Task
+from app.llm.processor import TaskProcessor
+from app.services import events, metrics, ranking, scheduler, similarity, work_queue
+
+
+async def process_tasks(
+    session: AsyncSession,
+    processor: TaskProcessor,
+    captured_tasks: List[Task],
+) -> int:
+    """Run captured tasks through the model and mark them active"""
+    if not captured_tasks:
+        return 0
+
+    # Get active tasks for context
+    result = await session.execute(
+        select(Task).where(Task.status == "active")
+    )
+    active_tasks = result.scalars().all()
+
+    new_task_dicts = [t.to_dict() for t in captured_tasks]
+    active_task_dicts = [t.to_dict() for t in active_tasks]
+
+    # End the read transaction - nothing should be held open during the model call
+    await session.commit()
+
+    # Similar earlier tasks as context, and repeats of active ones
+    related = {}
+    vectors = await similarity.embed_tasks(new_task_dicts)
+    if vectors is not None:
+        related = await similarity.find_related(session, new_task_dicts, vectors)
+        await session.commit()
+
+    processed = await processor.process_new_tasks(
+        new_task_dicts,
+        active_task_dicts,
+        related=related,
+    )
+
+    # Short write transaction - reload, since tasks may have changed meanwhile
+    task_ids = [t.id for t in captured_tasks]
+    async with write_session() as write:
+        result = await write.execute(
+            select(Task).where(Task.id.in_(task_ids), Task.status == "captured")
+        )
+        still_captured = {task.id: task for task in result.scalars().all()}
+
+        now = datetime.utcnow()
+        count = scheduled = 0
+        for task_id, data in zip(task_ids, processed):
+            task = still_captured.get(task_id)
+            if task is None:
+                # Deleted or processed elsewhere while the model was thinking
+                continue
+
+            task.processed_text = data.get("processed_text")
+            task.priority_score = data.get("priority_score", 0.5)
+            task.category = data.get("category")
+            task.is_life_critical = data.get("is_life_critical", False)
+            task.is_quick_win = data.get("is_quick_win", False)
+            task.notes = data.get("notes", "")
+            task.duplicate_of = related.get(task_id, {}).get("duplicate_of")
+            task.status = "active"
+            task.touched_at = now
+            pattern = data.get("recurring_pattern")
+            if pattern and not task.recurring and scheduler.schedule(task, pattern, now):
+                scheduled += 1
+            task.rank_score = ranking.rank_task(task, now)
+            count += 1
+
+            if task.created_at:
+                metrics.observe(
+                    "capture_to_active_seconds",
+                    (now - task.created_at).total_seconds(),
+                )
+
+        if vectors is not None:
+            await similarity.store(write, task_ids, vectors)
+        await work_queue.complete(write, task_ids)
+        await write.commit()
+    events.notify()
+    if scheduled:
+        work_queue.notify()  # So the worker's sleep accounts for the new next_due
+
+    metrics.inc("tasks_processed", count)
+    return count
@@ -0,0 +1,101 @@
+"""
+SQL query instrumentation
+Hooks SQLAlchemy cursor events to time every statement. Slow statements are
+always logged; a sample of the rest feeds per-statement-type histograms
+(e.g. "SELECT tasks", "INSERT work_queue") exposed at /metrics.
+"""
+import os
+import random
+import re
+import time
+from collections import deque
+from typing import Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.services.metrics import Histogram
+
+SAMPLE_RATE = float(os.getenv("SQL_SAMPLE_RATE", "0.1"))  # Fraction of statements recorded
+SLOW_MS = float(os.getenv("SQL_SLOW_MS", "100"))  # Always log statements slower than this
+
+_STATEMENT = re.compile(
+    r"^\s*(?:"
+    r"(SELECT|DELETE)\b.*?\bFROM\s+[\"`]?(\w+)"
+    r"|(INSERT)\s+(?:OR\s+\w+\s+)?INTO\s+[\"`]?(\w+)"
+    r"|(UPDATE)\s+(?:OR\s+\w+\s+)?[\"`]?(\w+)"
+    r"|(\w+)"
+    r")",
+    re.IGNORECASE | re.DOTALL,
+)
+
+_histograms: Dict[str, Histogram] = {}
+_fingerprints: Dict[str, str] = {}
+_slow = deque(maxlen=20)
+_totals = {"statements": 0, "sampled": 0, "slow": 0}
+
+
+def fingerprint(statement: str) -> str:
+    """Statement type plus main table - the histogram key"""
+    key = _fingerprints.get(statement)
+    if key is None:
+        match = _STATEMENT.match(statement)
+        if match is None:
+            key = "OTHER"
+        else:
+            parts = [group for group in match.groups() if group]
+            key = " ".join([parts[0].upper()] + parts[1:])
+        # Compiled statements are cached by SQLAlchemy, so this stays small;
+        # the bound is for ad-hoc SQL with literals inlined
+        if len(_fingerprints) < 1024:
+            _fingerprints[statement] = key
+    return key
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    elapsed = time.perf_counter() - started
+    _totals["statements"] += 1
+
+    if elapsed * 1000 >= SLOW_MS:
+        _totals["slow"] += 1
+        text = " ".join(statement.split())[:300]
+        _slow.append({"ms": round(elapsed * 1000, 2), "statement": text})
+        print(f"[SQL] slow {elapsed * 1000:.1f} ms: {text}")
+
+    if SAMPLE_RATE >= 1 or random.random() < SAMPLE_RATE:
+        _totals["sampled"] += 1
+        key = fingerprint(statement)
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = Histogram()
+        hist.observe(elapsed)
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute doesn't fire for failed statements
+    started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+def instrument(engine: Engine):
+    """Attach timing hooks to a (sync) engine"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def snapshot() -> dict:
+    """Totals, per-statement-type timings (seconds) and recent slow statements"""
+    return {
+        **_totals,
+        "sample_rate": SAMPLE_RATE,
+        "slow_ms": SLOW_MS,
+        "by_statement": {key: hist.snapshot() for key, hist in sorted(_histograms.items())},
+        "recent_slow": list(_slow),
+    }
@@ -0,0 +1,130 @@
+"""
+Effective priority ("rank") for active tasks - no model calls
+priority_score is the model's (or your) one-off judgement; rank_score is
+what lists sort on. It moves with time: due dates pull tasks up, old tasks
+creep up so nothing starves, stale low-value ideas fade, and flags and
+put-off history nudge. Computed for all active tasks in one vectorized
+pass; only rows whose rank actually moved are written back.
+
+    rank = priority
+         + DUE_WEIGHT   * urgency       (1 when overdue, halves every DUE_HALF_LIFE before)
+         + AGE_WEIGHT   * (1 - 2^(-age / AGE_HALF_LIFE))
+         - STALE_WEIGHT * (1 - 2^(-untouched / STALE_HALF_LIFE))   ideas only
+         + CRITICAL_BONUS, QUICK_WIN_BONUS
+         + PUT_OFF_STEP * min(put_offs, PUT_OFF_MAX)              avoided, not gone
+         + PINNED_BONUS                                           always on top
+"""
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import select, text
+
+from app.database import async_session_maker, write_session
+from app.models.task import Task
+from app.services import events, metrics
+
+DUE_WEIGHT = 0.3
+DUE_HALF_LIFE = 24.0  # Hours
+AGE_WEIGHT = 0.1
+AGE_HALF_LIFE = 7.0  # Days
+STALE_WEIGHT = 0.15
+STALE_HALF_LIFE = 14.0  # Days
+IDEA_BELOW = 0.3  # Priority under this (or is_interesting) counts as an idea
+CRITICAL_BONUS = 0.1
+QUICK_WIN_BONUS = 0.05
+PUT_OFF_STEP = 0.03
+PUT_OFF_MAX = 5
+PINNED_BONUS = 10.0
+
+# Smaller moves aren't written back - keeps refreshes from touching every row
+EPSILON = float(os.getenv("RANK_EPSILON", "0.005"))
+
+FEATURES = [
+    Task.id, Task.priority_score, Task.created_at, Task.touched_at, Task.due_by,
+    Task.is_life_critical, Task.is_quick_win, Task.is_interesting, Task.pinned,
+    Task.put_off_count, Task.rank_score,
+]
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _seconds(values: Sequence[Optional[datetime]], missing: float) -> np.ndarray:
+    return np.array(
+        [(value - _EPOCH).total_seconds() if value is not None else missing for value in values],
+        dtype=np.float64,
+    )
+
+
+def compute(rows: Sequence, now: Optional[datetime] = None) -> np.ndarray:
+    """Rank for each row (anything with the FEATURES attributes), one array op per term"""
+    if not rows:
+        return np.zeros(0)
+    now_s = ((now or datetime.utcnow()) - _EPOCH).total_seconds()
+
+    priority = np.array([row.priority_score if row.priority_score is not None else 0.5 for row in rows])
+    created = _seconds([row.created_at for row in rows], now_s)
+    touched = _seconds([row.touched_at for row in rows], now_s)
+    due = _seconds([row.due_by for row in rows], np.nan)
+    critical = np.array([bool(row.is_life_critical) for row in rows])
+    quick = np.array([bool(row.is_quick_win) for row in rows])
+    interesting = np.array([bool(row.is_interesting) for row in rows])
+    pinned = np.array([bool(row.pinned) for row in rows])
+    put_offs = np.array([row.put_off_count or 0 for row in rows])
+
+    hours_left = (due - now_s) / 3600
+    with np.errstate(invalid="ignore", over="ignore"):
+        urgency = np.where(np.isnan(due), 0.0, np.exp2(-np.clip(hours_left, 0, None) / DUE_HALF_LIFE))
+    age_days = np.clip(now_s - created, 0, None) / 86400
+    stale_days = np.clip(now_s - touched, 0, None) / 86400
+    idea = interesting | (priority < IDEA_BELOW)
+
+    rank = (
+        priority
+        + DUE_WEIGHT * urgency
+        + AGE_WEIGHT * (1 - np.exp2(-age_days / AGE_HALF_LIFE))
+        - STALE_WEIGHT * (1 - np.exp2(-stale_days / STALE_HALF_LIFE)) * (idea & ~critical)
+        + CRITICAL_BONUS * critical
+        + QUICK_WIN_BONUS * quick
+        + PUT_OFF_STEP * np.minimum(put_offs, PUT_OFF_MAX)
+        + PINNED_BONUS * pinned
+    )
+    return np.round(rank, 4)
+
+
+def rank_task(task: Task, now: Optional[datetime] = None) -> float:
+    """Rank for one task, for setting it alongside an edit"""
+    return float(compute([task], now)[0])
+
+
+async def refresh() -> int:
+    """Re-rank every active task; returns how many ranks were written"""
+    started = time.monotonic()
+    async with async_session_maker() as session:
+        result = await session.execute(select(*FEATURES).where(Task.status == "active"))
+        rows = result.all()
+    if not rows:
+        return 0
+
+    ranks = compute(rows)
+    current = np.array([row.rank_score if row.rank_score is not None else np.nan for row in rows])
+    moved = np.flatnonzero(~(np.abs(ranks - current) < EPSILON))
+    changes: List[Dict] = [{"rank": float(ranks[i]), "id": rows[i].id} for i in moved]
+
+    if changes:
+        async with write_session() as session:
+            # Plain SQL: ranking isn't an edit, so touched_at must not move
+            await session.execute(
+                text("UPDATE tasks SET rank_score = :rank WHERE id = :id AND status = 'active'"),
+                changes,
+            )
+            await session.commit()
+        events.notify()
+
+    elapsed = time.monotonic() - started
+    metrics.observe("rank_refresh_seconds", elapsed)
+    metrics.inc("rank_updates", len(changes))
+    metrics.set_gauge("ranked_tasks", len(rows))
+    return len(changes)
@@ -0,0 +1,280 @@
+"""
+Recurring tasks
+A task with a recurring_pattern ("daily", "every 2 days", "mondays at 9am",
+"twice a day") carries the time of its next occurrence in next_due. The
+worker asks the partial next_due index for the earliest one and sleeps until
+then; due rows are found by an index range scan, never a table scan.
+
+When an occurrence comes due, the task resurfaces: if the last one is still
+open it's brought back up (due now, touched), otherwise a fresh copy goes
+active and takes the schedule over. Missed occurrences (worker was down)
+collapse into one. A put-off (or lost-interest) task skips its occurrences
+until it's picked back up; a dismissed one loses its schedule.
+"""
+import calendar
+import os
+import re
+import time as clock
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from typing import Optional, Set
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import write_session
+from app.models.task import Task
+from app.services import events, metrics, ranking
+
+BATCH = 500  # Due occurrences handled per transaction
+
+# Statuses that end a task's schedule, and the ones that only skip occurrences
+DISMISSED = {"fuck_off", "archived"}
+PAUSED = {"put_off", "lost_interest"}
+
+_WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+_TIMES_OF_DAY = {"morning": time(8), "noon": time(12), "afternoon": time(15),
+                 "evening": time(19), "night": time(21), "bedtime": time(22)}
+_UNITS = {"minute": timedelta(minutes=1), "hour": timedelta(hours=1),
+          "day": timedelta(days=1), "week": timedelta(weeks=1)}
+
+
+def _local_tz() -> tzinfo:
+    """Times of day in patterns are wall-clock time here"""
+    name = os.getenv("SCHEDULER_TZ")
+    if name:
+        from zoneinfo import ZoneInfo
+        return ZoneInfo(name)
+    return datetime.now().astimezone().tzinfo
+
+
+def _to_local(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc).astimezone(_local_tz())
+
+
+def _to_utc(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _add_months(value: datetime, months: int) -> datetime:
+    month = value.month - 1 + months
+    year, month = value.year + month // 12, month % 12 + 1
+    return value.replace(year=year, month=month, day=min(value.day, calendar.monthrange(year, month)[1]))
+
+
+class Recurrence:
+    """A parsed recurring_pattern: a fixed interval, months, or weekdays, optionally at a time of day"""
+
+    def __init__(
+        self,
+        interval: Optional[timedelta] = None,
+        months: int = 0,
+        weekdays: Optional[Set[int]] = None,
+        at: Optional[time] = None,
+    ):
+        self.interval = interval
+        self.months = months
+        self.weekdays = weekdays
+        self.at = at
+
+    def next_after(self, after: datetime, anchor: Optional[datetime] = None) -> datetime:
+        """
+        First occurrence strictly after `after` (naive UTC, like the columns),
+        keeping to the phase of `anchor` (the previous occurrence) so "daily"
+        stays at the same time of day
+        """
+        now = _to_local(after)
+        start = _to_local(anchor or after)
+        if self.at is not None:
+            start = start.replace(hour=self.at.hour, minute=self.at.minute, second=0, microsecond=0)
+
+        if self.weekdays:
+            day: date = now.date()
+            for offset in range(8):
+                candidate = datetime.combine(day + timedelta(days=offset), start.timetz())
+                if candidate.weekday() in self.weekdays and candidate > now:
+                    return _to_utc(candidate)
+
+        if self.months:
+            candidate = start
+            while candidate <= now:
+                candidate = _add_months(candidate, self.months)
+            return _to_utc(candidate)
+
+        step = self.interval or timedelta(days=1)
+        candidate = start
+        if candidate <= now:
+            # Skip straight past missed occurrences
+            candidate += step * ((now - candidate) // step + 1)
+        return _to_utc(candidate)
+
+
+def _parse_time(text: str) -> Optional[time]:
+    match = re.search(r"\b(?:at\s+)?(\d{1,2})(?::(\d{2}))?\s*(am|pm)\b|\bat\s+(\d{1,2})(?::(\d{2}))?\b", text)
+    if match:
+        hour = int(match.group(1) or match.group(4))
+        minute = int(match.group(2) or match.group(5) or 0)
+        meridiem = match.group(3)
+        if meridiem == "pm" and hour < 12:
+            hour += 12
+        elif meridiem == "am" and hour == 12:
+            hour = 0
+        if hour < 24 and minute < 60:
+            return time(hour, minute)
+    for word, at in _TIMES_OF_DAY.items():
+        if re.search(rf"\b{word}s?\b", text):
+            return at
+    return None
+
+
+def parse_pattern(pattern: Optional[str]) -> Optional[Recurrence]:
+    """Recurrence for a free-text pattern, None if it isn't one we understand"""
+    if not pattern:
+        return None
+    text = pattern.strip().lower()
+    at = _parse_time(text)
+
+    weekdays = {
+        number for number, name in enumerate(_WEEKDAYS)
+        if re.search(rf"\b(?:{name}s?|{name[:3]})\b", text)
+    }
+    if re.search(r"\bweekdays?\b", text):
+        weekdays |= {0, 1, 2, 3, 4}
+    if re.search(r"\bweekends?\b", text):
+        weekdays |= {5, 6}
+    if weekdays:
+        return Recurrence(weekdays=weekdays, at=at)
+
+    if re.search(r"\b(twice a day|twice daily)\b", text):
+        return Recurrence(interval=timedelta(hours=12), at=at)
+    if re.search(r"\bevery other\b", text):
+        text = text.replace("every other", "every 2")
+
+    match = re.search(r"\bevery\s+(\d+)?\s*(minute|hour|day|week|month)s?\b", text)
+    if match:
+        count = int(match.group(1) or 1)
+        if count < 1:
+            return None
+        if match.group(2) == "month":
+            return Recurrence(months=count, at=at)
+        return Recurrence(interval=_UNITS[match.group(2)] * count, at=at)
+
+    for word, step in (("hourly", timedelta(hours=1)), ("daily", timedelta(days=1)),
+                       ("nightly", timedelta(days=1)), ("weekly", timedelta(weeks=1)),
+                       ("fortnightly", timedelta(weeks=2))):
+        if re.search(rf"\b{word}\b", text):
+            return Recurrence(interval=step, at=at)
+    if re.search(r"\bmonthly\b", text):
+        return Recurrence(months=1, at=at)
+    if re.search(r"\b(yearly|annually)\b", text):
+        return Recurrence(months=12, at=at)
+    if at is not None and re.search(r"\b(each|every)\b", text):
+        return Recurrence(interval=timedelta(days=1), at=at)  # "every morning"
+    return None
+
+
+def schedule(task: Task, pattern: Optional[str], now: Optional[datetime] = None) -> bool:
+    """
+    Set (or clear, for an empty pattern) a task's recurrence and first
+    next_due. False if the pattern isn't understood - the task is unchanged
+    """
+    if not pattern:
+        task.recurring = False
+        task.recurring_pattern = None
+        task.next_due = None
+        return True
+    rule = parse_pattern(pattern)
+    if rule is None:
+        return False
+    now = now or datetime.utcnow()
+    task.recurring = True
+    task.recurring_pattern = pattern.strip()
+    task.next_due = rule.next_after(now, anchor=task.created_at or now)
+    return True
+
+
+async def seconds_until_next(session: AsyncSession) -> Optional[float]:
+    """Time until the earliest occurrence - one index seek"""
+    # The IS NOT NULL is what lets SQLite use the partial index
+    next_due = (await session.execute(
+        select(func.min(Task.next_due)).where(Task.next_due.isnot(None))
+    )).scalar()
+    if next_due is None:
+        return None
+    return max(0.0, (next_due - datetime.utcnow()).total_seconds())
+
+
+def _resurface(task: Task, due: datetime, now: datetime) -> Optional[Task]:
+    """Bring the task back for occurrence `due`; returns the new copy, if one was made"""
+    if task.status in ("active", "captured"):
+        task.due_by = due
+        task.touched_at = now
+        task.rank_score = ranking.rank_task(task, now)
+        return None
+
+    copy = Task(
+        raw_input=task.raw_input,
+        processed_text=task.processed_text,
+        status="active",
+        priority_score=task.priority_score,
+        category=task.category,
+        notes=task.notes,
+        created_at=now,
+        touched_at=now,
+        due_by=due,
+        recurring=True,
+        recurring_pattern=task.recurring_pattern,
+        next_due=task.next_due,
+        is_life_critical=task.is_life_critical,
+        is_interesting=task.is_interesting,
+        is_quick_win=task.is_quick_win,
+        pinned=task.pinned,
+    )
+    copy.put_off_count = 0
+    copy.rank_score = ranking.rank_task(copy, now)
+    # The copy carries the schedule from here on
+    task.next_due = None
+    return copy
+
+
+async def run_due() -> int:
+    """Resurface every recurring task whose occurrence has come; returns how many"""
+    resurfaced = 0
+    while True:
+        started = clock.monotonic()
+        now = datetime.utcnow()
+        async with write_session() as session:
+            result = await session.execute(
+                select(Task).where(Task.next_due <= now).order_by(Task.next_due).limit(BATCH)
+            )
+            due_tasks = result.scalars().all()
+            if not due_tasks:
+                break
+
+            for task in due_tasks:
+                rule = parse_pattern(task.recurring_pattern)
+                due = task.next_due
+                if task.status in DISMISSED:
+                    task.next_due = None
+                    continue
+                if rule is None:
+                    print(f"[Scheduler] Task {task.id}: can't parse {task.recurring_pattern!r}, dropping schedule")
+                    task.next_due = None
+                    continue
+                task.next_due = rule.next_after(now, anchor=due)
+                if task.status in PAUSED:
+                    continue
+                resurfaced += 1
+                copy = _resurface(task, due, now)
+                if copy is not None:
+                    session.add(copy)
+                metrics.observe("recurring_lateness_seconds", (now - due).total_seconds())
+
+            await session.commit()
+        events.notify()
+        metrics.observe("scheduler_run_seconds", clock.monotonic() - started)
+        if len(due_tasks) < BATCH:
+            break
+
+    if resurfaced:
+        metrics.inc("recurring_resurfaced", resurfaced)
+    return resurfaced
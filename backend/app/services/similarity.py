@@ -0,0 +1,243 @@
+"""
+Semantic similarity over task history
+Embeddings live in task_embeddings (float16, unit length); each process keeps
+them in an in-memory float16 matrix, topped up from the table by id, and
+answers "most similar tasks" with a matrix product over it, widened to
+float32 one block of rows at a time. Half the memory of a float32 copy
+(~150 MB at 100k x 768) for a slower search - fine for the worker, which
+searches once per batch.
+Used at processing time to give the model related older tasks as context and
+to flag new captures that repeat an active task.
+"""
+import asyncio
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+
+from app.database import async_session_maker, write_session
+from app.llm.embeddings import get_embedder
+from app.models.embeddings import TaskEmbedding
+from app.models.task import Task
+from app.services import metrics
+
+CONTEXT_K = int(os.getenv("SIMILAR_CONTEXT_K", "5"))  # Related tasks shown per new task
+MIN_SCORE = float(os.getenv("SIMILAR_MIN_SCORE", "0.6"))  # Below this it isn't related
+DUPLICATE_SCORE = float(os.getenv("SIMILAR_DUPLICATE_SCORE", "0.92"))
+BACKFILL_BATCH = int(os.getenv("EMBED_BACKFILL_BATCH", "256"))  # Per worker sweep
+CANDIDATES = 50  # Nearest rows looked up per query, before status/deleted filtering
+SYNC_BATCH = 5000
+SEARCH_BLOCK = 8192  # Rows widened to float32 at a time during a search
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Unit length rows, so a dot product is the cosine similarity"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class VectorIndex:
+    """Task id -> unit vector (kept as float16), brute-force cosine search"""
+
+    def __init__(self):
+        self.model: Optional[str] = None
+        self.last_id = 0  # Highest task_embeddings.id loaded
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._vectors: Optional[np.ndarray] = None
+        self._rows: Dict[int, int] = {}
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def reset(self, model: Optional[str] = None):
+        self.__init__()
+        self.model = model
+
+    def upsert(self, task_ids: List[int], vectors: np.ndarray):
+        vectors = normalize(vectors).astype(np.float16)
+        if self._vectors is None or self._vectors.shape[1] != vectors.shape[1]:
+            self._ids = np.zeros(0, dtype=np.int64)
+            self._vectors = np.zeros((0, vectors.shape[1]), dtype=np.float16)
+            self._rows, self._count = {}, 0
+
+        needed = self._count + sum(1 for task_id in task_ids if task_id not in self._rows)
+        if needed > len(self._ids):
+            # Grow by doubling so appends stay amortised O(1)
+            capacity = max(needed, 2 * len(self._ids), 1024)
+            vectors_grown = np.zeros((capacity, self._vectors.shape[1]), dtype=np.float16)
+            vectors_grown[:self._count] = self._vectors[:self._count]
+            ids_grown = np.zeros(capacity, dtype=np.int64)
+            ids_grown[:self._count] = self._ids[:self._count]
+            self._vectors, self._ids = vectors_grown, ids_grown
+
+        for task_id, vector in zip(task_ids, vectors):
+            row = self._rows.get(task_id)
+            if row is None:
+                row = self._count
+                self._rows[task_id] = row
+                self._ids[row] = task_id
+                self._count += 1
+            self._vectors[row] = vector
+
+    def search(self, queries: np.ndarray, k: int) -> List[List[Tuple[int, float]]]:
+        """The k most similar task ids for each query row, best first"""
+        queries = normalize(np.atleast_2d(queries))
+        if not self._count or queries.shape[1] != self._vectors.shape[1]:
+            return [[] for _ in queries]
+
+        scores = np.empty((self._count, len(queries)), dtype=np.float32)  # (rows, queries)
+        block = np.empty((min(SEARCH_BLOCK, self._count), self._vectors.shape[1]), dtype=np.float32)
+        for start in range(0, self._count, SEARCH_BLOCK):
+            rows = self._vectors[start:min(start + SEARCH_BLOCK, self._count)]
+            widened = block[:len(rows)]
+            widened[...] = rows  # Only this block is ever float32
+            np.matmul(widened, queries.T, out=scores[start:start + len(rows)])
+        k = min(k, self._count)
+        results = []
+        for column in scores.T:
+            # argpartition finds the top k in O(n); only those k get sorted
+            top = np.argpartition(-column, k - 1)[:k]
+            top = top[np.argsort(-column[top])]
+            results.append([(int(self._ids[row]), float(column[row])) for row in top])
+        return results
+
+
+_index = VectorIndex()
+_sync_lock = asyncio.Lock()
+
+
+async def sync(session: AsyncSession, model: str) -> VectorIndex:
+    """Load embeddings written since the last sync (by this or any other process)"""
+    async with _sync_lock:
+        if _index.model != model:
+            _index.reset(model)
+        while True:
+            result = await session.execute(
+                select(TaskEmbedding.id, TaskEmbedding.task_id, TaskEmbedding.vector)
+                .where(TaskEmbedding.id > _index.last_id, TaskEmbedding.model == model)
+                .order_by(TaskEmbedding.id)
+                .limit(SYNC_BATCH)
+            )
+            rows = result.all()
+            if not rows:
+                break
+            vectors = np.vstack([np.frombuffer(row.vector, dtype=np.float16) for row in rows])
+            _index.upsert([row.task_id for row in rows], vectors)
+            _index.last_id = rows[-1].id
+        metrics.set_gauge("embedding_index_size", len(_index))
+        return _index
+
+
+async def embed_tasks(tasks: List[Dict]) -> Optional[np.ndarray]:
+    """Unit vectors for the tasks' raw input, None if embeddings are off or failing"""
+    embedder = get_embedder()
+    if embedder is None or not tasks or not embedder.available():
+        return None
+    started = time.monotonic()
+    try:
+        vectors = await embedder.embed([task["raw_input"] for task in tasks])
+    except Exception as e:
+        print(f"[Similarity] Embedding failed, processing without related tasks: {e}")
+        metrics.inc("embedding_failures")
+        return None
+    metrics.observe("embedding_seconds", time.monotonic() - started)
+    return normalize(vectors)
+
+
+async def find_related(
+    session: AsyncSession,
+    tasks: List[Dict],
+    vectors: np.ndarray,
+    k: int = CONTEXT_K,
+) -> Dict[int, Dict]:
+    """
+    For each task: up to k similar earlier tasks (any status) and, if one
+    active task is close enough, the id it duplicates
+    """
+    embedder = get_embedder()
+    index = await sync(session, embedder.model_name)
+
+    started = time.monotonic()
+    new_ids = {task["id"] for task in tasks}
+    hits = index.search(vectors, CANDIDATES + len(new_ids))
+    metrics.observe("similarity_search_seconds", time.monotonic() - started)
+
+    candidate_ids = {task_id for row in hits for task_id, _ in row} - new_ids
+    known: Dict[int, Task] = {}
+    if candidate_ids:
+        result = await session.execute(
+            select(Task)
+            .options(load_only(
+                Task.id, Task.raw_input, Task.processed_text, Task.status,
+                Task.priority_score, Task.category,
+            ))
+            .where(Task.id.in_(candidate_ids))
+        )
+        known = {task.id: task for task in result.scalars().all()}
+
+    related: Dict[int, Dict] = {}
+    for task, row in zip(tasks, hits):
+        similar, duplicate_of = [], None
+        for task_id, score in row:
+            match = known.get(task_id)  # Missing: one of this batch, or deleted since
+            if match is None or score < MIN_SCORE:
+                continue
+            if duplicate_of is None and match.status == "active" and score >= DUPLICATE_SCORE:
+                duplicate_of = match.id
+            if len(similar) < k:
+                similar.append({
+                    "id": match.id,
+                    "text": match.processed_text or match.raw_input,
+                    "status": match.status,
+                    "category": match.category,
+                    "priority_score": match.priority_score,
+                    "similarity": round(score, 3),
+                })
+        related[task["id"]] = {"similar": similar, "duplicate_of": duplicate_of}
+    return related
+
+
+async def store(session: AsyncSession, task_ids: List[int], vectors: np.ndarray):
+    """Save embeddings (replacing older ones) - caller commits"""
+    if not task_ids:
+        return
+    model = get_embedder().model_name
+    await session.execute(delete(TaskEmbedding).where(TaskEmbedding.task_id.in_(task_ids)))
+    session.add_all([
+        TaskEmbedding(task_id=task_id, model=model, vector=vector.astype(np.float16).tobytes())
+        for task_id, vector in zip(task_ids, normalize(vectors))
+    ])
+
+
+async def backfill(limit: int = BACKFILL_BATCH) -> int:
+    """Embed processed tasks that have no embedding for the current model yet"""
+    embedder = get_embedder()
+    if embedder is None or not embedder.available():
+        return 0
+
+    async with async_session_maker() as session:
+        embedded = select(TaskEmbedding.task_id).where(TaskEmbedding.model == embedder.model_name)
+        result = await session.execute(
+            select(Task.id, Task.raw_input)
+            .where(Task.status != "captured", Task.id.not_in(embedded))
+            .order_by(Task.id.desc())
+            .limit(limit)
+        )
+        rows = result.all()
+    if not rows:
+        return 0
+
+    vectors = await embed_tasks([{"id": row.id, "raw_input": row.raw_input} for row in rows])
+    if vectors is None:
+        return 0
+
+    async with write_session() as session:
+        await store(session, [row.id for row in rows], vectors)
+        await session.commit()
+    return len(rows)
@@ -0,0 +1,200 @@
+"""
+Durable work queue for captured tasks
+Queue rows live in SQLite so nothing is lost if the worker dies.
+A datagram on a Unix socket wakes the worker as soon as something is enqueued,
+so processing starts right after capture instead of on the next poll.
+"""
+import asyncio
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import select, insert, update, delete, func, and_, or_, exists
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.queue import WorkItem
+from app.models.task import Task
+from app.services import metrics
+
+
+WAKE_SOCKET = os.getenv("WORKER_WAKE_SOCKET", "./data/worker.sock")
+CLAIM_TIMEOUT = int(os.getenv("QUEUE_CLAIM_TIMEOUT", "600"))  # Reclaim after N seconds
+RETENTION_DAYS = int(os.getenv("QUEUE_RETENTION_DAYS", "7"))
+
+# Set whenever work is enqueued from this process (or a datagram arrives)
+_wakeup = asyncio.Event()
+
+_WAKE = b"1"
+# Other datagrams on the socket, and what to do when one arrives (see app.llm.lanes)
+_handlers: Dict[bytes, Callable[[], None]] = {}
+
+
+async def enqueue(session: AsyncSession, task_ids: List[int]):
+    """Add tasks to the queue - caller commits, then calls notify()"""
+    if not task_ids:
+        return
+    now = datetime.utcnow()
+    # One executemany, however many tasks
+    await session.execute(
+        insert(WorkItem),
+        [{"task_id": task_id, "enqueued_at": now} for task_id in task_ids],
+    )
+
+
+def notify():
+    """Wake the worker - in this process and, via the socket, in another one"""
+    _wakeup.set()
+    send(_WAKE)
+
+
+def send(message: bytes):
+    """Datagram to a worker process, if one is listening"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    try:
+        sock.setblocking(False)
+        sock.sendto(message, WAKE_SOCKET)
+    except OSError:
+        # No worker listening (yet) - the recovery sweep will pick captures up
+        pass
+    finally:
+        sock.close()
+
+
+def on_message(message: bytes, handler: Callable[[], None]):
+    """Run handler when the worker receives `message` (instead of waking up)"""
+    _handlers[message] = handler
+
+
+class WakeupListener:
+    """Receives wake-up datagrams on the worker side"""
+
+    def __init__(self, path: str = WAKE_SOCKET):
+        self.path = path
+        self.sock: Optional[socket.socket] = None
+
+    def start(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.bind(self.path)
+        self.sock.setblocking(False)
+        asyncio.get_running_loop().add_reader(self.sock.fileno(), self._on_readable)
+
+    def _on_readable(self):
+        try:
+            while True:
+                handler = _handlers.get(self.sock.recv(64))
+                if handler is not None:
+                    handler()
+                else:
+                    _wakeup.set()
+        except (BlockingIOError, InterruptedError):
+            pass
+
+    def close(self):
+        if self.sock is not None:
+            asyncio.get_running_loop().remove_reader(self.sock.fileno())
+            self.sock.close()
+            self.sock = None
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+
+async def wait_for_work(timeout: float) -> bool:
+    """Block until notified or timeout - returns True if woken by a notification"""
+    try:
+        await asyncio.wait_for(_wakeup.wait(), timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False
+    finally:
+        _wakeup.clear()
+
+
+def _pending():
+    """Items not done and either unclaimed or abandoned by a dead worker"""
+    stale = datetime.utcnow() - timedelta(seconds=CLAIM_TIMEOUT)
+    return and_(
+        WorkItem.done_at.is_(None),
+        or_(WorkItem.claimed_at.is_(None), WorkItem.claimed_at < stale),
+    )
+
+
+async def claim(session: AsyncSession, limit: int = 100) -> List[int]:
+    """Claim pending items, returns the task ids to process"""
+    result = await session.execute(
+        select(WorkItem).where(_pending()).order_by(WorkItem.id).limit(limit)
+    )
+    items = result.scalars().all()
+    if not items:
+        return []
+
+    now = datetime.utcnow()
+    for item in items:
+        item.claimed_at = now
+        item.attempts = (item.attempts or 0) + 1
+    await session.commit()
+
+    return list(dict.fromkeys(item.task_id for item in items))
+
+
+async def complete(session: AsyncSession, task_ids: List[int]):
+    """Mark queue items for these tasks done - caller commits"""
+    if not task_ids:
+        return
+    await session.execute(
+        update(WorkItem)
+        .where(WorkItem.task_id.in_(task_ids), WorkItem.done_at.is_(None))
+        .values(done_at=datetime.utcnow())
+    )
+
+
+async def sweep(session: AsyncSession) -> int:
+    """
+    Crash recovery - enqueue captured tasks that have no pending queue item
+    (e.g. captured while the queue table didn't exist) and prune old rows
+    """
+    has_item = exists().where(
+        WorkItem.task_id == Task.id, WorkItem.done_at.is_(None)
+    )
+    result = await session.execute(
+        select(Task.id).where(Task.status == "captured", ~has_item)
+    )
+    orphans = result.scalars().all()
+    if orphans:
+        await enqueue(session, orphans)
+
+    cutoff = datetime.utcnow() - timedelta(days=RETENTION_DAYS)
+    await session.execute(
+        delete(WorkItem).where(WorkItem.done_at.is_not(None), WorkItem.done_at < cutoff)
+    )
+    await session.commit()
+    return len(orphans)
+
+
+async def stats(session: AsyncSession, window: int = 500) -> dict:
+    """Queue depth and capture-to-active latency over the last `window` items"""
+    result = await session.execute(
+        select(func.count()).select_from(WorkItem).where(WorkItem.done_at.is_(None))
+    )
+    depth = result.scalar_one()
+
+    result = await session.execute(
+        select(WorkItem.enqueued_at, WorkItem.done_at)
+        .where(WorkItem.done_at.is_not(None))
+        .order_by(WorkItem.id.desc())
+        .limit(window)
+    )
+    latencies = [
+        (done_at - enqueued_at).total_seconds()
+        for enqueued_at, done_at in result.all()
+        if enqueued_at and done_at
+    ]
+
+    return {
+        "depth": depth,
+        "capture_to_active_seconds": metrics.summarize(latencies),
+    }
@@ -1,8 +1,28 @@
 #!/bin/bash
 # Quick start script for JamUpTaskMaster
+#   ./run.sh           API and worker in containers
+#   ./run.sh --local   One Python process, no containers (or JAMUP_MODE=local)
+#   ./run.sh --stop    Stop the local process
 
 set -e
 
+cd "$(dirname "$(readlink -f "${BASH_SOURCE[0]}")")"
+
+MODE="${JAMUP_MODE:-containers}"
+if [ "$1" = "--local" ]; then
+    MODE="local"
+fi
+
+if [ "$1" = "--stop" ]; then
+    if [ -f data/jamup.pid ] && kill "$(cat data/jamup.pid)" 2> /dev/null; then
+        echo "🛑 Stopped"
+    else
+        echo "Not running"
+    fi
+    rm -f data/jamup.pid
+    exit 0
+fi
+
 echo "🚀 Starting JamUpTaskMaster..."
 
 # Check if Ollama is running
@@ -18,6 +38,35 @@ if ! OLLAMA_HOST=127.0.0.1:11434 ollama list | grep -q "gpt-oss-20b-assistant";
     echo "   Make sure your model is available or update TASK_MODEL in config/config.env"
 fi
 
+# Single process: the API runs the worker in its own event loop, sharing
+# the database engine, HTTP pool and model client
+if [ "$MODE" = "local" ]; then
+    mkdir -p data
+    if curl -s --unix-socket data/jamup.sock http://localhost/health 2> /dev/null | grep -q "ok"; then
+        echo "✅ Already running"
+        exit 0
+    fi
+
+    PYTHON="${PYTHON:-python3}"
+    if [ -x backend/venv/bin/python ]; then
+        PYTHON="backend/venv/bin/python"
+    fi
+
+    echo "▶️  Starting API + worker (one process, log: data/jamup.log)..."
+    PYTHONPATH=backend IN_PROCESS_WORKER=true nohup "$PYTHON" -m app.main >> data/jamup.log 2>&1 &
+    echo $! > data/jamup.pid
+
+    for _ in $(seq 100); do
+        if curl -s --unix-socket data/jamup.sock http://localhost/health 2> /dev/null | grep -q "ok"; then
+            echo "✅ Running - dashboard: http://localhost:8000, stop: ./run.sh --stop"
+            exit 0
+        fi
+        sleep 0.1
+    done
+    echo "❌ API failed to start. Check data/jamup.log"
+    exit 1
+fi
+
 # Detect if we're in distrobox
 if [ -f /run/.containerenv ] || [ -f /.dockerenv ] || [ -n "$CONTAINER_ID" ]; then
     echo "📦 Running in container, using host podman..."
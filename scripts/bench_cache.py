@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the processing answer cache
+A stub model answers processing prompts after a fixed delay. A batch of
+captures is processed once, then the same captures come in again - new
+ids, new timestamps, a different active list, different case and spacing,
+along with a few new ones. Only the new ones should reach the model.
+
+Usage: python scripts/bench_cache.py [tasks]
+Exits non-zero if a repeated capture isn't answered from the cache.
+"""
+import asyncio
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+TASKS = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+NEW = 5
+DELAY = 0.3  # Per model call
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+workdir = tempfile.mkdtemp(prefix="jamup-bench-")
+os.environ["WORKER_WAKE_SOCKET"] = os.path.join(workdir, "worker.sock")  # Nobody listening
+
+from ollama_stub import OllamaStub  # noqa: E402
+from app.llm.cache import ResponseCache  # noqa: E402
+from app.llm.processor import TaskProcessor  # noqa: E402
+from app.llm.lanes import Lanes  # noqa: E402
+from app.llm.http import close_http_client  # noqa: E402
+from app.services import metrics  # noqa: E402
+
+
+class ProcessingStub(OllamaStub):
+    """Answers "Return the JSON for the N new tasks" with N task answers; counts the tasks asked about"""
+
+    def __init__(self):
+        super().__init__(delay=DELAY)
+        self.tasks_asked = 0
+
+    async def _respond(self, writer, method, path, body):
+        payload = json.loads(body) if body else {}
+        wanted = re.search(r"Return the JSON for the (\d+) new tasks", payload.get("prompt", ""))
+        if wanted:
+            count = int(wanted.group(1))
+            self.tasks_asked += count
+            self.response_text = json.dumps({"tasks": [
+                {"n": n, "processed_text": f"answer {n}", "priority_score": 0.5, "category": "misc"}
+                for n in range(1, count + 1)
+            ]})
+        await super()._respond(writer, method, path, body)
+
+
+def captures(texts, first_id, when):
+    return [
+        {"id": first_id + i, "raw_input": text, "created_at": (when + timedelta(seconds=i)).isoformat()}
+        for i, text in enumerate(texts)
+    ]
+
+
+async def run(processor, stub, tasks, active):
+    stub.tasks_asked = 0
+    started = time.perf_counter()
+    results = await processor.process_new_tasks(tasks, active)
+    return time.perf_counter() - started, stub.tasks_asked, results
+
+
+async def main() -> bool:
+    stub = await ProcessingStub().start()
+    cache = ResponseCache(path=os.path.join(workdir, "llm_cache.db"))
+    processor = TaskProcessor(model_name="bench", api_base=stub.url, cache=cache, max_chunk_size=5)
+    processor.lanes = Lanes("bench", concurrency=2)
+
+    texts = [f"order pillows walmart {i}" if i % 2 else f"take meds {i}" for i in range(TASKS)]
+    active = [{"id": 1000 + i, "raw_input": f"active {i}", "priority_score": 0.5} for i in range(10)]
+    now = datetime.utcnow()
+
+    first, asked, _ = await run(processor, stub, captures(texts, 1, now), active)
+    print(f"{TASKS} captures, chunks of 5, model call {DELAY * 1000:.0f} ms")
+    print(f"  first time     {first * 1000:7.0f} ms  model asked about {asked} tasks")
+
+    # Same captures again, later, with another active list - plus a few new ones
+    again = [f"  {text.upper()} " for text in texts] + [f"new thing {i}" for i in range(NEW)]
+    active = active[3:] + [{"id": 2000, "raw_input": "something else", "priority_score": 0.9}]
+    metrics._counters.clear()
+    second, asked, results = await run(processor, stub, captures(again, 500, now + timedelta(hours=2)), active)
+    hits = metrics._counters.get("llm_cache_hits", 0)
+    print(f"  captured again {second * 1000:7.0f} ms  model asked about {asked} tasks "
+          f"({hits:.0f} cache hits, {NEW} new)")
+
+    ok = asked == NEW and hits == TASKS and all(result["processed_text"].startswith("answer") for result in results)
+    print(f"  cache: {cache.stats()}")
+    await close_http_client()
+    await stub.stop()
+    cache.close()
+    print("OK" if ok else "FAILED")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(main()) else 1)
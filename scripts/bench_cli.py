@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark for jt start-up and capture latency
+Starts a throwaway backend, times `jt add` over the Unix socket and over TCP,
+stops the backend and times captures going to the offline spool, then starts
+it again and checks every capture made it into the database.
+
+Usage: python scripts/bench_cli.py [runs]
+Exits non-zero if jt adds more than MAX_OVERHEAD_MS on top of a bare
+`python3 -S` start (the interpreter's own start-up is the machine's, not jt's),
+or if any capture is lost.
+"""
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+MAX_OVERHEAD_MS = 50.0
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+JT = os.path.join(ROOT, "scripts", "jt")
+
+workdir = tempfile.mkdtemp(prefix="jamup-bench-")
+db_path = os.path.join(workdir, "tasks.db")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+PORT = free_port()
+ENV = {
+    **os.environ,
+    "DATABASE_URL": f"sqlite+aiosqlite:///{db_path}",
+    "PORT": str(PORT),
+    "HOST": "127.0.0.1",
+    "API_SOCKET": os.path.join(workdir, "jamup.sock"),
+    "CAPTURE_SPOOL": os.path.join(workdir, "spool.ndjson"),
+    "WORKER_WAKE_SOCKET": os.path.join(workdir, "worker.sock"),
+    "LLM_WARMUP": "false",
+    "LLM_KEEP_WARM_INTERVAL": "0",
+    "EMBED_BACKEND": "off",
+    # jt side
+    "JAMUP_DATA_DIR": workdir,
+    "XDG_CACHE_HOME": workdir,
+}
+ENV.pop("JAMUP_API_BASE", None)
+ENV.pop("PYTHONDONTWRITEBYTECODE", None)  # jt relies on its cached bytecode
+
+
+def start_backend() -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.main"], cwd=os.path.join(ROOT, "backend"), env=ENV,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    for _ in range(100):
+        if os.path.exists(ENV["API_SOCKET"]):
+            return server
+        time.sleep(0.1)
+    server.kill()
+    sys.exit("Backend didn't start")
+
+
+def timed(args, env, runs: int = RUNS) -> float:
+    timings = []
+    for i in range(runs):
+        started = time.perf_counter()
+        subprocess.run([*args, f"bench {i}"] if args[0] == JT else args, env=env,
+                       stdout=subprocess.DEVNULL, check=True)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def main():
+    baseline = timed(["python3", "-S", "-c", "pass"], ENV)
+    subprocess.run([JT, "help"], env=ENV, stdout=subprocess.DEVNULL)  # Writes the bytecode cache
+
+    server = start_backend()
+    over_socket = timed([JT, "add"], ENV)
+    over_tcp = timed([JT, "add"], {**ENV, "JAMUP_API_BASE": f"http://127.0.0.1:{PORT}"})
+    server.terminate()
+    server.wait()
+
+    offline = timed([JT, "add"], ENV)
+    server = start_backend()  # Replays the spool
+    server.terminate()
+    server.wait()
+
+    stored = sqlite3.connect(db_path).execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+    print(f"jt add, median of {RUNS} (bare python3 -S start: {baseline:.1f} ms)")
+    for name, value in (("unix socket", over_socket), ("tcp", over_tcp), ("offline spool", offline)):
+        print(f"  {name:14s} {value:7.1f} ms  (+{value - baseline:.1f} ms)")
+    print(f"  captured {stored} of {3 * RUNS}")
+
+    worst = max(over_socket, offline) - baseline
+    ok = worst <= MAX_OVERHEAD_MS and stored == 3 * RUNS
+    print("OK" if ok else f"FAILED: +{worst:.1f} ms (limit {MAX_OVERHEAD_MS} ms), {stored}/{3 * RUNS} captured")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
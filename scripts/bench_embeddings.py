@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the similarity index
+Writes N random unit vectors into a throwaway task_embeddings table, times
+loading them into the in-memory index (and how much memory it takes), then
+times top-k searches for a single task and for a batch of captures.
+
+Usage: python scripts/bench_embeddings.py [rows] [dim]
+Exits non-zero if a single search is slower than MAX_SEARCH_MS.
+"""
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+DIM = int(sys.argv[2]) if len(sys.argv) > 2 else 768  # nomic-embed-text
+MAX_SEARCH_MS = 500.0  # The float16 index trades search time for memory; the worker searches once per batch
+MODEL = "bench"
+
+workdir = tempfile.mkdtemp(prefix="jamup-bench-")
+db_path = os.path.join(workdir, "tasks.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from app.database import init_db, engine, async_session_maker  # noqa: E402
+from app.services import similarity  # noqa: E402
+
+
+def populate(vectors: np.ndarray):
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO task_embeddings (task_id, model, vector) VALUES (?, ?, ?)",
+        ((i + 1, MODEL, vector.astype(np.float16).tobytes()) for i, vector in enumerate(vectors)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def timed(fn, repeat: int = 7) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+async def main():
+    await init_db()
+    rng = np.random.default_rng(0)
+    vectors = similarity.normalize(rng.standard_normal((ROWS, DIM), dtype=np.float32))
+    populate(vectors)
+    size_mb = os.path.getsize(db_path) / 1024 / 1024
+    print(f"Stored {ROWS} x {DIM} embeddings ({size_mb:.0f} MB on disk, {db_path})")
+
+    started = time.perf_counter()
+    async with async_session_maker() as session:
+        index = await similarity.sync(session, MODEL)
+    print(f"  load into index        {(time.perf_counter() - started) * 1000:8.1f} ms  {len(index)} rows, "
+          f"{index._vectors.nbytes / 1024 / 1024:.0f} MB")
+
+    # Queries near a known row, so the right answer is checkable
+    queries = similarity.normalize(vectors[:20] + 0.1 * rng.standard_normal((20, DIM), dtype=np.float32))
+    single = timed(lambda: index.search(queries[:1], 50))
+    batch = timed(lambda: index.search(queries, 50))
+    hits = index.search(queries, 1)
+    recall = sum(1 for i, row in enumerate(hits) if row and row[0][0] == i + 1) / len(hits)
+
+    print(f"  search 1 task, k=50    {single:8.2f} ms")
+    print(f"  search 20 tasks, k=50  {batch:8.2f} ms")
+    print(f"  nearest-neighbour recall {recall:.0%}")
+
+    await engine.dispose()
+    ok = single <= MAX_SEARCH_MS and recall == 1.0
+    print("OK" if ok else f"FAILED: search {single:.2f} ms (limit {MAX_SEARCH_MS} ms), recall {recall:.0%}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark: hot task queries before and after the index migrations
+For each size, builds a throwaway database with the schema up to the
+migration before the first indexes, times the queries and prints their
+plans, then applies the remaining migrations and does it again. Lists sort
+on rank_score (migration 8's indexes); migration 10 drops migration 3's
+priority_score ones, so the indexes left on tasks are listed at the end.
+
+Usage: python scripts/bench_indexes.py [size ...]   (default: 10000 100000 1000000)
+"""
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from sqlalchemy import create_engine  # noqa: E402
+
+from app.models.task import Base  # noqa: E402
+from app.models import queue, stats, events, embeddings  # noqa: E402,F401
+from app.migrations import run_migrations  # noqa: E402
+
+INDEX_MIGRATION = 3
+
+QUERIES = {
+    "list active": "SELECT * FROM tasks WHERE status = 'active' "
+                   "ORDER BY rank_score DESC, id LIMIT 50",
+    "list done": "SELECT * FROM tasks WHERE status = 'done' "
+                 "ORDER BY rank_score DESC, id LIMIT 20",
+    "worker captured": "SELECT * FROM tasks WHERE status = 'captured'",
+    "chat context": "SELECT * FROM tasks WHERE status = 'active' "
+                    "ORDER BY rank_score DESC, id LIMIT 20",
+    "list all": "SELECT * FROM tasks ORDER BY rank_score DESC, id LIMIT 50",
+}
+
+# Mostly history, like a real long-lived install
+STATUSES = ["done"] * 70 + ["archived"] * 15 + ["active"] * 10 + ["put_off"] * 4 + ["captured"]
+
+
+def build(path: str, rows: int):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        Base.metadata.create_all(conn)
+        run_migrations(conn, target=INDEX_MIGRATION - 1)
+    engine.dispose()
+
+    conn = sqlite3.connect(path)
+    start = datetime.utcnow() - timedelta(days=365)
+    conn.executemany(
+        "INSERT INTO tasks (raw_input, processed_text, status, priority_score, notes, "
+        "created_at, touched_at, is_life_critical, is_quick_win, pinned, recurring, is_interesting) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, 0, 0, 0, 0, 0)",
+        (
+            (
+                f"task {i}", f"Processed task {i}", random.choice(STATUSES),
+                round(random.random(), 3), "notes " * 20,
+                (start + timedelta(seconds=i * 30)).isoformat(" "),
+                (start + timedelta(seconds=random.randint(0, 365 * 86400))).isoformat(" "),
+            )
+            for i in range(rows)
+        ),
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+def measure(path: str, label: str):
+    conn = sqlite3.connect(path)
+    print(f"  {label}")
+    for name, sql in QUERIES.items():
+        plan = " / ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}"))
+        timings = []
+        for _ in range(5):
+            started = time.perf_counter()
+            conn.execute(sql).fetchall()
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        print(f"    {name:<16} {timings[len(timings) // 2]:9.2f} ms   {plan}")
+    conn.close()
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+
+    for rows in sizes:
+        path = os.path.join(tempfile.mkdtemp(prefix="jamup-bench-"), "tasks.db")
+        started = time.perf_counter()
+        build(path, rows)
+        print(f"\n{rows} tasks (built in {time.perf_counter() - started:.1f}s)")
+
+        measure(path, "before indexes")
+
+        engine = create_engine(f"sqlite:///{path}")
+        with engine.begin() as conn:
+            run_migrations(conn)
+            conn.exec_driver_sql("ANALYZE")
+        engine.dispose()
+
+        measure(path, "after indexes")
+        conn = sqlite3.connect(path)
+        names = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'tasks' "
+            "AND name NOT LIKE 'sqlite_%' ORDER BY name"
+        )]
+        conn.close()
+        print(f"  indexes on tasks: {', '.join(names)}")
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
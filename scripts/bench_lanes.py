@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the LLM priority lanes
+A stub model that generates token by token, two requests at a time (like
+OLLAMA_NUM_PARALLEL=2), gets a processing batch while chat messages arrive
+every CHAT_EVERY seconds. Measured twice:
+  one lane  chat queues with the batch, first come first served
+  lanes     chat takes the interactive lane and preempts the batch
+For each: chat time to first token, the wait in the chat's lane (with one
+lane that's everyone's wait, batch chunks included), how long the batch
+took and whether every task still got a real answer. Then a burst of chats
+against a full interactive lane shows admission control turning the excess
+away.
+
+Usage: python scripts/bench_lanes.py [batch_tasks]
+Exits non-zero if a task loses its answer, or chat p95 isn't at least
+MIN_SPEEDUP x better with lanes.
+"""
+import asyncio
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+
+TASKS = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+CHATS = 10
+CHAT_EVERY = 0.4
+TOKEN_TIME = 0.02
+MIN_SPEEDUP = 3.0
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+os.environ["WORKER_WAKE_SOCKET"] = os.path.join(tempfile.mkdtemp(prefix="jamup-bench-"), "worker.sock")  # Nobody listening
+
+from ollama_stub import OllamaStub  # noqa: E402
+from app.llm.processor import TaskProcessor  # noqa: E402
+from app.llm.lanes import Lanes, Overloaded  # noqa: E402
+from app.llm.http import close_http_client  # noqa: E402
+from app.services import metrics  # noqa: E402
+
+
+class ModelStub(OllamaStub):
+    """Streams TOKEN_TIME per token, `parallel` requests at a time; answers processing prompts with task JSON"""
+
+    def __init__(self, parallel: int = 2):
+        super().__init__()
+        self.slots = asyncio.Semaphore(parallel)
+
+    def _tokens(self, payload):
+        wanted = re.search(r"Return the JSON for the (\d+) new tasks", payload.get("prompt", ""))
+        if not wanted:
+            return [f"word{i} " for i in range(20)]
+        tokens = ['{"tasks": [']
+        for n in range(1, int(wanted.group(1)) + 1):
+            answer = {"n": n, "processed_text": f"answer {n}", "priority_score": 0.5, "category": "misc",
+                      "is_life_critical": False, "is_quick_win": False, "notes": ""}
+            text = json.dumps(answer) + ("," if n < int(wanted.group(1)) else "")
+            tokens += [text[i:i + 12] for i in range(0, len(text), 12)]  # ~8 tokens an answer
+        return tokens + ["]}"]
+
+    async def _respond(self, writer, method, path, body):
+        payload = json.loads(body) if body else {}
+        if path != "/api/generate" or not payload.get("stream", True):
+            return await super()._respond(writer, method, path, body)
+        async with self.slots:
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+                b"Transfer-Encoding: chunked\r\n\r\n"
+            )
+            for token in self._tokens(payload):
+                await asyncio.sleep(TOKEN_TIME)
+                self._chunk(writer, json.dumps({"response": token, "done": False}) + "\n")
+                await writer.drain()  # Raises once the client has hung up - generation stops
+            self._chunk(writer, json.dumps({"response": "", "done": True}) + "\n")
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+
+
+def summary(values):
+    ordered = sorted(values)
+    return ordered[len(ordered) // 2], ordered[max(0, int(len(ordered) * 0.95 + 0.5) - 1)]
+
+
+async def chat(processor: TaskProcessor, interactive: bool) -> float:
+    started = time.perf_counter()
+    tokens = processor._stream_model("hello", temperature=0.7, interactive=interactive)
+    try:
+        async for _ in tokens:
+            return time.perf_counter() - started
+    finally:
+        await tokens.aclose()
+
+
+async def run(stub: OllamaStub, interactive: bool):
+    lane = "interactive" if interactive else "background"
+    processor = TaskProcessor(model_name=f"bench-{lane}", api_base=stub.url, max_chunk_size=5, max_concurrency=2)
+    processor.lanes = Lanes(processor.model_name, concurrency=2)
+    metrics._histograms.clear()
+    metrics._counters.clear()
+
+    tasks = [{"id": i, "raw_input": f"task {i}"} for i in range(1, TASKS + 1)]
+    started = time.perf_counter()
+    batch = asyncio.create_task(processor.process_new_tasks(tasks))
+    await asyncio.sleep(0.3)  # Batch under way
+
+    chats = []
+    for _ in range(CHATS):
+        chats.append(asyncio.create_task(chat(processor, interactive)))
+        await asyncio.sleep(CHAT_EVERY)
+    first_token = await asyncio.gather(*chats)
+    results = await batch
+    batch_time = time.perf_counter() - started
+
+    lost = sum(1 for result in results if not result["processed_text"].startswith("answer"))
+    waits = metrics._histograms[f"llm_queue_wait_seconds_{lane}"].samples
+    wait_p50, wait_p95 = summary(waits)
+    ttft_p50, ttft_p95 = summary(first_token)
+    preempted = metrics._counters.get("llm_preemptions", 0)
+    return ttft_p50, ttft_p95, wait_p50, wait_p95, batch_time, lost, preempted
+
+
+async def admission(stub: OllamaStub) -> int:
+    """Two long background streams hold the model, then 20 chats at once - how many are turned away"""
+    processor = TaskProcessor(model_name="bench-admission", api_base=stub.url)
+    processor.lanes = Lanes(processor.model_name, concurrency=2, queue_limit=8)
+
+    async def hold():
+        async for _ in processor._stream_model("hold", temperature=0.1):
+            await asyncio.sleep(0.05)  # Slow reader: keeps its slot until preempted
+
+    async def one_chat():
+        try:
+            await chat(processor, interactive=True)
+            return "ok"
+        except Overloaded:
+            return "refused"
+
+    holders = [asyncio.create_task(hold()) for _ in range(2)]
+    await asyncio.sleep(0.1)
+    outcomes = await asyncio.gather(*(one_chat() for _ in range(20)))
+    await asyncio.gather(*holders, return_exceptions=True)
+    return outcomes.count("refused")
+
+
+async def main() -> bool:
+    stub = await ModelStub(parallel=2).start()
+    print(f"{TASKS} tasks in chunks of 5, 2 model slots, a chat every {CHAT_EVERY}s ({CHATS} chats)")
+    print(f"  {'':9s} {'first token p50/p95':>21s} {'lane wait p50/p95':>20s} {'batch':>8s} {'preempted':>10s}")
+    results = {}
+    ok = True
+    for name, interactive in (("one lane", False), ("lanes", True)):
+        ttft50, ttft95, wait50, wait95, batch_time, lost, preempted = await run(stub, interactive)
+        results[name] = ttft95
+        print(f"  {name:9s} {ttft50 * 1000:8.0f} / {ttft95 * 1000:6.0f} ms {wait50 * 1000:7.0f} / {wait95 * 1000:6.0f} ms"
+              f" {batch_time:6.1f} s {preempted:10.0f}" + (f"  {lost} TASKS LOST" if lost else ""))
+        ok &= lost == 0
+    speedup = results["one lane"] / results["lanes"]
+    print(f"  chat p95 {speedup:.1f}x faster with lanes")
+    ok &= speedup >= MIN_SPEEDUP
+
+    refused = await admission(stub)
+    print(f"admission: 20 chats at once, queue limit 8 -> {refused} refused with 503")
+    ok &= 0 < refused < 20
+
+    await close_http_client()
+    await asyncio.sleep(0.5)
+    await stub.stop()
+    print("OK" if ok else "FAILED")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(main()) else 1)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark: fresh httpx client per LLM call vs the shared keep-alive pool
+Runs against the local Ollama stub, so it measures client/connection
+overhead only - no model involved.
+
+Usage: python scripts/bench_llm_pool.py [requests] [concurrency]
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx  # noqa: E402
+
+from app.llm.http import create_http_client  # noqa: E402
+from app.services.metrics import summarize  # noqa: E402
+from ollama_stub import OllamaStub  # noqa: E402
+
+
+PAYLOAD = {"model": "stub", "prompt": "pillows walmart", "stream": False}
+
+
+async def fresh_client_call(url: str):
+    """What every LLM call did before: build a client, connect, tear down"""
+    async with httpx.AsyncClient(timeout=120) as client:
+        response = await client.post(f"{url}/api/generate", json=PAYLOAD)
+        response.raise_for_status()
+
+
+async def run(label: str, call, total: int, concurrency: int, stub: OllamaStub):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    connections_before = stub.connections
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            await call()
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(total)])
+    elapsed = time.perf_counter() - started
+
+    summary = summarize(latencies)
+    print(
+        f"{label:<14} {total / elapsed:8.0f} req/s   "
+        f"p50 {summary['p50']:6.2f} ms   p95 {summary['p95']:6.2f} ms   "
+        f"tcp connections {stub.connections - connections_before}"
+    )
+
+
+async def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    stub = await OllamaStub().start()
+    print(f"{total} requests, concurrency {concurrency}, stub at {stub.url}\n")
+
+    await run("fresh client", lambda: fresh_client_call(stub.url), total, concurrency, stub)
+
+    pool = create_http_client()
+    try:
+        async def pooled_call():
+            response = await pool.post(f"{stub.url}/api/generate", json=PAYLOAD)
+            response.raise_for_status()
+
+        await run("shared pool", pooled_call, total, concurrency, stub)
+    finally:
+        await pool.aclose()
+        await stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the LLM endpoint router
+Runs Ollama stubs that serve one request at a time, like a real box, and
+drives the processor through the router:
+  balance   the same burst against one endpoint, then spread over three
+            (one of them slower); shows where requests went
+  failover  a healthy endpoint plus one that refuses connections: nothing
+            fails, and the breaker keeps traffic off the dead one
+  recovery  the dead endpoint comes up; after the cooldown it's used again
+  hedging   two endpoints that sometimes stall; time to first token of
+            interactive streams with and without hedging
+  long      interactive whole-answer calls that take longer than the hedge
+            delay, normally: none of them may be sent to a second box
+
+Usage: python scripts/bench_router.py [requests]
+Exits non-zero if a request fails, the breaker doesn't hold, hedging
+doesn't cut the p95 time to first token, or a normal long answer is hedged.
+"""
+import asyncio
+import os
+import random
+import socket
+import sys
+import time
+
+REQUESTS = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+CONCURRENCY = 6
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+
+from ollama_stub import OllamaStub  # noqa: E402
+from app.llm.processor import TaskProcessor  # noqa: E402
+from app.llm.lanes import Lanes  # noqa: E402
+from app.llm.router import Endpoint, Router  # noqa: E402
+from app.llm.http import close_http_client  # noqa: E402
+from app.services import metrics  # noqa: E402
+
+
+class BusyStub(OllamaStub):
+    """
+    One request at a time; with `stall`, that share of requests hang for
+    `stall_time` first (a network hiccup, a GC pause) without holding the box
+    """
+
+    def __init__(self, delay: float, stall: float = 0.0, stall_time: float = 1.5, seed: int = 0):
+        super().__init__(delay=delay)
+        self.slot = asyncio.Semaphore(1)
+        self.stall = stall
+        self.stall_time = stall_time
+        self.rng = random.Random(seed)
+
+    async def _respond(self, writer, method, path, body):
+        if self.stall and self.rng.random() < self.stall:
+            await asyncio.sleep(self.stall_time)
+        async with self.slot:
+            await super()._respond(writer, method, path, body)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def processor_for(endpoints, **router_options) -> TaskProcessor:
+    processor = TaskProcessor(model_name="bench", api_base=endpoints[0].url, cache=None)
+    processor.router = Router(endpoints, **router_options)
+    processor.lanes = Lanes("bench", concurrency=CONCURRENCY)  # Measure the router, not the lane cap
+    return processor
+
+
+async def burst(processor: TaskProcessor, count: int, interactive: bool = False):
+    """count requests, CONCURRENCY at a time; returns (seconds, failures)"""
+    gate = asyncio.Semaphore(CONCURRENCY)
+    failures = 0
+
+    async def one(i):
+        nonlocal failures
+        async with gate:
+            text = await processor._call_model(f"bench {i}", use_cache=False, interactive=interactive)
+            failures += text != "ok"
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(count)))
+    return time.perf_counter() - started, failures
+
+
+async def first_token(processor: TaskProcessor, interactive: bool) -> float:
+    started = time.perf_counter()
+    tokens = processor._stream_model("bench", interactive=interactive)
+    async for _ in tokens:
+        break
+    await tokens.aclose()
+    return time.perf_counter() - started
+
+
+def p95(values):
+    ordered = sorted(values)
+    return ordered[max(0, int(len(ordered) * 0.95 + 0.5) - 1)]
+
+
+async def main() -> bool:
+    ok = True
+
+    print(f"balance: {REQUESTS} requests, {CONCURRENCY} concurrent, stubs serve one at a time")
+    stubs = [await BusyStub(0.05).start(), await BusyStub(0.05).start(), await BusyStub(0.15).start()]
+    single, failed = await burst(processor_for([Endpoint(stubs[0].url)]), REQUESTS)
+    for stub in stubs:
+        stub.requests = 0
+    print(f"  one endpoint     {single * 1000:7.0f} ms")
+    ok &= failed == 0
+    spread, failed = await burst(processor_for([Endpoint(stub.url) for stub in stubs]), REQUESTS)
+    share = " / ".join(str(stub.requests) for stub in stubs)
+    print(f"  three endpoints  {spread * 1000:7.0f} ms  ({single / spread:.1f}x, requests {share}, last one 3x slower)")
+    ok &= failed == 0 and spread < single
+
+    print("failover: one healthy endpoint, one refusing connections")
+    dead_port = free_port()
+    dead = Endpoint(f"http://127.0.0.1:{dead_port}")
+    healthy = await BusyStub(0.02).start()
+    processor = processor_for([dead, Endpoint(healthy.url)], breaker_failures=3, breaker_cooldown=3.0)
+    metrics._counters.clear()
+    _, failed = await burst(processor, REQUESTS)
+    print(f"  {failed} of {REQUESTS} failed, dead endpoint tried {dead.requests}x, "
+          f"{metrics._counters.get('llm_failovers', 0):.0f} failovers, breaker {processor.router.stats()[0]['state']}")
+    ok &= failed == 0 and dead.requests <= 3
+
+    print("recovery: the dead endpoint comes up")
+    revived = BusyStub(0.02)
+    revived.port = dead_port
+    await revived.start()
+    await asyncio.sleep(3.1)  # Cooldown
+    _, failed = await burst(processor, REQUESTS)
+    print(f"  {failed} failed, revived endpoint served {revived.requests} of {REQUESTS}, "
+          f"breaker {processor.router.stats()[0]['state']}")
+    ok &= failed == 0 and revived.requests > 0
+
+    print(f"hedging: two endpoints, 10% of requests stall 1.5s; {REQUESTS} interactive streams")
+    flaky = [await BusyStub(0.02, stall=0.1, seed=1).start(), await BusyStub(0.02, stall=0.1, seed=2).start()]
+    results = {}
+    for hedge in (False, True):
+        processor = processor_for([Endpoint(stub.url) for stub in flaky], hedge_after=0.2)
+        timings = [await first_token(processor, interactive=hedge) for _ in range(REQUESTS)]
+        results[hedge] = p95(timings)
+        print(f"  {'hedged' if hedge else 'plain':6s}  first token p95 {results[hedge] * 1000:6.0f} ms")
+    print(f"  hedged {metrics._counters.get('llm_hedged', 0):.0f}x, backup won {metrics._counters.get('llm_hedge_wins', 0):.0f}x")
+    ok &= results[True] < results[False]
+
+    print("long: two endpoints, whole answers take 0.5s, hedge after 0.2s; 10 interactive calls")
+    slow = [await BusyStub(0.5).start(), await BusyStub(0.5).start()]
+    processor = processor_for([Endpoint(stub.url) for stub in slow], hedge_after=0.2)
+    before = metrics._counters.get("llm_hedged", 0)
+    for i in range(10):
+        await processor._call_model(f"long {i}", use_cache=False, interactive=True)
+    hedged = metrics._counters.get("llm_hedged", 0) - before
+    print(f"  hedged {hedged:.0f}x, box requests {' / '.join(str(stub.requests) for stub in slow)}")
+    ok &= hedged == 0
+
+    await close_http_client()
+    await asyncio.sleep(1.5)  # Let abandoned stalls finish, the stubs don't notice hang-ups
+    for stub in [*stubs, healthy, revived, *flaky, *slow]:
+        await stub.stop()
+    print("OK" if ok else "FAILED")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(main()) else 1)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the recurring task scheduler
+Fills a throwaway database with N recurring tasks among 10x as many plain
+ones, times the next-due lookup the worker does before every sleep, then
+moves the clock so a tenth of the schedules are due and times resurfacing
+them.
+
+Usage: python scripts/bench_scheduler.py [recurring]
+Exits non-zero if the next-due lookup is slower than MAX_LOOKUP_MS.
+"""
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+RECURRING = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+PLAIN = RECURRING * 10
+MAX_LOOKUP_MS = 5.0
+PATTERNS = ["daily", "every 2 days", "mondays at 9am", "weekdays at 8:30", "twice a day",
+            "every 3 hours", "monthly", "every morning"]
+
+workdir = tempfile.mkdtemp(prefix="jamup-bench-")
+db_path = os.path.join(workdir, "tasks.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from app.database import init_db, engine, async_session_maker  # noqa: E402
+from app.services import scheduler  # noqa: E402
+
+
+def populate(now: datetime):
+    rng = random.Random(0)
+    conn = sqlite3.connect(db_path)
+    rows = []
+    for i in range(PLAIN + RECURRING):
+        recurring = i % 11 == 0
+        pattern = rng.choice(PATTERNS) if recurring else None
+        # Due times spread over the next 10 days
+        next_due = now + timedelta(minutes=rng.randrange(1, 14400)) if recurring else None
+        rows.append((f"task {i}", "done" if recurring and i % 2 else "active", now, now,
+                     recurring, pattern, next_due))
+    conn.executemany(
+        "INSERT INTO tasks (raw_input, status, created_at, touched_at, recurring, recurring_pattern, next_due)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT MIN(next_due) FROM tasks WHERE next_due IS NOT NULL"
+    ).fetchall()
+    conn.close()
+    return plan
+
+
+def timed(fn, repeat: int = 21) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+async def main():
+    await init_db()
+    now = datetime.utcnow()
+    plan = populate(now)
+    total = PLAIN + RECURRING
+    print(f"Stored {total} tasks, {total // 11} recurring ({db_path})")
+    print(f"  plan: {' / '.join(row[-1] for row in plan)}")
+
+    async with async_session_maker() as session:
+        timings = []
+        for _ in range(21):
+            started = time.perf_counter()
+            await scheduler.seconds_until_next(session)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        lookup = timings[len(timings) // 2]
+    print(f"  next-due lookup        {lookup:8.2f} ms")
+
+    parse = timed(lambda: [scheduler.parse_pattern(p).next_after(now) for p in PATTERNS])
+    print(f"  parse + next, {len(PATTERNS)} rules {parse:8.2f} ms")
+
+    # Jump a day ahead: everything due by then resurfaces
+    conn = sqlite3.connect(db_path)
+    due = conn.execute(
+        "SELECT COUNT(*) FROM tasks WHERE next_due <= ?", (now + timedelta(days=1),)
+    ).fetchone()[0]
+    conn.execute("UPDATE tasks SET next_due = datetime(next_due, '-1 day') WHERE next_due IS NOT NULL")
+    conn.commit()
+    conn.close()
+
+    started = time.perf_counter()
+    resurfaced = await scheduler.run_due()
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"  run_due                {elapsed:8.1f} ms  {resurfaced} resurfaced ({due} expected)")
+
+    await engine.dispose()
+    ok = lookup <= MAX_LOOKUP_MS and resurfaced == due
+    print("OK" if ok else f"FAILED: lookup {lookup:.2f} ms (limit {MAX_LOOKUP_MS} ms), {resurfaced}/{due} resurfaced")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark for /api/tasks/search
+Builds a throwaway database with N tasks of made-up text (the FTS index is
+filled by the triggers as rows go in), then times searches through the API.
+
+Usage: python scripts/bench_search.py [rows]
+Exits non-zero if the median search is slower than MAX_SEARCH_MS.
+"""
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+MAX_SEARCH_MS = 20.0
+
+workdir = tempfile.mkdtemp(prefix="jamup-bench-")
+db_path = os.path.join(workdir, "tasks.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+os.environ["WORKER_WAKE_SOCKET"] = os.path.join(workdir, "worker.sock")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+import httpx  # noqa: E402
+
+from app.database import init_db, engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+WORDS = (
+    "buy call email fix clean book order pick check pay renew schedule write "
+    "pillows walmart screws boards dentist landlord vm lima cluster invoice taxes "
+    "groceries laundry car insurance passport garden bike printer router backup "
+    "mom friend doctor pharmacy meds bank rent library package return refund"
+).split()
+
+# Plus a long tail of rarer words, like a real history has (names, places, jargon)
+TAIL = [f"w{i:05d}" for i in range(20_000)]
+
+QUERIES = ["vm", "dentist", "pay rent", "pil", "that thing with the vm", "insurance car renew",
+           "w00042", "zzz"]
+
+
+def sentence(n: int) -> str:
+    return " ".join(
+        random.choice(WORDS) if random.random() < 0.15 else random.choice(TAIL) for _ in range(n)
+    )
+
+
+def populate(rows: int):
+    conn = sqlite3.connect(db_path)
+    now = datetime.utcnow().isoformat(" ")
+    conn.executemany(
+        "INSERT INTO tasks (raw_input, processed_text, status, priority_score, notes, "
+        "created_at, touched_at, is_life_critical, is_quick_win, pinned, recurring, is_interesting) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, 0, 0, 0, 0, 0)",
+        (
+            (sentence(4), sentence(8), random.choice(["active", "done", "done", "archived"]),
+             round(random.random(), 2), sentence(25), now, now)
+            for _ in range(rows)
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+async def main():
+    await init_db()
+    started = time.perf_counter()
+    populate(ROWS)
+    print(f"Populated {ROWS} tasks in {time.perf_counter() - started:.1f}s ({db_path})")
+
+    worst = 0.0
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for query in QUERIES:
+            timings = []
+            for _ in range(7):
+                started = time.perf_counter()
+                response = await client.get("/api/tasks/search", params={"q": query})
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            median = timings[len(timings) // 2]
+            worst = max(worst, median)
+            print(f"  {query!r:<28} {median:8.2f} ms  {response.json()['count']} results")
+
+    await engine.dispose()
+    ok = worst <= MAX_SEARCH_MS
+    print("OK" if ok else f"SLOW: median search took {worst:.2f} ms (limit {MAX_SEARCH_MS} ms)")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
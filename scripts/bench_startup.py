@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Start-up time and memory: API + worker as two processes vs one process
+For each mode, against a fresh database and the Ollama stub: time from
+launch until the API answers on its Unix socket (and, with two processes,
+the worker listens for wake-ups), the resident memory of all processes
+once settled, and how long a capture then takes to come out processed -
+proof the worker is really running.
+
+Usage: python scripts/bench_startup.py [runs]
+Exits non-zero if a mode fails to process the capture.
+"""
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+TIMEOUT = 30.0
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+BACKEND = os.path.join(ROOT, "backend")
+
+
+class UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path: str):
+        super().__init__("localhost", timeout=5)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.path)
+
+
+def request(path: str, method: str, endpoint: str, body=None):
+    conn = UnixConnection(path)
+    try:
+        conn.request(method, endpoint, json.dumps(body) if body is not None else None,
+                     {"Content-Type": "application/json"})
+        response = conn.getresponse()
+        return json.loads(response.read())
+    finally:
+        conn.close()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def rss_mb(pids) -> float:
+    total = 0
+    for pid in pids:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    total += int(line.split()[1])
+    return total / 1024
+
+
+def wait_for(check, what: str):
+    deadline = time.monotonic() + TIMEOUT
+    while time.monotonic() < deadline:
+        try:
+            if check():
+                return
+        except OSError:
+            pass
+        time.sleep(0.02)
+    raise SystemExit(f"Timed out waiting for {what}")
+
+
+def run(in_process: bool, stub_url: str):
+    workdir = tempfile.mkdtemp(prefix="jamup-bench-")
+    api_socket = os.path.join(workdir, "jamup.sock")
+    wake_socket = os.path.join(workdir, "worker.sock")
+    env = {
+        **os.environ,
+        "PYTHONPATH": BACKEND,
+        "DATABASE_URL": f"sqlite+aiosqlite:///{os.path.join(workdir, 'tasks.db')}",
+        "PORT": str(free_port()),
+        "HOST": "127.0.0.1",
+        "API_SOCKET": api_socket,
+        "CAPTURE_SPOOL": os.path.join(workdir, "spool.ndjson"),
+        "WORKER_WAKE_SOCKET": wake_socket,
+        "LLM_CACHE_PATH": os.path.join(workdir, "llm_cache.db"),
+        "OLLAMA_API_BASE": stub_url,
+        "LLM_WARMUP": "false",
+        "LLM_KEEP_WARM_INTERVAL": "0",
+        "EMBED_BACKEND": "off",
+        "IN_PROCESS_WORKER": "true" if in_process else "false",
+    }
+    commands = [[sys.executable, "-m", "app.main"]]
+    if not in_process:
+        commands.append([sys.executable, "-m", "app.services.background_worker"])
+
+    started = time.perf_counter()
+    processes = [
+        subprocess.Popen(command, cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for command in commands
+    ]
+    try:
+        wait_for(lambda: request(api_socket, "GET", "/health").get("status") == "ok", "the API")
+        if not in_process:
+            wait_for(lambda: os.path.exists(wake_socket), "the worker")
+        startup = time.perf_counter() - started
+
+        captured = time.perf_counter()
+        task_id = request(api_socket, "POST", "/api/tasks/capture", {"raw_input": "bench"})["id"]
+        wait_for(
+            lambda: request(api_socket, "GET", f"/api/tasks/{task_id}")["status"] == "active",
+            "the capture to be processed",
+        )
+        to_active = time.perf_counter() - captured
+
+        time.sleep(1.0)  # Settle
+        memory = rss_mb([process.pid for process in processes])
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+    return startup, memory, to_active
+
+
+def main():
+    stub_port = free_port()
+    stub = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "scripts", "ollama_stub.py"), str(stub_port), "0"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    time.sleep(0.5)
+    stub_url = f"http://127.0.0.1:{stub_port}"
+
+    try:
+        print(f"Median of {RUNS} runs, no containers")
+        print(f"  {'mode':14s} {'startup':>9s} {'RSS':>9s} {'capture→active':>15s}")
+        for name, in_process in (("two processes", False), ("in-process", True)):
+            results = sorted(run(in_process, stub_url) for _ in range(RUNS))
+            startup = results[len(results) // 2][0]
+            memory = sorted(result[1] for result in results)[len(results) // 2]
+            to_active = sorted(result[2] for result in results)[len(results) // 2]
+            print(f"  {name:14s} {startup * 1000:7.0f} ms {memory:6.0f} MB {to_active * 1000:12.0f} ms")
+    finally:
+        stub.terminate()
+        stub.wait()
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
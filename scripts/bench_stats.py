@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Regression benchmark for /api/tasks/stats/overview
+Builds a throwaway database with N tasks, churns some of them through
+updates and deletes, then checks the trigger-maintained counters against a
+full recount and times the old full-table load against the counters read.
+
+Usage: python scripts/bench_stats.py [rows]
+Exits non-zero if the counters drift or the endpoint gets slow.
+"""
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+MAX_STATS_MS = 20.0
+
+workdir = tempfile.mkdtemp(prefix="jamup-bench-")
+db_path = os.path.join(workdir, "tasks.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from sqlalchemy import select  # noqa: E402
+
+from app.database import init_db, async_session_maker, engine  # noqa: E402
+from app.api.tasks import read_stats  # noqa: E402
+from app.models.task import Task  # noqa: E402
+
+STATUSES = ["active"] * 2 + ["done"] * 5 + ["archived"] * 2 + ["captured", "put_off"]
+
+
+def populate(rows: int):
+    """Bulk insert through sqlite3 - the triggers still fire per row"""
+    conn = sqlite3.connect(db_path)
+    now = datetime.utcnow().isoformat(" ")
+    conn.executemany(
+        "INSERT INTO tasks (raw_input, processed_text, status, priority_score, notes, "
+        "created_at, touched_at, is_life_critical, is_quick_win, pinned, recurring, is_interesting) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0, 0, 0)",
+        (
+            (
+                f"task {i}", f"Processed task {i}", random.choice(STATUSES),
+                round(random.random(), 2), "some notes " * 10, now, now,
+                random.random() < 0.05, random.random() < 0.2,
+            )
+            for i in range(rows)
+        ),
+    )
+    # Churn: status changes, priority changes, deletes
+    ids = random.sample(range(1, rows + 1), min(rows, 5000))
+    conn.executemany("UPDATE tasks SET status = 'done' WHERE id = ?", [(i,) for i in ids[:2000]])
+    conn.executemany(
+        "UPDATE tasks SET priority_score = ? WHERE id = ?",
+        [(round(random.random(), 2), i) for i in ids[2000:4000]],
+    )
+    conn.executemany("DELETE FROM tasks WHERE id = ?", [(i,) for i in ids[4000:]])
+    conn.commit()
+    conn.close()
+
+
+async def legacy_stats(session):
+    """What the endpoint used to do - load every row"""
+    result = await session.execute(select(Task))
+    all_tasks = result.scalars().all()
+    stats = {"total": len(all_tasks), "by_status": {}, "life_critical_active": 0,
+             "quick_wins": 0, "high_priority": 0}
+    for task in all_tasks:
+        status = task.status or "unknown"
+        stats["by_status"][status] = stats["by_status"].get(status, 0) + 1
+        if task.is_life_critical and task.status == "active":
+            stats["life_critical_active"] += 1
+        if task.is_quick_win and task.status == "active":
+            stats["quick_wins"] += 1
+        if task.priority_score >= 0.7 and task.status == "active":
+            stats["high_priority"] += 1
+    return stats
+
+
+async def timed(fn, repeat: int = 5):
+    best = float("inf")
+    value = None
+    for _ in range(repeat):
+        async with async_session_maker() as session:
+            started = time.perf_counter()
+            value = await fn(session)
+            best = min(best, (time.perf_counter() - started) * 1000)
+    return value, best
+
+
+async def main():
+    await init_db()
+    started = time.perf_counter()
+    populate(ROWS)
+    print(f"Populated {ROWS} tasks in {time.perf_counter() - started:.1f}s ({db_path})")
+
+    legacy, legacy_ms = await timed(legacy_stats, repeat=2)
+    counters, counters_ms = await timed(read_stats)
+
+    print(f"full table load : {legacy_ms:9.2f} ms")
+    print(f"counters table  : {counters_ms:9.2f} ms")
+
+    ok = True
+    if legacy != counters:
+        print(f"MISMATCH\n  full scan: {legacy}\n  counters:  {counters}")
+        ok = False
+    if counters_ms > MAX_STATS_MS:
+        print(f"SLOW: counters read took {counters_ms:.2f} ms (limit {MAX_STATS_MS} ms)")
+        ok = False
+
+    await engine.dispose()
+    print("OK" if ok else "FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -2,7 +2,7 @@
 # Input capture script - works with fuzzel, rofi, wofi, etc.
 # Bind this to a hotkey in your compositor (Niri)
 
-API_BASE="${JAMUP_API_BASE:-http://localhost:8000}"
+JT="$(dirname "$(readlink -f "${BASH_SOURCE[0]}")")/jt"
 
 # Detect which launcher is available
 if command -v fuzzel &> /dev/null; then
@@ -33,11 +33,8 @@ if [ -z "$input" ]; then
     exit 0
 fi
 
-# Send to API (silent, no feedback)
-curl -s -X POST "$API_BASE/api/tasks/capture" \
-    -H "Content-Type: application/json" \
-    -d "{\"raw_input\": \"$input\"}" \
-    > /dev/null 2>&1 &
+# Send to API (silent, no feedback) - jt takes a few ms over the local
+# socket, and if the backend is down it keeps the task in the offline spool
+"$JT" add "$input" > /dev/null 2>&1
 
-# Exit immediately - don't wait for response
 exit 0
@@ -0,0 +1,904 @@
+"""
+JamUpTaskMaster CLI - Terminal-native interface
+Usage: jt <command> [args]
+
+Built to start fast: run through the scripts/jt launcher so the bytecode is
+cached, HTTP over the backend's Unix socket on one kept-alive connection,
+only the imports a command needs, no health check up front.
+Captures made while the backend is down go to an offline spool that the
+backend replays when it starts.
+"""
+import sys
+import os
+import json
+
+API_BASE = os.getenv("JAMUP_API_BASE", "http://localhost:8000")
+
+# Project root (where run.sh and data/ live) - jt is usually a symlink to scripts/jt
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+DATA_DIR = os.getenv("JAMUP_DATA_DIR", os.path.join(PROJECT_ROOT, "data"))
+# The backend's Unix socket - used unless JAMUP_API_BASE is set, TCP otherwise
+API_SOCKET = os.getenv("JAMUP_SOCKET", os.path.join(DATA_DIR, "jamup.sock"))
+# Captures made while the backend can't be reached
+SPOOL = os.getenv("JAMUP_SPOOL", os.path.join(DATA_DIR, "spool.ndjson"))
+
+# Last response + ETag per GET url, so unchanged data comes back as an empty 304
+CACHE_DIR = os.path.join(os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "jamup")
+ETAG_CACHE = os.path.join(CACHE_DIR, "etags.json")
+ETAG_CACHE_MAX = 50
+
+# Colors for terminal output
+class C:
+    RED = '\033[91m'
+    ORANGE = '\033[93m'
+    YELLOW = '\033[93m'
+    GREEN = '\033[92m'
+    BLUE = '\033[94m'
+    CYAN = '\033[96m'
+    GRAY = '\033[90m'
+    BOLD = '\033[1m'
+    END = '\033[0m'
+
+class Unreachable(Exception):
+    """The backend couldn't be reached"""
+
+class Connection:
+    """
+    Minimal HTTP/1.1 client on one kept-alive connection - over the Unix
+    socket when there is one, TCP otherwise. (Importing http.client takes
+    longer than a whole request over the socket)
+    """
+
+    def __init__(self):
+        self.sock = None
+        self.buffer = b""
+        scheme, _, rest = API_BASE.partition("://")
+        address, slash, path = rest.partition("/")
+        self.host = address
+        self.prefix = (slash + path).rstrip("/")
+
+    def _connect(self, timeout):
+        import socket
+
+        if "JAMUP_API_BASE" not in os.environ and os.path.exists(API_SOCKET):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(API_SOCKET)
+                return sock
+            except OSError:
+                sock.close()  # Left behind by a backend that's gone - try TCP
+
+        host, _, port = self.host.rpartition(":") if ":" in self.host else (self.host, "", "80")
+        try:
+            return socket.create_connection((host, int(port)), timeout=timeout)
+        except OSError:
+            raise Unreachable()
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+        self.sock = None
+        self.buffer = b""
+
+    def request(self, method, endpoint, body=None, headers=None, timeout=10):
+        """Send a request and read the response head; returns (status, headers)"""
+        lines = [f"{method} {self.prefix}{endpoint} HTTP/1.1", f"Host: {self.host}"]
+        for name, value in (headers or {}).items():
+            lines.append(f"{name}: {value}")
+        if body is not None:
+            lines += ["Content-Type: application/json", f"Content-Length: {len(body)}"]
+        message = ("\r\n".join(lines) + "\r\n\r\n").encode() + (body or b"")
+
+        for attempt in range(2):
+            reused = self.sock is not None
+            if not reused:
+                self.sock = self._connect(timeout)
+            self.sock.settimeout(timeout)
+            try:
+                self.sock.sendall(message)
+                return self._read_head()
+            except ConnectionError:
+                self.close()
+                if not reused or attempt:
+                    raise
+                # The server dropped the idle keep-alive connection - nothing was processed
+
+    def _fill(self):
+        data = self.sock.recv(65536)
+        if not data:
+            raise ConnectionResetError("Connection closed by the backend")
+        self.buffer += data
+
+    def _read_line(self):
+        while b"\r\n" not in self.buffer:
+            self._fill()
+        line, self.buffer = self.buffer.split(b"\r\n", 1)
+        return line
+
+    def _read_exact(self, size):
+        while len(self.buffer) < size:
+            self._fill()
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+    def _read_head(self):
+        status = int(self._read_line().split(b" ", 2)[1])
+        headers = {}
+        while True:
+            line = self._read_line()
+            if not line:
+                return status, headers
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    def chunks(self, headers):
+        """The response body, piece by piece as it arrives"""
+        if headers.get("transfer-encoding") == "chunked":
+            while True:
+                size = int(self._read_line().split(b";")[0], 16)
+                if size == 0:
+                    while self._read_line():
+                        pass  # Trailers
+                    break
+                yield self._read_exact(size)
+                self._read_exact(2)
+        else:
+            yield self._read_exact(int(headers.get("content-length", 0)))
+        if headers.get("connection") == "close":
+            self.close()
+
+    def read_body(self, headers):
+        return b"".join(self.chunks(headers))
+
+    def lines(self, headers):
+        """The response body line by line as it streams in"""
+        pending = b""
+        for chunk in self.chunks(headers):
+            pending += chunk
+            *complete, pending = pending.split(b"\n")
+            yield from complete
+        if pending:
+            yield pending
+
+_connection = None
+
+def connection():
+    """The connection for this jt run, opened on first use"""
+    global _connection
+    if _connection is None:
+        _connection = Connection()
+    return _connection
+
+def check_health():
+    """Check if backend is running"""
+    try:
+        status, headers = connection().request("GET", "/health", timeout=2)
+        data = json.loads(connection().read_body(headers))
+        return status == 200 and data.get('status') == 'ok'
+    except Exception:
+        connection().close()
+        return False
+
+def start_backend():
+    """Try to start the backend"""
+    import subprocess
+
+    run_script = os.path.join(PROJECT_ROOT, "run.sh")
+
+    if not os.path.exists(run_script):
+        print(f"{C.RED}Error: Can't find run.sh at {run_script}{C.END}")
+        return False
+
+    print(f"{C.YELLOW}Starting backend...{C.END}")
+    try:
+        # Run in background
+        subprocess.Popen(
+            ["bash", run_script],
+            cwd=PROJECT_ROOT,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+
+        # Poll often - a local (single-process) start is up in a second or two
+        import time
+        for i in range(300):
+            time.sleep(0.1)
+            if check_health():
+                print(f"{C.GREEN}✓ Backend started{C.END}")
+                return True
+            if i % 10 == 9:
+                print(f"{C.GRAY}.{C.END}", end='', flush=True)
+
+        print(f"\n{C.RED}Backend didn't start in time. Check logs manually.{C.END}")
+        return False
+    except Exception as e:
+        print(f"{C.RED}Failed to start backend: {e}{C.END}")
+        return False
+
+def ensure_backend(auto_start=True):
+    """Make sure the backend is up, offering to start it"""
+    if not check_health():
+        if auto_start:
+            print(f"{C.YELLOW}Backend not running.{C.END}")
+            response = input("Start it now? [Y/n]: ").strip().lower()
+            if response in ['', 'y', 'yes']:
+                if not start_backend():
+                    sys.exit(1)
+            else:
+                print(f"{C.GRAY}Run: ./run.sh{C.END}")
+                sys.exit(1)
+        else:
+            print(f"{C.RED}Error: Can't reach API at {API_BASE}{C.END}")
+            print(f"{C.GRAY}Make sure the service is running: ./run.sh{C.END}")
+            sys.exit(1)
+
+def load_etag_cache():
+    try:
+        with open(ETAG_CACHE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_etag_cache(cache):
+    """Write atomically - several jt invocations may run at once"""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # Dicts keep insertion order, so the oldest entries go first
+        entries = list(cache.items())[-ETAG_CACHE_MAX:]
+        tmp = f"{ETAG_CACHE}.{os.getpid()}"
+        with open(tmp, "w") as f:
+            json.dump(dict(entries), f)
+        os.replace(tmp, ETAG_CACHE)
+    except OSError:
+        pass
+
+def _error_detail(status, body):
+    try:
+        detail = json.loads(body).get("detail")
+    except Exception:
+        detail = None
+    return detail if isinstance(detail, str) else f"HTTP {status}"
+
+def api_call(endpoint, method="GET", data=None, auto_start=True, offline=False):
+    """
+    Make API call - one round trip; the backend is only health-checked (and
+    offered a start) when it can't be reached. With offline=True that raises
+    Unreachable instead, for the caller to save the data for later
+    """
+    headers = {}
+
+    # Conditional GET - the server replies 304 if nothing changed since last time
+    cache = load_etag_cache() if method == "GET" else None
+    cached = cache.get(endpoint) if cache else None
+    if cached:
+        headers["If-None-Match"] = cached["etag"]
+
+    body = json.dumps(data).encode('utf-8') if data else None
+
+    for attempt in range(2):
+        try:
+            status, response_headers = connection().request(method, endpoint, body, headers)
+            payload = connection().read_body(response_headers)
+        except Unreachable:
+            if offline:
+                raise
+            if attempt == 0:
+                # Refused before anything was sent, so retrying can't apply a change twice
+                ensure_backend(auto_start)
+                continue
+            print(f"{C.RED}Error: Can't reach API at {API_BASE}{C.END}")
+            print(f"{C.GRAY}Make sure the service is running: ./run.sh{C.END}")
+            sys.exit(1)
+        except OSError as e:
+            connection().close()
+            if offline:
+                raise Unreachable()  # Maybe it got through - better twice than lost
+            print(f"{C.RED}Error: {e}{C.END}")
+            sys.exit(1)
+        break
+
+    if status == 304 and cached:
+        return cached["body"]
+    if status >= 500 and offline:
+        raise Unreachable()  # Rolled back on the server
+    if status >= 400:
+        print(f"{C.RED}Error: {_error_detail(status, payload)}{C.END}")
+        sys.exit(1)
+
+    result = json.loads(payload)
+    etag = response_headers.get("etag")
+    if cache is not None and etag:
+        cache.pop(endpoint, None)
+        cache[endpoint] = {"etag": etag, "body": result}
+        save_etag_cache(cache)
+    return result
+
+def api_stream(endpoint, method="GET", data=None, auto_start=True):
+    """Make a streaming API call, yielding each NDJSON message as it arrives"""
+    body = json.dumps(data).encode('utf-8') if data else None
+
+    for attempt in range(2):
+        try:
+            # Long timeout - the model may take a while before the first token
+            status, headers = connection().request(method, endpoint, body, timeout=300)
+            break
+        except Unreachable:
+            if attempt == 0:
+                ensure_backend(auto_start)
+                continue
+            print(f"{C.RED}Error: Can't reach API at {API_BASE}{C.END}")
+            print(f"{C.GRAY}Make sure the service is running: ./run.sh{C.END}")
+            sys.exit(1)
+
+    if status >= 400:
+        print(f"{C.RED}Error: {_error_detail(status, connection().read_body(headers))}{C.END}")
+        sys.exit(1)
+    for line in connection().lines(headers):
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+def spool_captures(texts):
+    """Keep captures on disk until the backend is back - it replays the spool when it starts"""
+    import fcntl
+    import time
+
+    now = time.time()
+    lines = "".join(json.dumps({"raw_input": text, "captured_at": now}) + "\n" for text in texts)
+    os.makedirs(os.path.dirname(SPOOL), exist_ok=True)
+    with open(SPOOL, "a") as spool:
+        # Appends are whole lines under the lock, so a replay never sees half a capture
+        fcntl.flock(spool, fcntl.LOCK_EX)
+        spool.write(lines)
+        spool.flush()
+        os.fsync(spool.fileno())
+
+def capture(texts):
+    """Capture tasks in one request, or into the spool if the backend can't take them"""
+    try:
+        if len(texts) == 1:
+            api_call("/api/tasks/capture", "POST", {"raw_input": texts[0]}, offline=True)
+        else:
+            api_call("/api/tasks/capture/bulk", "POST", texts, offline=True)
+        return True
+    except Unreachable:
+        spool_captures(texts)
+        return False
+
+def print_stream(endpoint, method="GET", data=None):
+    """Print streamed tokens as they arrive, returns the final message"""
+    final = {}
+    try:
+        for message in api_stream(endpoint, method, data):
+            if "token" in message:
+                print(message["token"], end='', flush=True)
+            if message.get("error"):
+                print(f"\n{C.RED}Error: {message['error']}{C.END}", end='')
+            if message.get("done"):
+                final = message
+    except KeyboardInterrupt:
+        # Closing the connection cancels generation on the server
+        connection().close()
+        print(f" {C.GRAY}(stopped){C.END}", end='')
+    print()
+    return final
+
+def get_priority_color(score):
+    """Get color for priority score"""
+    if score >= 0.9:
+        return C.RED
+    elif score >= 0.7:
+        return C.ORANGE
+    elif score >= 0.5:
+        return C.YELLOW
+    else:
+        return C.GRAY
+
+def cmd_list(status="active"):
+    """List tasks"""
+    data = api_call(f"/api/tasks?status={status}&limit=50")
+    tasks = data.get("tasks", [])
+
+    if not tasks:
+        print(f"{C.GRAY}No {status} tasks{C.END}")
+        return
+
+    print(f"\n{C.BOLD}{status.upper()} TASKS{C.END}\n")
+
+    for i, task in enumerate(tasks):
+        task_id = task['id']
+        text = task.get('processed_text') or task.get('raw_input', 'Unknown')
+        priority = task.get('priority_score', 0.5)
+        color = get_priority_color(priority)
+
+        # Flags
+        flags = []
+        if task.get('is_life_critical'):
+            flags.append(f"{C.RED}[CRITICAL]{C.END}")
+        if task.get('is_quick_win'):
+            flags.append(f"{C.GREEN}[QUICK]{C.END}")
+
+        flag_str = " ".join(flags)
+
+        # Category
+        cat = task.get('category', '')
+        cat_str = f"{C.CYAN}[{cat}]{C.END} " if cat else ""
+
+        print(f"{color}[{task_id}]{C.END} {cat_str}{text} {flag_str}")
+
+        # Show priority if high
+        if priority >= 0.7:
+            print(f"     {C.GRAY}Priority: {priority:.2f}{C.END}")
+
+    print()
+
+def cmd_find(query):
+    """Full-text search across everything, done tasks included"""
+    if not query:
+        print(f"{C.RED}Usage: jt find <words>{C.END}")
+        sys.exit(1)
+
+    from urllib.parse import quote
+
+    data = api_call(f"/api/tasks/search?q={quote(query)}&limit=20")
+    results = data.get("results", [])
+
+    if not results:
+        print(f"{C.GRAY}Nothing matches \"{query}\"{C.END}")
+        return
+
+    print()
+    for task in results:
+        color = get_priority_color(task.get('priority_score', 0.5))
+        snippet = task.get('snippet') or task.get('processed_text') or task.get('raw_input', '')
+        snippet = snippet.replace("<b>", C.BOLD + C.YELLOW).replace("</b>", C.END)
+        status = task.get('status', '')
+        status_str = f" {C.GRAY}({status}){C.END}" if status != "active" else ""
+        print(f"{color}[{task['id']}]{C.END} {snippet}{status_str}")
+    print()
+
+def cmd_add(text):
+    """Add a task - or, with text piped in, one task per line"""
+    if not text:
+        if not sys.stdin.isatty():
+            cmd_dump()
+            return
+        print(f"{C.RED}Usage: jt add <text>{C.END}")
+        sys.exit(1)
+
+    if capture([text]):
+        print(f"{C.GREEN}✓{C.END} Task captured: {C.GRAY}{text}{C.END}")
+    else:
+        print(f"{C.YELLOW}✓{C.END} Saved offline, captured when the backend starts: {C.GRAY}{text}{C.END}")
+
+def cmd_dump():
+    """Brain-dump: one task per line from stdin, captured in a single request"""
+    if sys.stdin.isatty():
+        print(f"{C.CYAN}One task per line, Ctrl-D when done:{C.END}")
+
+    try:
+        lines = [line.strip() for line in sys.stdin.read().splitlines()]
+    except KeyboardInterrupt:
+        print(f"\n{C.GRAY}Cancelled{C.END}")
+        sys.exit(1)
+    lines = [line for line in lines if line]
+
+    if not lines:
+        print(f"{C.GRAY}Nothing to capture{C.END}")
+        return
+
+    if capture(lines):
+        print(f"{C.GREEN}✓{C.END} {len(lines)} tasks captured")
+    else:
+        print(f"{C.YELLOW}✓{C.END} {len(lines)} tasks saved offline, captured when the backend starts")
+
+def cmd_show(task_id):
+    """Show task details"""
+    try:
+        task_id = int(task_id)
+    except:
+        print(f"{C.RED}Invalid task ID{C.END}")
+        sys.exit(1)
+
+    task = api_call(f"/api/tasks/{task_id}")
+
+    print(f"\n{C.BOLD}TASK [{task['id']}]{C.END}")
+    print(f"{C.CYAN}Text:{C.END} {task.get('processed_text') or task.get('raw_input')}")
+
+    if task.get('raw_input') != task.get('processed_text'):
+        print(f"{C.GRAY}Original:{C.END} {task['raw_input']}")
+
+    print(f"{C.CYAN}Status:{C.END} {task['status']}")
+    print(f"{C.CYAN}Priority:{C.END} {task.get('priority_score', 0):.2f}")
+
+    if task.get('category'):
+        print(f"{C.CYAN}Category:{C.END} {task['category']}")
+
+    if task.get('is_life_critical'):
+        print(f"{C.RED}LIFE CRITICAL{C.END}")
+
+    if task.get('is_quick_win'):
+        print(f"{C.GREEN}Quick win (< 10 min){C.END}")
+
+    if task.get('notes'):
+        print(f"{C.CYAN}Notes:{C.END} {task['notes']}")
+
+    if task.get('recurring_pattern'):
+        next_due = f" {C.GRAY}(next {task['next_due']} UTC){C.END}" if task.get('next_due') else ""
+        print(f"{C.CYAN}Repeats:{C.END} {task['recurring_pattern']}{next_due}")
+
+    created = task.get('created_at', '')
+    if created:
+        print(f"{C.GRAY}Created: {created}{C.END}")
+
+    print()
+
+def parse_ids(args):
+    """Task ids from the command line"""
+    try:
+        ids = [int(arg) for arg in args]
+    except ValueError:
+        print(f"{C.RED}Invalid task ID{C.END}")
+        sys.exit(1)
+    if not ids:
+        print(f"{C.RED}No task ID given{C.END}")
+        sys.exit(1)
+    return ids
+
+def ids_and_amount(args, default=0.1):
+    """
+    Ids and an optional trailing amount. The amount is the last argument and
+    has a decimal point ("jt bump 2 0.3", "jt bump 2 5 0.3"); a bare number
+    is always an id, so "jt bump 2 5" bumps tasks 2 and 5
+    """
+    if len(args) < 2 or "." not in args[-1]:
+        return parse_ids(args), default
+    value = args[-1]
+    try:
+        amount = float(value)
+        if not 0 <= amount <= 1:
+            raise ValueError()
+    except ValueError:
+        print(f"{C.RED}Invalid amount: {value}. Amount must be 0.0-1.0{C.END}")
+        sys.exit(1)
+    return parse_ids(args[:-1]), amount
+
+def apply_ops(ops):
+    """Apply operations to tasks in one request; returns the tasks as they end up"""
+    data = api_call("/api/tasks/batch", "PATCH", {"ops": ops})
+    for task_id in data.get("missing", []):
+        print(f"{C.GRAY}No task {task_id}{C.END}")
+    return data
+
+def set_status(task_ids, status, mark):
+    """Change status of several tasks in one round trip"""
+    data = apply_ops([{"ids": task_ids, "status": status}])
+    for task in data["tasks"]:
+        text = task.get('processed_text') or task.get('raw_input', 'Unknown')
+        print(f"{mark} {C.GRAY}{text}{C.END}")
+
+def cmd_md(task_ids):
+    """Mark done"""
+    set_status(task_ids, "done", f"{C.GREEN}✓{C.END} Done:")
+
+def cmd_po(task_ids):
+    """Put off"""
+    set_status(task_ids, "put_off", f"{C.YELLOW}⏸{C.END} Put off:")
+
+def cmd_li(task_ids):
+    """Lost interest"""
+    set_status(task_ids, "lost_interest", f"{C.GRAY}⊘{C.END} Lost interest:")
+
+def cmd_fo(task_ids):
+    """Fuck off"""
+    set_status(task_ids, "fuck_off", f"{C.RED}✖{C.END} Fuck off:")
+
+def cmd_del(task_ids):
+    """Delete tasks"""
+    listed = ", ".join(str(task_id) for task_id in task_ids)
+    print(f"{C.YELLOW}Really delete {'task' if len(task_ids) == 1 else 'tasks'} {listed}?{C.END}")
+    confirm = input("Type 'yes' to confirm: ")
+    if confirm.lower() != 'yes':
+        print("Cancelled")
+        return
+
+    data = apply_ops([{"ids": task_ids, "delete": True}])
+    for task_id in data["deleted"]:
+        print(f"{C.RED}✖{C.END} Deleted: {C.GRAY}[{task_id}]{C.END}")
+
+def cmd_next():
+    """Get AI suggestion for what to do next"""
+    print(f"\n{C.CYAN}AI Suggestion:{C.END}\n")
+    print_stream("/api/tasks/suggestions/stream")
+    print()
+
+def cmd_stats():
+    """Show stats"""
+    data = api_call("/api/tasks/stats/overview")
+
+    print(f"\n{C.BOLD}STATS{C.END}\n")
+    print(f"{C.CYAN}Total tasks:{C.END} {data.get('total', 0)}")
+
+    by_status = data.get('by_status', {})
+    for status, count in by_status.items():
+        print(f"  {status}: {count}")
+
+    if data.get('life_critical_active', 0) > 0:
+        print(f"\n{C.RED}Life critical tasks:{C.END} {data['life_critical_active']}")
+
+    if data.get('quick_wins', 0) > 0:
+        print(f"{C.GREEN}Quick wins available:{C.END} {data['quick_wins']}")
+
+    if data.get('high_priority', 0) > 0:
+        print(f"{C.ORANGE}High priority:{C.END} {data['high_priority']}")
+
+    print()
+
+def cmd_process():
+    """Manually trigger processing"""
+    print(f"{C.GRAY}Processing captured tasks...{C.END}")
+    data = api_call("/api/tasks/process", "POST")
+    count = data.get('count', 0)
+    if count > 0:
+        print(f"{C.GREEN}✓{C.END} Processed {count} tasks")
+    else:
+        print(f"{C.GRAY}No tasks to process{C.END}")
+
+def cmd_pin(task_ids):
+    """Pin tasks to top (set priority to 1.0)"""
+    data = apply_ops([{"ids": task_ids, "priority_score": 1.0, "pinned": True}])
+    for task in data["tasks"]:
+        text = task.get('processed_text') or task.get('raw_input', 'Unknown')
+        print(f"{C.RED}📌{C.END} Pinned to top: {C.GRAY}{text}{C.END}")
+
+def change_priority(task_ids, delta, mark):
+    """Move priority by delta - added on the server, so nothing is read first"""
+    data = apply_ops([{"ids": task_ids, "priority_delta": delta}])
+    for task in data["tasks"]:
+        text = task.get('processed_text') or task.get('raw_input', 'Unknown')
+        print(f"{mark} priority → {task.get('priority_score', 0):.2f}: {C.GRAY}{text}{C.END}")
+
+def cmd_bump(task_ids, amount=0.1):
+    """Bump priority up"""
+    change_priority(task_ids, amount, f"{C.GREEN}⬆{C.END} Bumped")
+
+def cmd_drop(task_ids, amount=0.1):
+    """Drop priority down"""
+    change_priority(task_ids, -amount, f"{C.YELLOW}⬇{C.END} Dropped")
+
+def cmd_prio(task_ids, score):
+    """Set priority directly"""
+    try:
+        score = float(score)
+        if not 0 <= score <= 1:
+            raise ValueError()
+    except:
+        print(f"{C.RED}Invalid arguments. Score must be 0.0-1.0{C.END}")
+        sys.exit(1)
+
+    data = apply_ops([{"ids": task_ids, "priority_score": score}])
+    color = get_priority_color(score)
+    for task in data["tasks"]:
+        text = task.get('processed_text') or task.get('raw_input', 'Unknown')
+        print(f"{color}Priority set to {score:.2f}{C.END}")
+        print(f"   {C.GRAY}{text}{C.END}")
+
+def cmd_every(task_id, pattern):
+    """Make a task recurring ("off" stops it)"""
+    try:
+        task_id = int(task_id)
+    except:
+        print(f"{C.RED}Invalid task ID{C.END}")
+        sys.exit(1)
+
+    off = pattern.strip().lower() in ("off", "never", "none", "stop")
+    task = api_call(f"/api/tasks/{task_id}", "PATCH", {"recurring_pattern": "" if off else pattern})
+    text = task.get('processed_text') or task.get('raw_input', 'Unknown')
+
+    if off:
+        print(f"{C.GRAY}No longer repeats:{C.END} {text}")
+    else:
+        print(f"{C.CYAN}↻{C.END} Repeats {task['recurring_pattern']}, next {task['next_due']} UTC")
+        print(f"   {C.GRAY}{text}{C.END}")
+
+def cmd_chat(message=None):
+    """Interactive chat with task context"""
+    if message:
+        # Single message mode
+        print(f"{C.CYAN}Assistant:{C.END}")
+        response = print_stream("/api/chat/stream", "POST", {"message": message, "include_context": True})
+        print()
+        if response.get('task_count', 0) > 0:
+            print(f"{C.GRAY}(Context: {response['task_count']} tasks){C.END}\n")
+    else:
+        # Interactive mode
+        print(f"{C.BOLD}Chat with Assistant{C.END}")
+        print(f"{C.GRAY}Type 'exit' or 'quit' to end conversation{C.END}\n")
+
+        while True:
+            try:
+                user_input = input(f"{C.GREEN}You:{C.END} ").strip()
+                if user_input.lower() in ['exit', 'quit', 'q']:
+                    print(f"{C.GRAY}Goodbye!{C.END}")
+                    break
+                if not user_input:
+                    continue
+
+                print(f"\n{C.CYAN}Assistant:{C.END} ", end='', flush=True)
+                print_stream("/api/chat/stream", "POST", {"message": user_input, "include_context": True})
+                print()
+
+            except KeyboardInterrupt:
+                print(f"\n{C.GRAY}Goodbye!{C.END}")
+                break
+            except EOFError:
+                break
+
+def cmd_web():
+    """Open dashboard in browser"""
+    import subprocess
+
+    # Check if backend is running first
+    if not check_health():
+        print(f"{C.YELLOW}Backend not running. Starting it first...{C.END}")
+        if not start_backend():
+            sys.exit(1)
+
+    browser = os.getenv("BROWSER", "xdg-open")
+    url = f"{API_BASE}"
+
+    print(f"{C.CYAN}Opening dashboard in browser...{C.END}")
+    try:
+        subprocess.Popen([browser, url], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        print(f"{C.GREEN}✓{C.END} Opened {url}")
+    except Exception as e:
+        print(f"{C.RED}Failed to open browser: {e}{C.END}")
+        print(f"{C.GRAY}Open manually: {url}{C.END}")
+
+def show_help():
+    """Show help"""
+    print(f"""
+{C.BOLD}JamUpTaskMaster CLI{C.END}
+
+{C.CYAN}USAGE:{C.END}
+  jt ls              List active tasks
+  jt add <text>      Add a task
+  jt dump            Add many tasks, one per line (or pipe: ... | jt add)
+  jt show <id>       Show task details
+  jt find <words>    Search all tasks (prefixes work: "pil" finds pillows)
+
+  jt md <id>...      Mark done (any number of ids, one request)
+  jt po <id>...      Put off
+  jt li <id>...      Lost interest (comes back in 2 weeks)
+  jt fo <id>...      Fuck off (archive it)
+  jt del <id>...     Delete (asks for confirmation)
+
+  jt pin <id>...     Pin task to top (priority 1.0)
+  jt bump <id>... [amt] Bump priority up (default 0.1)
+  jt drop <id>... [amt] Drop priority down (default 0.1)
+  jt prio <id>... <val> Set priority (0.0-1.0)
+  jt every <id> <pattern>  Repeat: "daily", "mondays at 9am", "every 2 days" (off to stop)
+
+  jt next            AI suggestion for what to do
+  jt stats           Show overview
+  jt process         Manually trigger processing
+
+  jt chat [message]  Chat with assistant (interactive if no message)
+  jt web             Open dashboard in browser
+
+  jt help            Show this help
+
+{C.CYAN}EXAMPLES:{C.END}
+  jt add "order pillows walmart"
+  cat brain-dump.txt | jt add
+  jt ls
+  jt md 0
+  jt md 3 5 9        # Several at once
+  jt pin 1           # Pin task 1 to top
+  jt bump 2 0.2      # Increase priority by 0.2
+  jt bump 2 5 0.2    # Tasks 2 and 5 (the amount has a ".", ids don't)
+  jt prio 3 0.8      # Set priority to 0.8
+  jt every 4 "weekdays at 8am"
+  jt po 1 7          # Put off tasks 1 and 7
+  jt fo 2
+
+{C.CYAN}CONFIG:{C.END}
+  JAMUP_API_BASE     API endpoint (default: the local socket, else http://localhost:8000)
+  JAMUP_SOCKET       Backend's Unix socket (default: data/jamup.sock)
+  JAMUP_SPOOL        Offline captures (default: data/spool.ndjson)
+""")
+
+def main():
+    if len(sys.argv) < 2:
+        cmd_list()
+        return
+
+    cmd = sys.argv[1]
+    args = sys.argv[2:]
+
+    if cmd in ["ls", "list"]:
+        status = args[0] if args else "active"
+        cmd_list(status)
+    elif cmd in ["add", "a"]:
+        cmd_add(" ".join(args))
+    elif cmd in ["dump", "bulk"]:
+        cmd_dump()
+    elif cmd in ["find", "f", "search"]:
+        cmd_find(" ".join(args))
+    elif cmd in ["show", "s"]:
+        if not args:
+            print(f"{C.RED}Usage: jt show <id>{C.END}")
+            sys.exit(1)
+        cmd_show(args[0])
+    elif cmd in ["md", "done"]:
+        if not args:
+            print(f"{C.RED}Usage: jt md <id>...{C.END}")
+            sys.exit(1)
+        cmd_md(parse_ids(args))
+    elif cmd in ["po", "putoff"]:
+        if not args:
+            print(f"{C.RED}Usage: jt po <id>...{C.END}")
+            sys.exit(1)
+        cmd_po(parse_ids(args))
+    elif cmd in ["li", "lost"]:
+        if not args:
+            print(f"{C.RED}Usage: jt li <id>...{C.END}")
+            sys.exit(1)
+        cmd_li(parse_ids(args))
+    elif cmd in ["fo", "fuckoff"]:
+        if not args:
+            print(f"{C.RED}Usage: jt fo <id>...{C.END}")
+            sys.exit(1)
+        cmd_fo(parse_ids(args))
+    elif cmd in ["del", "delete", "rm"]:
+        if not args:
+            print(f"{C.RED}Usage: jt del <id>...{C.END}")
+            sys.exit(1)
+        cmd_del(parse_ids(args))
+    elif cmd in ["next", "suggest"]:
+        cmd_next()
+    elif cmd in ["stats", "st"]:
+        cmd_stats()
+    elif cmd in ["process", "proc"]:
+        cmd_process()
+    elif cmd in ["pin"]:
+        if not args:
+            print(f"{C.RED}Usage: jt pin <id>...{C.END}")
+            sys.exit(1)
+        cmd_pin(parse_ids(args))
+    elif cmd in ["bump", "up"]:
+        if not args:
+            print(f"{C.RED}Usage: jt bump <id>... [amount]{C.END}")
+            sys.exit(1)
+        cmd_bump(*ids_and_amount(args))
+    elif cmd in ["drop", "down"]:
+        if not args:
+            print(f"{C.RED}Usage: jt drop <id>... [amount]{C.END}")
+            sys.exit(1)
+        cmd_drop(*ids_and_amount(args))
+    elif cmd in ["prio", "priority"]:
+        if len(args) < 2:
+            print(f"{C.RED}Usage: jt prio <id>... <score>{C.END}")
+            sys.exit(1)
+        cmd_prio(parse_ids(args[:-1]), args[-1])
+    elif cmd in ["every", "repeat"]:
+        if len(args) < 2:
+            print(f"{C.RED}Usage: jt every <id> <pattern>{C.END}")
+            sys.exit(1)
+        cmd_every(args[0], " ".join(args[1:]))
+    elif cmd in ["chat", "talk"]:
+        # If args provided, treat as single message
+        message = " ".join(args) if args else None
+        cmd_chat(message)
+    elif cmd in ["web", "open", "dashboard"]:
+        cmd_web()
+    elif cmd in ["help", "h", "-h", "--help"]:
+        show_help()
+    else:
+        print(f"{C.RED}Unknown command: {cmd}{C.END}")
+        print(f"Run {C.CYAN}jt help{C.END} for usage")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,41 @@
 #!/usr/bin/env python3
 """
 Database migration script for JamUpTaskMaster
-Adds the 'pinned' column to existing databases
+Applies pending schema migrations (app/migrations.py) to an existing database.
+The API and worker do this automatically at startup via init_db; this is for
+migrating a database by hand, e.g. a copy or a backup.
 """
-import sqlite3
 import sys
 import os
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from sqlalchemy import create_engine  # noqa: E402
+
+from app.models.task import Base  # noqa: E402
+from app.models import queue, stats, events, embeddings  # noqa: E402,F401
+from app.migrations import run_migrations, current_version  # noqa: E402
+
+
 def migrate_database(db_path):
-    """Add pinned column if it doesn't exist"""
+    """Create missing tables and apply pending migrations"""
     if not os.path.exists(db_path):
         print(f"❌ Database not found at: {db_path}")
         return False
 
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-
-        # Check if pinned column exists
-        cursor.execute("PRAGMA table_info(tasks)")
-        columns = [col[1] for col in cursor.fetchall()]
-
-        if 'pinned' not in columns:
-            print("Adding 'pinned' column...")
-            cursor.execute("ALTER TABLE tasks ADD COLUMN pinned BOOLEAN DEFAULT 0")
-            conn.commit()
-            print("✓ Column added successfully!")
+        engine = create_engine(f"sqlite:///{db_path}")
+        with engine.begin() as conn:
+            Base.metadata.create_all(conn)
+            before = current_version(conn)
+            applied = run_migrations(conn)
+
+        if applied:
+            print(f"✓ Migrated from version {before} to {applied[-1]}")
         else:
-            print("✓ Column already exists")
+            print(f"✓ Already at version {before}")
 
-        conn.close()
+        engine.dispose()
         return True
     except Exception as e:
         print(f"❌ Migration failed: {e}")
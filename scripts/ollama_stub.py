@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Minimal local stand-in for the Ollama HTTP API
+Used by the benchmark scripts - no model, just canned answers with a
+configurable delay. Speaks HTTP/1.1 with keep-alive and counts connections
+so pooling behaviour is visible. With load_time, a generate call pays that
+much extra when the "model" isn't loaded, honouring keep_alive like Ollama.
+
+Usage: python scripts/ollama_stub.py [port] [delay_ms]
+"""
+import asyncio
+import json
+import re
+import sys
+import time
+
+
+def _seconds(keep_alive) -> float:
+    """Ollama keep_alive: seconds, or a duration like "30m"; negative = forever"""
+    if isinstance(keep_alive, (int, float)):
+        return float("inf") if keep_alive < 0 else float(keep_alive)
+    match = re.fullmatch(r"(-?[\d.]+)(ms|s|m|h)?", str(keep_alive))
+    if not match:
+        return 300.0
+    value = float(match.group(1))
+    if value < 0:
+        return float("inf")
+    return value * {"ms": 0.001, "s": 1, "m": 60, "h": 3600, None: 1}[match.group(2)]
+
+
+class OllamaStub:
+    """Tiny HTTP/1.1 server answering /api/generate, /api/embeddings, /api/tags"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, delay: float = 0.0,
+                 response_text: str = "ok", load_time: float = 0.0):
+        self.host = host
+        self.port = port
+        self.delay = delay
+        self.response_text = response_text
+        self.connections = 0
+        self.requests = 0
+        self.in_flight = 0
+        self.load_time = load_time
+        self.loads = 0
+        self.last_payload = None
+        self._loaded_until = 0.0
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _load(self, payload) -> float:
+        """Seconds spent loading the model for this request"""
+        now = time.monotonic()
+        cold = now >= self._loaded_until
+        self._loaded_until = now + _seconds(payload.get("keep_alive", "5m"))
+        if not cold:
+            return 0.0
+        self.loads += 1
+        await asyncio.sleep(self.load_time)
+        return self.load_time
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode().split(" ", 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, value = line.decode().split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+
+                body = b""
+                if "content-length" in headers:
+                    body = await reader.readexactly(int(headers["content-length"]))
+
+                self.requests += 1
+                self.in_flight += 1
+                try:
+                    await self._respond(writer, method, path, body)
+                finally:
+                    self.in_flight -= 1
+
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, method, path, body):
+        payload = json.loads(body) if body else {}
+        self.last_payload = payload
+        load = await self._load(payload) if path == "/api/generate" else 0.0
+        timings = {"load_duration": int(load * 1e9)}
+
+        if self.delay:
+            await asyncio.sleep(self.delay)
+
+        if path == "/api/generate" and payload.get("stream", True):
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+                b"Transfer-Encoding: chunked\r\n\r\n"
+            )
+            for word in self.response_text.split(" "):
+                self._chunk(writer, json.dumps({"response": word + " ", "done": False}) + "\n")
+                await writer.drain()
+            self._chunk(writer, json.dumps({"response": "", "done": True, **timings}) + "\n")
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+            return
+
+        if path == "/api/generate":
+            text = self.response_text if payload.get("prompt") else ""
+            data = {"model": payload.get("model"), "response": text, "done": True, **timings}
+        elif path == "/api/embeddings":
+            data = {"embedding": [0.0] * 8}
+        elif path == "/api/tags":
+            data = {"models": []}
+        else:
+            writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n")
+            await writer.drain()
+            return
+
+        raw = json.dumps(data).encode()
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+            + f"Content-Length: {len(raw)}\r\n\r\n".encode()
+            + raw
+        )
+        await writer.drain()
+
+    @staticmethod
+    def _chunk(writer, text: str):
+        data = text.encode()
+        writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+
+async def _main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 11434
+    delay = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.0
+    stub = await OllamaStub(port=port, delay=delay).start()
+    print(f"Ollama stub listening on {stub.url}")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(_main())
+    except KeyboardInterrupt:
+        pass
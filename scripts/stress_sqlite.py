@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Concurrency stress test for the SQLite profile
+Runs capture writers, a worker doing batch read-modify-write commits and
+list readers as separate processes against one throwaway database - the
+same shape as the api + worker containers - and counts lock errors.
+
+Usage: python scripts/stress_sqlite.py [--seconds N] [--writers N] [--readers N] [--legacy]
+  --legacy  rollback journal and deferred write transactions, like before
+Exits non-zero if any "database is locked" error was seen.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+
+
+def configure(db_path: str, legacy: bool):
+    """Must run before importing app - the engine is built at import time"""
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+    if legacy:
+        os.environ["SQLITE_JOURNAL_MODE"] = "DELETE"
+        os.environ["SQLITE_SYNCHRONOUS"] = "FULL"
+    sys.path.insert(0, BACKEND)
+
+
+def session_for_writes(legacy: bool):
+    from app.database import async_session_maker, write_session
+    return async_session_maker() if legacy else write_session()
+
+
+def is_lock_error(error: Exception) -> bool:
+    return "database is locked" in str(error) or "database is busy" in str(error)
+
+
+async def capture_loop(deadline: float, legacy: bool, result: dict):
+    from app.models.task import Task
+    from app.services import work_queue
+
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            async with session_for_writes(legacy) as session:
+                task = Task(raw_input="stress capture", status="captured")
+                session.add(task)
+                await session.flush()
+                await work_queue.enqueue(session, [task.id])
+                await session.commit()
+            result["ok"] += 1
+            result["latencies"].append((time.perf_counter() - started) * 1000)
+        except Exception as e:
+            result["locked" if is_lock_error(e) else "errors"] += 1
+        await asyncio.sleep(0.002)
+
+
+async def worker_loop(deadline: float, legacy: bool, result: dict):
+    from sqlalchemy import select
+    from app.database import async_session_maker, write_session
+    from app.models.task import Task
+    from app.services import work_queue
+
+    while time.monotonic() < deadline:
+        try:
+            if legacy:
+                # Old shape: one deferred transaction that reads, then writes
+                async with async_session_maker() as session:
+                    await session.execute(select(Task).where(Task.status == "active").limit(200))
+                    ids = await work_queue.claim(session, limit=50)
+                    rows = await session.execute(select(Task).where(Task.id.in_(ids)))
+                    for task in rows.scalars():
+                        task.status = "active"
+                    await work_queue.complete(session, ids)
+                    await session.commit()
+            else:
+                async with write_session() as session:
+                    ids = await work_queue.claim(session, limit=50)
+                async with async_session_maker() as session:
+                    await session.execute(select(Task).where(Task.status == "active").limit(200))
+                async with write_session() as session:
+                    rows = await session.execute(
+                        select(Task).where(Task.id.in_(ids), Task.status == "captured")
+                    )
+                    for task in rows.scalars():
+                        task.status = "active"
+                    await work_queue.complete(session, ids)
+                    await session.commit()
+            result["ok"] += 1
+        except Exception as e:
+            result["locked" if is_lock_error(e) else "errors"] += 1
+        await asyncio.sleep(0.01)
+
+
+async def reader_loop(deadline: float, legacy: bool, result: dict):
+    from sqlalchemy import select
+    from app.database import async_session_maker
+    from app.models.task import Task
+
+    while time.monotonic() < deadline:
+        try:
+            async with async_session_maker() as session:
+                await session.execute(
+                    select(Task).where(Task.status == "active")
+                    .order_by(Task.rank_score.desc(), Task.id).limit(50)
+                )
+            result["ok"] += 1
+        except Exception as e:
+            result["locked" if is_lock_error(e) else "errors"] += 1
+        await asyncio.sleep(0.005)
+
+
+LOOPS = {"capture": capture_loop, "worker": worker_loop, "reader": reader_loop}
+
+
+def run_role(role: str, db_path: str, legacy: bool, seconds: float, queue):
+    configure(db_path, legacy)
+
+    async def main():
+        from app.database import engine
+        result = {"ok": 0, "locked": 0, "errors": 0, "latencies": []}
+        await LOOPS[role](time.monotonic() + seconds, legacy, result)
+        await engine.dispose()
+        return result
+
+    queue.put((role, asyncio.run(main())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=2)
+    parser.add_argument("--legacy", action="store_true")
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="jamup-stress-"), "tasks.db")
+    configure(db_path, args.legacy)
+
+    from app.database import init_db, engine
+
+    async def setup():
+        await init_db()
+        await engine.dispose()
+    asyncio.run(setup())
+
+    roles = ["capture"] * args.writers + ["worker"] + ["reader"] * args.readers
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    procs = [
+        ctx.Process(target=run_role, args=(role, db_path, args.legacy, args.seconds, queue))
+        for role in roles
+    ]
+    mode = "legacy" if args.legacy else "WAL + write serialization"
+    print(f"{mode}: {args.writers} capture writers, 1 worker, {args.readers} readers, {args.seconds:.0f}s")
+    for proc in procs:
+        proc.start()
+    results = [queue.get() for _ in procs]
+    for proc in procs:
+        proc.join()
+
+    totals = {}
+    latencies = []
+    for role, result in results:
+        total = totals.setdefault(role, {"ok": 0, "locked": 0, "errors": 0})
+        for key in total:
+            total[key] += result[key]
+        latencies.extend(result["latencies"])
+
+    for role, total in totals.items():
+        print(f"  {role:<8} ok={total['ok']:<7} locked={total['locked']:<5} other errors={total['errors']}")
+    if latencies:
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2]
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"  capture commit p50={p50:.1f} ms p99={p99:.1f} ms")
+
+    locked = sum(total["locked"] for total in totals.values())
+    print("OK" if not locked else f"FAILED: {locked} lock errors")
+    sys.exit(1 if locked else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -66,12 +66,33 @@ echo "----------------------"
 test_endpoint "Capture task" "POST" "/api/tasks/capture" '{"raw_input":"automated test task"}' 200
 TASK_ID=$(cat /tmp/last_response.json | jq -r '.id')
 echo "   Created task ID: $TASK_ID"
+test_endpoint "Bulk capture" "POST" "/api/tasks/capture/bulk" '["bulk test one","bulk test two"]' 200
+echo "   Created task IDs: $(cat /tmp/last_response.json | jq -c '.ids')"
 echo ""
 
 echo "3. Testing Task Retrieval"
 echo "------------------------"
 test_endpoint "List tasks" "GET" "/api/tasks?status=captured&limit=50" "" 200
+test_endpoint "List first page" "GET" "/api/tasks?limit=1&fields=raw_input" "" 200
+CURSOR=$(cat /tmp/last_response.json | jq -r '.next_cursor')
+if [ "$CURSOR" != "null" ]; then
+    test_endpoint "List next page" "GET" "/api/tasks?limit=1&fields=raw_input&cursor=$CURSOR" "" 200
+fi
+test_endpoint "Search tasks" "GET" "/api/tasks/search?q=automated%20tes" "" 200
+if cat /tmp/last_response.json | jq -e '.count > 0' > /dev/null; then
+    pass "Search found the captured task by prefix"
+else
+    fail "Search returned no results"
+fi
+test_endpoint "List with filters" "GET" "/api/tasks?quick_win=false&created_after=2020-01-01T00:00:00" "" 200
 test_endpoint "Get specific task" "GET" "/api/tasks/$TASK_ID" "" 200
+ETAG=$(curl -s -D - -o /dev/null "$API_BASE/api/tasks/$TASK_ID" | grep -i '^etag:' | cut -d' ' -f2- | tr -d '\r')
+CODE=$(curl -s -o /dev/null -w "%{http_code}" -H "If-None-Match: $ETAG" "$API_BASE/api/tasks/$TASK_ID")
+if [ -n "$ETAG" ] && [ "$CODE" = "304" ]; then
+    pass "Unchanged task returns 304 for ETag $ETAG"
+else
+    fail "Expected 304 for If-None-Match '$ETAG', got $CODE"
+fi
 echo ""
 
 echo "4. Testing Priority Management"
@@ -86,6 +107,37 @@ if [ "$PINNED" = "true" ]; then
 else
     fail "Pinned field not set (got: $PINNED)"
 fi
+
+test_endpoint "Make recurring" "PATCH" "/api/tasks/$TASK_ID" '{"recurring_pattern":"every 2 days"}' 200
+NEXT_DUE=$(cat /tmp/last_response.json | jq -r '.next_due')
+if [ "$NEXT_DUE" != "null" ]; then
+    pass "next_due set for recurring task"
+else
+    fail "next_due not set"
+fi
+test_endpoint "Reject unknown pattern" "PATCH" "/api/tasks/$TASK_ID" '{"recurring_pattern":"whenever"}' 400
+test_endpoint "Stop recurring" "PATCH" "/api/tasks/$TASK_ID" '{"recurring_pattern":""}' 200
+
+test_endpoint "Capture recurring task to dismiss" "POST" "/api/tasks/capture" '{"raw_input":"water the plastic plant"}' 200
+DISMISS_ID=$(cat /tmp/last_response.json | jq -r '.id')
+test_endpoint "Make it recurring" "PATCH" "/api/tasks/$DISMISS_ID" '{"recurring_pattern":"daily"}' 200
+test_endpoint "Dismiss recurring task" "PATCH" "/api/tasks/$DISMISS_ID" '{"status":"fuck_off"}' 200
+DISMISSED_DUE=$(cat /tmp/last_response.json | jq -r '.next_due')
+if [ "$DISMISSED_DUE" = "null" ]; then
+    pass "Dismissed task won't resurface (next_due cleared)"
+else
+    fail "Dismissed task still scheduled (next_due: $DISMISSED_DUE)"
+fi
+
+test_endpoint "Batch update" "PATCH" "/api/tasks/batch" \
+    "{\"ops\":[{\"ids\":[$TASK_ID],\"priority_delta\":-0.2},{\"ids\":[999999],\"status\":\"done\"}]}" 200
+BATCH_PRIORITY=$(cat /tmp/last_response.json | jq -r '.tasks[0].priority_score | . > 0.69 and . < 0.71')
+BATCH_MISSING=$(cat /tmp/last_response.json | jq -r '.missing[0]')
+if [ "$BATCH_PRIORITY" = "true" ] && [ "$BATCH_MISSING" = "999999" ]; then
+    pass "Batch applied relative priority and reported missing ids"
+else
+    fail "Batch result wrong (priority: $BATCH_PRIORITY, missing: $BATCH_MISSING)"
+fi
 echo ""
 
 echo "5. Testing Status Updates"
@@ -106,6 +158,7 @@ if [ ! -z "$RESPONSE" ] && [ "$RESPONSE" != "null" ]; then
 else
     fail "Chat response empty or null"
 fi
+test_endpoint "Stream chat" "POST" "/api/chat/stream" '{"message":"test","include_context":false}' 200
 echo ""
 
 echo "7. Testing Settings Endpoint"
@@ -119,9 +172,52 @@ echo "---------------"
 test_endpoint "Get stats" "GET" "/api/tasks/stats/overview" "" 200
 echo ""
 
+echo "8b. Testing Metrics"
+echo "-------------------"
+test_endpoint "Get metrics" "GET" "/metrics" "" 200
+DEPTH=$(cat /tmp/last_response.json | jq -r '.queue.depth')
+if [ "$DEPTH" != "null" ]; then
+    pass "Queue depth reported ($DEPTH)"
+else
+    fail "Queue depth missing from metrics"
+fi
+ENDPOINTS=$(cat /tmp/last_response.json | jq -r '.llm_endpoints | length')
+if [ "$ENDPOINTS" -ge 1 ] 2>/dev/null; then
+    pass "LLM endpoints reported ($ENDPOINTS)"
+else
+    fail "LLM endpoints missing from metrics"
+fi
+LANES=$(cat /tmp/last_response.json | jq -r '.llm_lanes | type')
+if [ "$LANES" = "object" ]; then
+    pass "LLM lanes reported"
+else
+    fail "LLM lanes missing from metrics"
+fi
+echo ""
+
+echo "8c. Testing Live Updates"
+echo "------------------------"
+# Stream for two seconds while a capture happens - expect ready plus a task event
+(sleep 0.5; curl -s -X POST "$API_BASE/api/tasks/capture" \
+    -H "Content-Type: application/json" -d '{"raw_input":"live update test"}' > /dev/null) &
+curl -s -N -m 2 "$API_BASE/api/events" > /tmp/events_stream.txt
+wait
+if grep -q "event: ready" /tmp/events_stream.txt && grep -q '"kind": "created"' /tmp/events_stream.txt; then
+    pass "Event stream delivered the capture"
+else
+    fail "Event stream missing ready or created event"
+fi
+echo ""
+
 echo "9. Testing Suggestions"
 echo "---------------------"
 test_endpoint "Get suggestions" "GET" "/api/tasks/suggestions" "" 200
+test_endpoint "Stream suggestions" "GET" "/api/tasks/suggestions/stream" "" 200
+if tail -n1 /tmp/last_response.json | jq -e '.done' > /dev/null; then
+    pass "Suggestion stream finished with done message"
+else
+    fail "Suggestion stream missing done message"
+fi
 echo ""
 
 echo "10. Cleanup"